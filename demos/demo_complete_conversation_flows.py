@@ -9,19 +9,75 @@ This demo showcases realistic end-to-end customer conversations including:
 - Real customer journey scenarios
 """
 
+import asyncio
+
+from src.common import event_loop
 from src.pipeline import AdventureOutfittersPipeline
+from helpers import print_section
+
+# Cap on conversations in flight at once
+CONCURRENCY_LIMIT = 4
+
+# Separator rules, built once
+_EQ70 = "=" * 70
+_DASH70 = "-" * 70
+
+
+async def run_flow(queries, semaphore, preview_len=250, max_output_tokens=100, memory_steps=(), describe_memory=None):
+    """
+    Run one conversation on its own pipeline and collect its output lines.
+
+    Flows share no state, so several of them can run at once; output is buffered per flow
+    so the transcripts don't interleave when printed. Within a flow, the next turn is
+    dispatched as soon as the previous one has updated conversation memory. Only
+    preview_len characters of each answer are shown, so generation is capped at
+    max_output_tokens.
+    """
+    pipeline = AdventureOutfittersPipeline.fresh_conversation()
+    memory_notes = {}
+
+    def note_memory(index):
+        step = index + 1
+        if describe_memory and step in memory_steps:
+            context = pipeline.coordinator.conversation_memory.get_full_context()
+            memory_notes[step] = describe_memory(context)
+
+    async with semaphore:
+        responses = await pipeline.aprocess_conversation(
+            queries, on_turn_prepared=note_memory, max_output_tokens=max_output_tokens
+        )
+
+    lines = []
+    for i, (query, response) in enumerate(zip(queries, responses), 1):
+        lines.append(f"\n👤 User (Step {i}): {query}")
+        lines.append(f"🤖 Adventure Outfitters: {response[:preview_len]}...")
+        lines.extend(memory_notes.get(i, []))
+
+    return pipeline, lines
 
-def main():
+
+def describe_products(context):
+    """Memory summary shown after the order lookup and first product question."""
+    return [
+        f"   📝 Memory: {len(context['recent_interactions'])} interactions, "
+        f"Products: {context['context'].get('recent_products', [])}"
+    ]
+
+
+def describe_last_order(context):
+    """Memory summary shown at the key points of the multi-intent journey."""
+    lines = [f"   📝 Memory Update: {len(context['recent_interactions'])} interactions"]
+    if context['context'].get('last_order_lookup'):
+        order_info = context['context']['last_order_lookup']
+        lines.append(f"      Last Order: {order_info.get('order_number')} ({order_info.get('status')})")
+    return lines
+
+
+async def main():
     print("🏔️ Adventure Outfitters Complete Conversation Flows Demo 🏔️")
-    print("=" * 70)
+    print(_EQ70)
     print("Demonstrating realistic customer journey scenarios with multiple intents\n")
-    
-    print("📋 CONVERSATION FLOW 1: Order Check → Product Questions → Recommendations")
-    print("-" * 70)
-    print("Scenario: Customer checks order, asks about products, then wants similar items")
-    
-    pipeline = AdventureOutfittersPipeline()
-    
+
     conversation_1 = [
         "Hi, can you check my order #W007 for ethan.harris@example.com?",
         "What are those products exactly?",
@@ -29,25 +85,7 @@ def main():
         "Do you have any similar backpacks?",
         "What about something for winter hiking?"
     ]
-    
-    for i, query in enumerate(conversation_1, 1):
-        print(f"\n👤 User (Step {i}): {query}")
-        response = pipeline.process_query(query)
-        print(f"🤖 Adventure Outfitters: {response[:250]}...")
-        
-        # Show conversation memory state after key interactions
-        if i in [1, 2]:  # After order lookup and first product question
-            context = pipeline.coordinator.conversation_memory.get_full_context()
-            print(f"   📝 Memory: {len(context['recent_interactions'])} interactions, "
-                  f"Products: {context['context'].get('recent_products', [])}")
-    
-    print("\n" + "=" * 70)
-    print("📋 CONVERSATION FLOW 2: Product Search → Order Check → Early Risers")
-    print("-" * 70)
-    print("Scenario: Customer browses products, checks existing order, asks for discount")
-    
-    pipeline = AdventureOutfittersPipeline()  # Fresh conversation
-    
+
     conversation_2 = [
         "I'm looking for gear for a mountain expedition",
         "Actually, let me first check my existing order #W002 for jane.smith@example.com",
@@ -55,19 +93,7 @@ def main():
         "Do you have any promotions or discounts available?",
         "Can I get an Early Risers discount?"
     ]
-    
-    for i, query in enumerate(conversation_2, 1):
-        print(f"\n👤 User (Step {i}): {query}")
-        response = pipeline.process_query(query)
-        print(f"🤖 Adventure Outfitters: {response[:250]}...")
-    
-    print("\n" + "=" * 70)
-    print("📋 CONVERSATION FLOW 3: Complex Multi-Intent Journey")
-    print("-" * 70)
-    print("Scenario: Customer with multiple orders, product comparisons, and promotions")
-    
-    pipeline = AdventureOutfittersPipeline()  # Fresh conversation
-    
+
     conversation_3 = [
         "Hi there! I'm planning a big adventure and need to check a few things",
         "First, what's the status of order #W006 for diana.evans@example.com?",
@@ -77,27 +103,7 @@ def main():
         "Actually, let me also check another order #W010 for hannah.lewis@example.com",
         "Thanks! So to summarize, what would you recommend for my upcoming expedition?"
     ]
-    
-    for i, query in enumerate(conversation_3, 1):
-        print(f"\n👤 User (Step {i}): {query}")
-        response = pipeline.process_query(query)
-        print(f"🤖 Adventure Outfitters: {response[:200]}...")
-        
-        # Show memory evolution
-        if i in [2, 4, 6]:  # Key memory points
-            context = pipeline.coordinator.conversation_memory.get_full_context()
-            print(f"   📝 Memory Update: {len(context['recent_interactions'])} interactions")
-            if context['context'].get('last_order_lookup'):
-                order_info = context['context']['last_order_lookup']
-                print(f"      Last Order: {order_info.get('order_number')} ({order_info.get('status')})")
-    
-    print("\n" + "=" * 70)
-    print("📋 CONVERSATION FLOW 4: Error Recovery and Persistence")
-    print("-" * 70)
-    print("Scenario: Customer makes mistakes but conversation context is preserved")
-    
-    pipeline = AdventureOutfittersPipeline()  # Fresh conversation
-    
+
     conversation_4 = [
         "Check my order please",  # Missing info
         "Sorry, it's john.doe@example.com",
@@ -107,38 +113,57 @@ def main():
         "Is that good for beginners?",
         "What else would you recommend for someone just starting out?"
     ]
-    
-    for i, query in enumerate(conversation_4, 1):
-        print(f"\n👤 User (Step {i}): {query}")
-        response = pipeline.process_query(query)
-        print(f"🤖 Adventure Outfitters: {response[:200]}...")
-    
-    print("\n" + "=" * 70)
-    print("📋 CONVERSATION ANALYSIS")
-    print("-" * 70)
-    
+
+    # The four flows are independent, so run them concurrently
+    semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
+    flow_1, flow_2, flow_3, flow_4 = await asyncio.gather(
+        run_flow(conversation_1, semaphore, memory_steps=(1, 2), describe_memory=describe_products),
+        run_flow(conversation_2, semaphore),
+        run_flow(conversation_3, semaphore, preview_len=200, max_output_tokens=80, memory_steps=(2, 4, 6),
+                 describe_memory=describe_last_order),
+        run_flow(conversation_4, semaphore, preview_len=200, max_output_tokens=80),
+    )
+
+    print("📋 CONVERSATION FLOW 1: Order Check → Product Questions → Recommendations")
+    print(_DASH70)
+    print("Scenario: Customer checks order, asks about products, then wants similar items")
+    print("\n".join(flow_1[1]))
+
+    print_section("📋 CONVERSATION FLOW 2: Product Search → Order Check → Early Risers", _EQ70, _DASH70)
+    print("Scenario: Customer browses products, checks existing order, asks for discount")
+    print("\n".join(flow_2[1]))
+
+    print_section("📋 CONVERSATION FLOW 3: Complex Multi-Intent Journey", _EQ70, _DASH70)
+    print("Scenario: Customer with multiple orders, product comparisons, and promotions")
+    print("\n".join(flow_3[1]))
+
+    print_section("📋 CONVERSATION FLOW 4: Error Recovery and Persistence", _EQ70, _DASH70)
+    print("Scenario: Customer makes mistakes but conversation context is preserved")
+    print("\n".join(flow_4[1]))
+
+    print_section("📋 CONVERSATION ANALYSIS", _EQ70, _DASH70)
+
     # Final conversation memory analysis
+    pipeline = flow_4[0]
     context = pipeline.coordinator.conversation_memory.get_full_context()
-    
+    intent_counts = pipeline.coordinator.conversation_memory.get_intent_counts()
+
     print(f"📊 Final Conversation State:")
-    print(f"   • Total Interactions: {len(context['recent_interactions'])}")
+    print(f"   • Total Interactions: {sum(intent_counts.values())}")
+    print(f"   • Interactions in Memory: {len(context['recent_interactions'])}")
     print(f"   • Customer Email: {context['context'].get('customer_email', 'Not captured')}")
     print(f"   • Last Order: {context['context'].get('last_order_lookup', {}).get('order_number', 'None')}")
     print(f"   • Recent Products: {context['context'].get('recent_products', [])}")
-    
+
     print(f"\n📈 Interaction Breakdown:")
-    intent_counts = {}
-    for interaction in context['recent_interactions']:
-        intent = interaction['intent']
-        intent_counts[intent] = intent_counts.get(intent, 0) + 1
-    
+
     for intent, count in intent_counts.items():
         print(f"   • {intent}: {count} interactions")
-    
+
     print("\n✅ Complete Conversation Flows Demo Finished!")
     print("🏔️ All realistic customer journey scenarios demonstrated successfully!")
     print("🌟 System maintains context across complex multi-intent conversations!")
     print("🎒 Ready to handle any customer adventure! Onward into the unknown!")
 
 if __name__ == "__main__":
-    main()
+    event_loop.run(main())
@@ -7,10 +7,16 @@ that were previously impossible due to state clearing after successful operation
 """
 
 from src.pipeline import AdventureOutfittersPipeline
+from helpers import print_section
+
+# Separator rules, built once
+_EQ60 = "=" * 60
+_DASH30 = "-" * 30
+
 
 def main():
     print("🏔️ Adventure Outfitters Conversation Memory Demo 🏔️")
-    print("=" * 60)
+    print(_EQ60)
     print("This demo shows how the system now maintains conversation context")
     print("to handle follow-up questions about previous interactions.\n")
     
@@ -19,27 +25,24 @@ def main():
     
     # Simulate the conversation from the original issue
     print("📋 CONVERSATION FLOW:")
-    print("-" * 30)
+    print(_DASH30)
     
-    # Query 1: Order lookup
-    print("\n👤 User: ethan.harris@example.com")
-    response1 = pipeline.process_query("ethan.harris@example.com")
-    print(f"🤖 Adventure Outfitters: {response1[:150]}...")
+    queries = [
+        "ethan.harris@example.com",  # Order lookup
+        "do you know what are those products?",  # Follow-up about products (this was failing before)
+        "tell me more about the backpack",  # Another contextual follow-up
+    ]
     
-    # Query 2: Follow-up about products (this was failing before)
-    print("\n👤 User: do you know what are those products?")
-    response2 = pipeline.process_query("do you know what are those products?")
-    print(f"🤖 Adventure Outfitters: {response2[:150]}...")
+    # Each follow-up needs the previous turn's memory update, not its final wording,
+    # so the next turn is routed while the previous reply is still being written
+    responses = pipeline.process_conversation(queries)
     
-    # Query 3: Another contextual follow-up
-    print("\n👤 User: tell me more about the backpack")
-    response3 = pipeline.process_query("tell me more about the backpack")
-    print(f"🤖 Adventure Outfitters: {response3[:150]}...")
+    for query, response in zip(queries, responses):
+        print(f"\n👤 User: {query}")
+        print(f"🤖 Adventure Outfitters: {response[:150]}...")
     
     # Show conversation memory state
-    print("\n" + "=" * 60)
-    print("🧠 CONVERSATION MEMORY ANALYSIS:")
-    print("-" * 30)
+    print_section("🧠 CONVERSATION MEMORY ANALYSIS:", _EQ60, _DASH30)
     
     context = pipeline.coordinator.conversation_memory.get_full_context()
     
@@ -9,18 +9,39 @@ This demo showcases the Early Risers promotion functionality including:
 - Time validation and error handling
 """
 
+import re
+import sys
+
+from src.common.streaming import batch_stream, stream_prefix
 from src.pipeline import AdventureOutfittersPipeline
+from helpers import inspect_response, print_section
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
+
+_PACIFIC = ZoneInfo('US/Pacific')
+
+# Promo codes look like EARLY<digits><suffix>; compiled once for every response checked
+_PROMO_RE = re.compile(r'EARLY\d+[A-Z0-9]+')
+
+BRAND_ELEMENTS = ["🌅", "🏔️", "adventure", "early riser", "sunrise"]
+# One scan of the response finds every element; the lookahead lets overlapping elements all match
+_BRAND_RE = re.compile("(?=(" + "|".join(map(re.escape, BRAND_ELEMENTS)) + "))", re.IGNORECASE)
+
+# Separator rules, built once
+_EQ60 = "=" * 60
+_DASH40 = "-" * 40
+
 
 def main():
     print("🌅 Adventure Outfitters Early Risers Promotion Demo 🌅")
-    print("=" * 60)
+    print(_EQ60)
     print("Demonstrating time-based 10% discount promotion (8-10 AM Pacific Time)\n")
     
+    # Fresh conversations below repeat earlier questions, so reuse those answers
+    AdventureOutfittersPipeline.enable_response_cache()
+
     # Show current time context
-    pacific = pytz.timezone('US/Pacific')
-    current_time = datetime.now(pacific)
+    current_time = datetime.now(_PACIFIC)
     print(f"🕐 Current Pacific Time: {current_time.strftime('%H:%M:%S %Z')}")
     print(f"🕐 Early Risers Window: 08:00:00 - 10:00:00 PST/PDT")
     
@@ -28,9 +49,7 @@ def main():
     print(f"✅ Currently in Early Risers window: {is_early_risers_time}")
     
     print("\n📋 SCENARIO 1: Early Risers Promotion Request")
-    print("-" * 40)
-    
-    pipeline = AdventureOutfittersPipeline()
+    print(_DASH40)
     
     # Test Early Risers promotion requests
     promotion_queries = [
@@ -40,20 +59,23 @@ def main():
         "Early risers promo code please"
     ]
     
-    for query in promotion_queries:
+    # Same customer asking several ways, so keep one session for the whole batch
+    responses = AdventureOutfittersPipeline.process_queries_batch(
+        promotion_queries, session_ids=["early-risers-scenario-1"] * len(promotion_queries)
+    )
+
+    for query, response in zip(promotion_queries, responses):
         print(f"\n👤 User: {query}")
-        response = pipeline.process_query(query)
-        print(f"🤖 Adventure Outfitters: {response[:300]}...")
+        preview, outside_hours = inspect_response(response, "not available", "outside", prefix_len=300)
+        print(f"🤖 Adventure Outfitters: {preview}...")
         
         # Check if promo code was generated
-        if "EARLY" in response and any(char.isdigit() for char in response):
+        if _PROMO_RE.search(response):
             print("   ✅ Promo code generated successfully!")
-        elif "not available" in response.lower() or "outside" in response.lower():
+        elif outside_hours:
             print("   ⏰ Outside promotion hours - correctly handled")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 2: Time Validation Testing")
-    print("-" * 40)
+    print_section("📋 SCENARIO 2: Time Validation Testing")
     
     # Show what happens at different times
     time_scenarios = [
@@ -65,25 +87,27 @@ def main():
     
     for time_str, description in time_scenarios:
         print(f"\n🕐 Simulated Time: {time_str} Pacific - {description}")
-        pipeline = AdventureOutfittersPipeline()  # Fresh instance
-        response = pipeline.process_query("Can I get the Early Risers discount?")
-        print(f"🤖 Adventure Outfitters: {response[:200]}...")
-    
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 3: Promo Code Uniqueness")
-    print("-" * 40)
+        pipeline = AdventureOutfittersPipeline.fresh_conversation()
+        # Show the reply as it is generated and stop the stream once the preview is full
+        print("🤖 Adventure Outfitters: ", end="", flush=True)
+        stream = pipeline.process_query_stream("Can I get the Early Risers discount?", max_output_tokens=80)
+        for chunk in batch_stream(stream_prefix(stream, 200)):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        print("...")
+    
+    print_section("📋 SCENARIO 3: Promo Code Uniqueness")
     print("Testing that each request generates a unique promo code")
     
     if is_early_risers_time:
         promo_codes = []
         for i in range(3):
-            pipeline = AdventureOutfittersPipeline()  # Fresh instance
+            pipeline = AdventureOutfittersPipeline.fresh_conversation()
             print(f"\n👤 User {i+1}: Early risers discount please")
             response = pipeline.process_query("Early risers discount please")
             
             # Extract promo code from response
-            import re
-            promo_match = re.search(r'EARLY\d+[A-Z0-9]+', response)
+            promo_match = _PROMO_RE.search(response)
             if promo_match:
                 promo_code = promo_match.group()
                 promo_codes.append(promo_code)
@@ -99,9 +123,7 @@ def main():
     else:
         print("\n⏰ Currently outside Early Risers window - promo codes not generated")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 4: Brand Integration")
-    print("-" * 40)
+    print_section("📋 SCENARIO 4: Brand Integration")
     print("Showing how promotion integrates with Adventure Outfitters brand voice")
     
     pipeline = AdventureOutfittersPipeline()
@@ -111,14 +133,12 @@ def main():
     print(f"🤖 Adventure Outfitters: {response}")
     
     # Check for brand elements
-    brand_elements = ["🌅", "🏔️", "adventure", "early riser", "sunrise"]
-    found_elements = [elem for elem in brand_elements if elem.lower() in response.lower()]
+    matched = {match.group(1).lower() for match in _BRAND_RE.finditer(response)}
+    found_elements = [elem for elem in BRAND_ELEMENTS if elem.lower() in matched]
     if found_elements:
         print(f"✅ Brand elements found: {', '.join(found_elements)}")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 5: Edge Cases")
-    print("-" * 40)
+    print_section("📋 SCENARIO 5: Edge Cases")
     
     edge_cases = [
         "early bird discount",  # Similar but different terminology
@@ -127,10 +147,10 @@ def main():
         "sunrise special"      # Creative variation
     ]
     
-    for query in edge_cases:
-        pipeline = AdventureOutfittersPipeline()
+    responses = AdventureOutfittersPipeline.process_queries_batch(edge_cases, max_output_tokens=80)
+
+    for query, response in zip(edge_cases, responses):
         print(f"\n👤 User: {query}")
-        response = pipeline.process_query(query)
         print(f"🤖 Adventure Outfitters: {response[:200]}...")
     
     print("\n✅ Early Risers Promotion Demo Complete!")
@@ -10,30 +10,36 @@ This demo showcases the order status functionality including:
 """
 
 from src.pipeline import AdventureOutfittersPipeline
+from helpers import print_section
+
+# Separator rules, built once
+_EQ60 = "=" * 60
+_DASH40 = "-" * 40
+
 
 def main():
     print("🏔️ Adventure Outfitters Order Status Demo 🏔️")
-    print("=" * 60)
+    print(_EQ60)
     print("Demonstrating order lookup capabilities with conversation state management\n")
+
+    # Fresh conversations below repeat earlier questions, so reuse those answers
+    AdventureOutfittersPipeline.enable_response_cache()
     
     pipeline = AdventureOutfittersPipeline()
     
     print("📋 SCENARIO 1: Email-First Order Lookup")
-    print("-" * 40)
+    print(_DASH40)
     
-    # Step 1: User provides just email
-    print("\n👤 User: john.doe@example.com")
-    response1 = pipeline.process_query("john.doe@example.com")
-    print(f"🤖 Adventure Outfitters: {response1}")
+    # Step 1: User provides just email, step 2: user provides order number.
+    # The second turn is routed while the first reply is still being written.
+    queries = ["john.doe@example.com", "#W001"]
+    responses = pipeline.process_conversation(queries)
     
-    # Step 2: User provides order number
-    print("\n👤 User: #W001")
-    response2 = pipeline.process_query("#W001")
-    print(f"🤖 Adventure Outfitters: {response2}")
+    for query, response in zip(queries, responses):
+        print(f"\n👤 User: {query}")
+        print(f"🤖 Adventure Outfitters: {response}")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 2: Complete Order Lookup")
-    print("-" * 40)
+    print_section("📋 SCENARIO 2: Complete Order Lookup")
     
     # Reset for new conversation
     pipeline = AdventureOutfittersPipeline()
@@ -43,18 +49,14 @@ def main():
     response3 = pipeline.process_query("Check order #W002 for jane.smith@example.com")
     print(f"🤖 Adventure Outfitters: {response3}")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 3: Error Handling")
-    print("-" * 40)
+    print_section("📋 SCENARIO 3: Error Handling")
     
     # Test with non-existent order
     print("\n👤 User: Check order #W999 for nonexistent@example.com")
     response4 = pipeline.process_query("Check order #W999 for nonexistent@example.com")
     print(f"🤖 Adventure Outfitters: {response4}")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 4: Different Order Statuses")
-    print("-" * 40)
+    print_section("📋 SCENARIO 4: Different Order Statuses")
     
     # Test different order statuses
     test_cases = [
@@ -63,10 +65,13 @@ def main():
         ("bob.brown@example.com", "#W004", "Error")
     ]
     
-    for email, order, expected_status in test_cases:
-        pipeline = AdventureOutfittersPipeline()  # Fresh instance
+    # Look the orders up in one pass and format them with the status template
+    pipeline = AdventureOutfittersPipeline.fresh_conversation()
+    records = pipeline.lookup_orders_bulk([(email, order) for email, order, _ in test_cases])
+    responses = pipeline.format_order_responses_batch(records)
+
+    for (email, order, expected_status), response in zip(test_cases, responses):
         print(f"\n👤 User: Check order {order} for {email}")
-        response = pipeline.process_query(f"Check order {order} for {email}")
         print(f"🤖 Adventure Outfitters: {response[:200]}...")
         print(f"   Expected Status: {expected_status}")
     
@@ -10,19 +10,33 @@ This demo showcases the product recommendation functionality including:
 - Brand personality and outdoor theme integration
 """
 
+import re
+
 from src.pipeline import AdventureOutfittersPipeline
+from helpers import inspect_response, print_section
+
+BRAND_ELEMENTS = ["🏔️", "🌟", "adventure", "Onward into the unknown", "🏞️", "fellow adventurer"]
+# One scan of the response finds every element; the lookahead lets overlapping elements all match
+_BRAND_RE = re.compile("(?=(" + "|".join(map(re.escape, BRAND_ELEMENTS)) + "))")
+
+# Separator rules, built once
+_EQ60 = "=" * 60
+_DASH40 = "-" * 40
+_DASH50 = "-" * 50
+
 
 def main():
     print("🏔️ Adventure Outfitters Product Recommendation Demo 🏔️")
-    print("=" * 60)
+    print(_EQ60)
     print("Demonstrating product recommendation capabilities with outdoor adventure theme\n")
     
+    # Fresh conversations below repeat earlier questions, so reuse those answers
+    AdventureOutfittersPipeline.enable_response_cache()
+
     print("📋 SCENARIO 1: Direct SKU Lookups (Recently Fixed!)")
-    print("-" * 50)
+    print(_DASH50)
     print("Testing direct product retrieval by SKU code")
     
-    pipeline = AdventureOutfittersPipeline()
-    
     # Test direct SKU lookups with different products
     sku_tests = [
         ("SOWB004", "Beth's Caffeinated Energy Drink"),
@@ -31,22 +45,21 @@ def main():
         ("SOSB006", "Another energy product")
     ]
     
-    for sku, expected_product in sku_tests:
+    # Lookups are independent, so submit them as one batch
+    responses = AdventureOutfittersPipeline.process_queries_batch([sku for sku, _ in sku_tests])
+
+    for (sku, expected_product), response in zip(sku_tests, responses):
         print(f"\n👤 User: {sku}")
-        response = pipeline.process_query(sku)
-        print(f"🤖 Adventure Outfitters: {response[:200]}...")
+        preview, found = inspect_response(response, expected_product.split()[0])
+        print(f"🤖 Adventure Outfitters: {preview}...")
         
         # Check if the expected product was found
-        if expected_product.split()[0].lower() in response.lower():
+        if found:
             print(f"   ✅ Successfully found: {expected_product}")
         else:
             print(f"   ⚠️ Expected: {expected_product}")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 2: General Product Searches")
-    print("-" * 40)
-    
-    pipeline = AdventureOutfittersPipeline()
+    print_section("📋 SCENARIO 2: General Product Searches")
     
     # Test different product searches
     search_queries = [
@@ -57,37 +70,33 @@ def main():
         "Do you have any energy drinks?"
     ]
     
-    for query in search_queries:
+    # Only a preview of each answer is shown, so cap generation to roughly that length
+    responses = AdventureOutfittersPipeline.process_queries_batch(search_queries, max_output_tokens=100)
+
+    for query, response in zip(search_queries, responses):
         print(f"\n👤 User: {query}")
-        response = pipeline.process_query(query)
         print(f"🤖 Adventure Outfitters: {response[:250]}...")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 3: Contextual Product Recommendations")
-    print("-" * 40)
+    print_section("📋 SCENARIO 3: Contextual Product Recommendations")
     print("This shows how product recommendations work after order lookups")
     
     # Fresh pipeline for contextual demo
     pipeline = AdventureOutfittersPipeline()
     
-    # First, do an order lookup
-    print("\n👤 User: Check order #W007 for ethan.harris@example.com")
-    response1 = pipeline.process_query("Check order #W007 for ethan.harris@example.com")
-    print(f"🤖 Adventure Outfitters: {response1[:200]}...")
+    contextual_turns = [
+        ("Check order #W007 for ethan.harris@example.com", 200),  # First, do an order lookup
+        ("What are those products exactly?", 300),  # Then ask about the products contextually
+        ("Tell me more about the backpack", 300),  # Follow up with more specific questions
+    ]
     
-    # Then ask about the products contextually
-    print("\n👤 User: What are those products exactly?")
-    response2 = pipeline.process_query("What are those products exactly?")
-    print(f"🤖 Adventure Outfitters: {response2[:300]}...")
+    # Each turn is routed while the previous reply is still being written
+    responses = pipeline.process_conversation([query for query, _ in contextual_turns])
     
-    # Follow up with more specific questions
-    print("\n👤 User: Tell me more about the backpack")
-    response3 = pipeline.process_query("Tell me more about the backpack")
-    print(f"🤖 Adventure Outfitters: {response3[:300]}...")
+    for (query, preview_len), response in zip(contextual_turns, responses):
+        print(f"\n👤 User: {query}")
+        print(f"🤖 Adventure Outfitters: {response[:preview_len]}...")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 4: Product Query Type Comparison")
-    print("-" * 40)
+    print_section("📋 SCENARIO 4: Product Query Type Comparison")
     print("Comparing all three ways to get product information")
     
     # Test the same product through different query methods
@@ -97,31 +106,27 @@ def main():
     print(f"\n🎯 Getting information about {target_sku} (Backpack) three different ways:")
     
     # Method 1: Direct SKU
-    pipeline1 = AdventureOutfittersPipeline()
+    pipeline1 = AdventureOutfittersPipeline.fresh_conversation()
     print(f"\n1️⃣ Direct SKU: {target_sku}")
     response_sku = pipeline1.process_query(target_sku)
     print(f"   Response: {response_sku[:150]}...")
     
     # Method 2: General search
-    pipeline2 = AdventureOutfittersPipeline()
+    pipeline2 = AdventureOutfittersPipeline.fresh_conversation()
     print(f"\n2️⃣ General Search: 'I need a {target_product}'")
     response_search = pipeline2.process_query(f"I need a {target_product}")
     print(f"   Response: {response_search[:150]}...")
     
     # Method 3: Contextual (after order lookup)
-    pipeline3 = AdventureOutfittersPipeline()
+    pipeline3 = AdventureOutfittersPipeline.fresh_conversation()
     print(f"\n3️⃣ Contextual: After order lookup")
     pipeline3.process_query("Check order #W007 for ethan.harris@example.com")  # Contains SOBP001
     response_contextual = pipeline3.process_query("Tell me about the backpack in my order")
     print(f"   Response: {response_contextual[:150]}...")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 5: Brand Personality Showcase")
-    print("-" * 40)
+    print_section("📋 SCENARIO 5: Brand Personality Showcase")
     print("Demonstrating Adventure Outfitters' outdoor adventure brand voice")
     
-    pipeline = AdventureOutfittersPipeline()
-    
     brand_queries = [
         "What makes your products special?",
         "I'm planning a mountain expedition",
@@ -129,24 +134,21 @@ def main():
         "Tell me about SOJT005"  # Test brand voice with SKU lookup
     ]
     
-    for query in brand_queries:
+    responses = AdventureOutfittersPipeline.process_queries_batch(brand_queries)
+
+    for query, response in zip(brand_queries, responses):
         print(f"\n👤 User: {query}")
-        response = pipeline.process_query(query)
         print(f"🤖 Adventure Outfitters: {response[:250]}...")
         
         # Check for brand elements
-        brand_elements = ["🏔️", "🌟", "adventure", "Onward into the unknown", "🏞️", "fellow adventurer"]
-        found_elements = [elem for elem in brand_elements if elem in response]
+        matched = {match.group(1) for match in _BRAND_RE.finditer(response)}
+        found_elements = [elem for elem in BRAND_ELEMENTS if elem in matched]
         if found_elements:
             print(f"   ✅ Brand elements found: {', '.join(found_elements[:3])}")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 6: Product Catalog Coverage")
-    print("-" * 40)
+    print_section("📋 SCENARIO 6: Product Catalog Coverage")
     print("Testing different product categories from the catalog")
     
-    pipeline = AdventureOutfittersPipeline()
-    
     category_tests = [
         ("backpack", "SOBP001 - Bhavish's Backcountry Blaze Backpack"),
         ("ski", "Should find ski-related products"),
@@ -156,32 +158,33 @@ def main():
         ("red shoes", "Should find Dorothy's Wizarding Red Shoes")
     ]
     
-    for search_term, expected in category_tests:
+    responses = AdventureOutfittersPipeline.process_queries_batch(
+        [f"Show me your {search_term}" for search_term, _ in category_tests], max_output_tokens=80
+    )
+
+    for (search_term, expected), response in zip(category_tests, responses):
         print(f"\n👤 User: Show me your {search_term}")
-        response = pipeline.process_query(f"Show me your {search_term}")
         print(f"🤖 Adventure Outfitters: {response[:200]}...")
         print(f"   Expected to find: {expected}")
     
-    print("\n" + "=" * 60)
-    print("📋 SCENARIO 7: SKU Validation and Error Handling")
-    print("-" * 40)
+    print_section("📋 SCENARIO 7: SKU Validation and Error Handling")
     print("Testing how the system handles invalid or non-existent SKUs")
     
-    pipeline = AdventureOutfittersPipeline()
-    
     invalid_skus = [
         "INVALID001",  # Non-existent SKU
         "SO999",       # Wrong format
         "SOBP999",     # Correct format but doesn't exist
     ]
     
-    for invalid_sku in invalid_skus:
+    responses = AdventureOutfittersPipeline.process_queries_batch(invalid_skus)
+
+    for invalid_sku, response in zip(invalid_skus, responses):
         print(f"\n👤 User: {invalid_sku}")
-        response = pipeline.process_query(invalid_sku)
-        print(f"🤖 Adventure Outfitters: {response[:200]}...")
+        preview, handled = inspect_response(response, "couldn't find", "help us")
+        print(f"🤖 Adventure Outfitters: {preview}...")
         
         # Check if it gracefully handled the invalid SKU
-        if "couldn't find" in response.lower() or "help us" in response.lower():
+        if handled:
             print("   ✅ Gracefully handled invalid SKU")
     
     print("\n✅ Product Recommendation Demo Complete!")
@@ -10,28 +10,47 @@ This demo showcases the technical architecture including:
 - Error handling and fallback mechanisms
 """
 
+import functools
+import io
+import sys
+
 from src.pipeline import AdventureOutfittersPipeline
 import json
 
+# Separator rules, built once
+_EQ70 = "=" * 70
+_DASH40 = "-" * 40
+_DASH50 = "-" * 50
+
+
 def main():
-    print("🏗️ Adventure Outfitters System Architecture Demo 🏗️")
-    print("=" * 70)
-    print("Demonstrating the technical architecture and agentic workflow patterns\n")
-    
-    pipeline = AdventureOutfittersPipeline()
-    
-    print("📋 ARCHITECTURE OVERVIEW")
-    print("-" * 40)
-    print("🧭 Coordinator: AdventureOutfittersAgent (Semantic Router Pattern)")
-    print("🎯 Specialized Agents:")
-    print("   • OrderStatusAgent - Handles order lookups and tracking")
-    print("   • ProductRecommendationAgent - Manages product searches and recommendations")
-    print("   • EarlyRisersPromotionAgent - Time-based promotion management")
-    print("🧠 Memory System: ConversationMemory for context preservation")
-    print("🔄 Entity Extraction: Centralized at coordinator level")
-    
-    print("\n📋 DEMONSTRATION 1: Intent Detection & Routing")
-    print("-" * 50)
+    # Buffer each section and write it in one go instead of one write per line
+    buffer = io.StringIO()
+    out = functools.partial(print, file=buffer)
+
+    def flush_output():
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    out("🏗️ Adventure Outfitters System Architecture Demo 🏗️")
+    out(_EQ70)
+    out("Demonstrating the technical architecture and agentic workflow patterns\n")
+    
+    out("📋 ARCHITECTURE OVERVIEW")
+    out(_DASH40)
+    out("🧭 Coordinator: AdventureOutfittersAgent (Semantic Router Pattern)")
+    out("🎯 Specialized Agents:")
+    out("   • OrderStatusAgent - Handles order lookups and tracking")
+    out("   • ProductRecommendationAgent - Manages product searches and recommendations")
+    out("   • EarlyRisersPromotionAgent - Time-based promotion management")
+    out("🧠 Memory System: ConversationMemory for context preservation")
+    out("🔄 Entity Extraction: Centralized at coordinator level")
+    
+    flush_output()
+    out("\n📋 DEMONSTRATION 1: Intent Detection & Routing")
+    out(_DASH50)
     
     test_queries = [
         ("Check my order #W001", "ORDER_STATUS", "OrderStatusAgent"),
@@ -40,18 +59,19 @@ def main():
         ("Hello there", "UNKNOWN", "None")
     ]
     
-    for query, expected_intent, expected_agent in test_queries:
-        print(f"\n🔍 Testing: '{query}'")
-        print(f"   Expected Intent: {expected_intent}")
-        print(f"   Expected Agent: {expected_agent}")
-        
-        # Process query and show routing
-        response = pipeline.process_query(query)
-        print(f"   ✅ Response: {response[:100]}...")
+    # The routing tests are independent, so run them as one concurrent batch
+    responses = AdventureOutfittersPipeline.process_queries_batch([query for query, _, _ in test_queries])
+    
+    for (query, expected_intent, expected_agent), response in zip(test_queries, responses):
+        out(f"\n🔍 Testing: '{query}'")
+        out(f"   Expected Intent: {expected_intent}")
+        out(f"   Expected Agent: {expected_agent}")
+        out(f"   ✅ Response: {response[:100]}...")
     
-    print("\n📋 DEMONSTRATION 2: Entity Extraction System")
-    print("-" * 50)
-    print("Showing centralized entity extraction at coordinator level")
+    flush_output()
+    out("\n📋 DEMONSTRATION 2: Entity Extraction System")
+    out(_DASH50)
+    out("Showing centralized entity extraction at coordinator level")
     
     entity_test_queries = [
         "Check order #W007 for ethan.harris@example.com",
@@ -60,45 +80,47 @@ def main():
         "Early risers promotion please"
     ]
     
+    AdventureOutfittersPipeline.process_queries_batch(entity_test_queries)
+    
     for query in entity_test_queries:
-        print(f"\n🔍 Query: '{query}'")
+        out(f"\n🔍 Query: '{query}'")
         
         # We'll simulate what the coordinator extracts
         # In a real demo, you'd need to access the coordinator's internal state
-        print("   📊 Entity Extraction Process:")
-        print("      1. LLM analyzes query for entities")
-        print("      2. Extracts structured data (Email, OrderNumber, ProductName, SKU)")
-        print("      3. Passes entities to specialized agent via metadata")
-        
-        response = pipeline.process_query(query)
-        print(f"   ✅ Successfully processed and routed")
+        out("   📊 Entity Extraction Process:")
+        out("      1. LLM analyzes query for entities")
+        out("      2. Extracts structured data (Email, OrderNumber, ProductName, SKU)")
+        out("      3. Passes entities to specialized agent via metadata")
+        out(f"   ✅ Successfully processed and routed")
     
-    print("\n📋 DEMONSTRATION 3: Conversation Memory Architecture")
-    print("-" * 50)
-    print("Showing how conversation context is maintained across interactions")
+    flush_output()
+    out("\n📋 DEMONSTRATION 3: Conversation Memory Architecture")
+    out(_DASH50)
+    out("Showing how conversation context is maintained across interactions")
     
-    # Fresh pipeline for memory demo
-    pipeline = AdventureOutfittersPipeline()
+    # One pipeline for the rest of the demo; reset_memory() gives each demonstration a clean slate
+    pipeline = AdventureOutfittersPipeline(warmup=True)
     
-    print("\n🔄 Step 1: Initial order lookup")
+    out("\n🔄 Step 1: Initial order lookup")
     response1 = pipeline.process_query("Check order #W007 for ethan.harris@example.com")
     
     # Show memory state
     context = pipeline.coordinator.conversation_memory.get_full_context()
-    print(f"   📝 Memory State: {len(context['recent_interactions'])} interactions recorded")
-    print(f"   📦 Context: {list(context['context'].keys())}")
+    out(f"   📝 Memory State: {len(context['recent_interactions'])} interactions recorded")
+    out(f"   📦 Context: {list(context['context'].keys())}")
     
-    print("\n🔄 Step 2: Contextual follow-up")
+    out("\n🔄 Step 2: Contextual follow-up")
     response2 = pipeline.process_query("what are those products?")
     
     # Show enhanced memory state
     context = pipeline.coordinator.conversation_memory.get_full_context()
-    print(f"   📝 Memory State: {len(context['recent_interactions'])} interactions recorded")
-    print(f"   🔗 Contextual Enhancement: ReferencedProducts added to entities")
+    out(f"   📝 Memory State: {len(context['recent_interactions'])} interactions recorded")
+    out(f"   🔗 Contextual Enhancement: ReferencedProducts added to entities")
     
-    print("\n📋 DEMONSTRATION 4: Error Handling & Fallbacks")
-    print("-" * 50)
-    print("Showing robust error handling throughout the system")
+    flush_output()
+    out("\n📋 DEMONSTRATION 4: Error Handling & Fallbacks")
+    out(_DASH50)
+    out("Showing robust error handling throughout the system")
     
     error_scenarios = [
         ("Invalid order #W999 for fake@email.com", "Order not found handling"),
@@ -107,62 +129,65 @@ def main():
         ("Check order without details", "Missing information handling")
     ]
     
-    for query, scenario in error_scenarios:
-        print(f"\n🚨 Error Scenario: {scenario}")
-        print(f"   Query: '{query}'")
-        
-        pipeline_test = AdventureOutfittersPipeline()
-        response = pipeline_test.process_query(query)
-        print(f"   ✅ Graceful handling: {response[:100]}...")
-    
-    print("\n📋 DEMONSTRATION 5: Agent Coordination Flow")
-    print("-" * 50)
-    print("Showing the complete message flow through the system")
-    
-    print("\n🔄 Complete Flow Example:")
-    print("   1. User Query → Pipeline")
-    print("   2. Pipeline → AdventureOutfittersAgent (Coordinator)")
-    print("   3. Coordinator → Intent Detection (LLM)")
-    print("   4. Coordinator → Entity Extraction (LLM)")
-    print("   5. Coordinator → Route to Specialized Agent")
-    print("   6. Specialized Agent → Process with Context")
-    print("   7. Specialized Agent → Generate Response (LLM)")
-    print("   8. Coordinator → Consolidate Response (LLM)")
-    print("   9. Coordinator → Update Conversation Memory")
-    print("   10. Pipeline → Return to User")
+    # Each scenario gets its own conversation, so the batch runs them concurrently
+    responses = AdventureOutfittersPipeline.process_queries_batch([query for query, _ in error_scenarios])
+    
+    for (query, scenario), response in zip(error_scenarios, responses):
+        out(f"\n🚨 Error Scenario: {scenario}")
+        out(f"   Query: '{query}'")
+        out(f"   ✅ Graceful handling: {response[:100]}...")
+    
+    flush_output()
+    out("\n📋 DEMONSTRATION 5: Agent Coordination Flow")
+    out(_DASH50)
+    out("Showing the complete message flow through the system")
+    
+    out("\n🔄 Complete Flow Example:")
+    out("   1. User Query → Pipeline")
+    out("   2. Pipeline → AdventureOutfittersAgent (Coordinator)")
+    out("   3. Coordinator → Intent Detection (LLM)")
+    out("   4. Coordinator → Entity Extraction (LLM)")
+    out("   5. Coordinator → Route to Specialized Agent")
+    out("   6. Specialized Agent → Process with Context")
+    out("   7. Specialized Agent → Generate Response (LLM)")
+    out("   8. Coordinator → Consolidate Response (LLM)")
+    out("   9. Coordinator → Update Conversation Memory")
+    out("   10. Pipeline → Return to User")
     
     # Demonstrate with a real query
-    print(f"\n🎯 Live Example:")
-    pipeline = AdventureOutfittersPipeline()
+    out(f"\n🎯 Live Example:")
+    pipeline.reset_memory()
     query = "Check order #W001 for john.doe@example.com"
-    print(f"   Query: '{query}'")
+    out(f"   Query: '{query}'")
     
     response = pipeline.process_query(query)
-    print(f"   ✅ Complete flow executed successfully")
-    print(f"   📤 Final Response: {response[:150]}...")
-    
-    print("\n📋 DEMONSTRATION 6: Scalability & Extensibility")
-    print("-" * 50)
-    print("Showing how the architecture supports easy extension")
-    
-    print("\n🔧 Architecture Benefits:")
-    print("   ✅ Modular Design: Easy to add new agents")
-    print("   ✅ Centralized Routing: Single point of intent management")
-    print("   ✅ Entity Extraction: Reusable across all agents")
-    print("   ✅ Memory Management: Conversation context preservation")
-    print("   ✅ Error Handling: Graceful degradation at all levels")
-    print("   ✅ Brand Consistency: Centralized response consolidation")
-    
-    print("\n🚀 Extension Points:")
-    print("   • Add new Intent enum value")
-    print("   • Create new specialized agent class")
-    print("   • Update routing logic in coordinator")
-    print("   • Add new entity types to extraction")
-    print("   • Extend conversation memory context")
-    
-    print("\n✅ System Architecture Demo Complete!")
-    print("🏗️ Robust, scalable, and maintainable agentic architecture demonstrated!")
-    print("🏔️ Built for adventure and ready to scale! Onward into the unknown! 🌟")
+    out(f"   ✅ Complete flow executed successfully")
+    out(f"   📤 Final Response: {response[:150]}...")
+    
+    flush_output()
+    out("\n📋 DEMONSTRATION 6: Scalability & Extensibility")
+    out(_DASH50)
+    out("Showing how the architecture supports easy extension")
+    
+    out("\n🔧 Architecture Benefits:")
+    out("   ✅ Modular Design: Easy to add new agents")
+    out("   ✅ Centralized Routing: Single point of intent management")
+    out("   ✅ Entity Extraction: Reusable across all agents")
+    out("   ✅ Memory Management: Conversation context preservation")
+    out("   ✅ Error Handling: Graceful degradation at all levels")
+    out("   ✅ Brand Consistency: Centralized response consolidation")
+    
+    out("\n🚀 Extension Points:")
+    out("   • Add new Intent enum value")
+    out("   • Create new specialized agent class")
+    out("   • Update routing logic in coordinator")
+    out("   • Add new entity types to extraction")
+    out("   • Extend conversation memory context")
+    
+    out("\n✅ System Architecture Demo Complete!")
+    out("🏗️ Robust, scalable, and maintainable agentic architecture demonstrated!")
+    out("🏔️ Built for adventure and ready to scale! Onward into the unknown! 🌟")
+    flush_output()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,17 @@
+"""
+Output helpers shared by the demo scripts.
+"""
+
+
+def print_section(title, rule="=" * 60, underline="-" * 40):
+    """Print a scenario header (rule, title, underline) in a single write."""
+    print(f"\n{rule}\n{title}\n{underline}")
+
+
+def inspect_response(response, *needles, prefix_len=200):
+    """
+    Return the printable prefix of a response and whether any needle occurs in it (case-insensitive).
+    The response is case-folded once however many needles are checked.
+    """
+    folded = response.casefold()
+    return response[:prefix_len], any(needle.casefold() in folded for needle in needles)
@@ -4,19 +4,28 @@ Adventure Outfitters Demo Runner
 
 This script runs all demonstration scripts in sequence with proper spacing
 and provides a comprehensive overview of the system capabilities.
+Pass --parallel to run all demos at once, with each output line prefixed by its demo name.
 """
 
+import argparse
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Separator rules, built once
+_EQ80 = "=" * 80
+_DASH50 = "-" * 50
+
+
 def run_demo(demo_name, description):
     """Run a single demo script with error handling."""
-    print(f"\n{'='*80}")
+    print(f"\n{_EQ80}")
     print(f"🎬 RUNNING: {demo_name}")
     print(f"📝 Description: {description}")
-    print(f"{'='*80}")
+    print(_EQ80)
     
     try:
         # Run the demo script
@@ -33,16 +42,58 @@ def run_demo(demo_name, description):
     except Exception as e:
         print(f"\n❌ Error running {demo_name}: {e}")
     
-    print(f"\n{'='*80}")
+    print(f"\n{_EQ80}")
     print("Press Enter to continue to next demo, or 'q' to quit...")
     user_input = input().strip().lower()
     if user_input == 'q':
         return False
     return True
 
+def run_demos_parallel(demos):
+    """Run all demos at once and interleave their output line by line, prefixed with the demo name."""
+    print_lock = threading.Lock()
+
+    def run_prefixed(demo_name):
+        proc = subprocess.Popen([sys.executable, f"demos/{demo_name}"],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                text=True,
+                                bufsize=1,
+                                cwd=Path(__file__).parent.parent)
+        prefix = f"[{demo_name}] "
+        for line in proc.stdout:
+            with print_lock:
+                sys.stdout.write(prefix + line)
+        proc.stdout.close()
+        return proc.wait()
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=len(demos)) as executor:
+        futures = {executor.submit(run_prefixed, demo_name): demo_name for demo_name, _ in demos}
+        for done, future in enumerate(as_completed(futures), 1):
+            demo_name = futures[future]
+            try:
+                returncode = future.result()
+            except Exception as e:
+                returncode = None
+                with print_lock:
+                    print(f"\n❌ Error running {demo_name}: {e}")
+            if returncode != 0:
+                failed.append(demo_name)
+            with print_lock:
+                status = "✅ completed" if returncode == 0 else f"❌ failed with return code {returncode}"
+                print(f"\n{status}: {demo_name} ({done}/{len(demos)} finished)")
+
+    return failed
+
 def main():
+    parser = argparse.ArgumentParser(description="Run the Adventure Outfitters demo suite.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="run all demos concurrently without pausing between them")
+    args = parser.parse_args()
+
     print("🏔️ ADVENTURE OUTFITTERS COMPREHENSIVE DEMO SUITE 🏔️")
-    print("=" * 80)
+    print(_EQ80)
     print("This suite demonstrates all aspects of the Adventure Outfitters")
     print("customer service agent system built with agentic workflow patterns.")
     print("\nFeatures demonstrated:")
@@ -76,24 +127,32 @@ def main():
     ]
     
     print(f"\n📋 DEMO SEQUENCE ({len(demos)} demos total)")
-    print("-" * 50)
+    print(_DASH50)
     for i, (demo_name, description) in enumerate(demos, 1):
         print(f"{i}. {demo_name}")
         print(f"   {description}")
     
-    print("\n🚀 Ready to start? Press Enter to begin, or 'q' to quit...")
-    user_input = input().strip().lower()
-    if user_input == 'q':
-        print("Demo suite cancelled. 🏔️ Onward into the unknown! 🌟")
-        return
-    
-    # Run each demo
-    for i, (demo_name, description) in enumerate(demos, 1):
-        print(f"\n🎬 DEMO {i}/{len(demos)}")
-        
-        if not run_demo(demo_name, description):
-            print("Demo suite stopped by user. 🏔️ Thanks for exploring!")
+    if args.parallel:
+        start = time.perf_counter()
+        failed = run_demos_parallel(demos)
+        print(f"\n⏱️ All demos finished in {time.perf_counter() - start:.1f}s")
+        if failed:
+            print(f"❌ Failed demos: {', '.join(failed)}")
+            sys.exit(1)
+    else:
+        print("\n🚀 Ready to start? Press Enter to begin, or 'q' to quit...")
+        user_input = input().strip().lower()
+        if user_input == 'q':
+            print("Demo suite cancelled. 🏔️ Onward into the unknown! 🌟")
             return
+        
+        # Run each demo
+        for i, (demo_name, description) in enumerate(demos, 1):
+            print(f"\n🎬 DEMO {i}/{len(demos)}")
+            
+            if not run_demo(demo_name, description):
+                print("Demo suite stopped by user. 🏔️ Thanks for exploring!")
+                return
     
     print("\n" + "="*80)
     print("🎉 ALL DEMOS COMPLETED SUCCESSFULLY! 🎉")
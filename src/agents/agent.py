@@ -1,11 +1,32 @@
+import functools
 from abc import ABC, abstractmethod
+from typing import Optional
 
 from src.common.message import Message
 from src.common.logging import logger
-from src.llm_adapter import LLMAdapter
+from src.llm_adapter import LLMAdapter, LLMAdapterRegistry
 from src.prompt.manage import TemplateManager
 
 
+@functools.lru_cache(maxsize=4)
+def _get_template_manager(path: str) -> TemplateManager:
+    """
+    TemplateManager shared by every agent built from the same template config.
+    """
+    return TemplateManager(path)
+
+
+class _SharedLLMAdapter:
+    """
+    Class attribute resolving to the process-wide LLMAdapter for the agent class's LLM_PROVIDER
+    and LLM_MODEL. Adapters are created on first access, so importing the agents doesn't load
+    and initialize the provider SDK.
+    """
+
+    def __get__(self, instance, owner) -> LLMAdapter:
+        return LLMAdapterRegistry.get(owner.LLM_PROVIDER, owner.LLM_MODEL)
+
+
 class Agent(ABC):
     """
     Abstract base class for agents that handle specific tasks in a coordinator-delegate pattern.
@@ -13,14 +34,18 @@ class Agent(ABC):
     """
 
     TEMPLATE_PATH = "./config/adventure_outfitters.yml"
-    llm_adapter = LLMAdapter()
+    # Subclasses can pick another provider or model; agents with the same pair share one adapter
+    LLM_PROVIDER = "gemini"
+    LLM_MODEL: Optional[str] = None
+    llm_adapter = _SharedLLMAdapter()
 
-    def __init__(self, name: str, session_id: str) -> None:
+    def __init__(self, name: str, session_id: str, template_manager: Optional[TemplateManager] = None) -> None:
         """
         Initializes the Agent with a name, TemplateManager, and LLMAdapter.
+        Agents share one TemplateManager per template path unless one is passed in.
         """
         self.name = name
-        self.template_manager = TemplateManager(self.TEMPLATE_PATH)
+        self.template_manager = template_manager or _get_template_manager(self.TEMPLATE_PATH)
         self.session_id = session_id
         logger.info(f"Agent {self.name} initialized with shared resources for session {session_id}.")
 
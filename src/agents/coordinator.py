@@ -1,11 +1,25 @@
 import json
+import os
+import re
+import textwrap
 from enum import Enum
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from src.agents.agent import Agent
+from src.llm_adapter import LLMAdapterRegistry
+from src.common.guardrails import has_risky_content, is_injection_attempt, needs_supervisor
+from src.common.io import json_loads
 from src.common.message import Message
+from src.common.response_cache import CachedLLMAdapter, ResponseCache
+from src.constants import (
+    CONTEXT_MAX_CHARS,
+    CONTEXT_MAX_PRODUCTS,
+    CONTEXT_MAX_SUMMARY_CHARS,
+    SUPERVISOR_STREAM_HOLDBACK_CHARS,
+)
 from src.common.logging import logger
 from src.memory.conversation import ConversationMemory
+from src.prompt.manage import TemplateManager
 
 
 class Intent(Enum):
@@ -20,45 +34,121 @@ class Intent(Enum):
     UNKNOWN = 5
 
 
+# Sub-agent handling each intent; intents not listed are answered by the coordinator itself
+_INTENT_TO_AGENT_NAME = {
+    Intent.ORDER_STATUS: "OrderStatusAgent",
+    Intent.PRODUCT_RECOMMENDATION: "ProductRecommendationAgent",
+    Intent.EARLY_RISERS_PROMOTION: "EarlyRisersPromotionAgent",
+}
+
+# Unambiguous intent cues, checked before asking the LLM. A query matching more than one group,
+# or mentioning an unsupported action, is left to the LLM.
+_FAST_INTENT_RE = re.compile(
+    r"(?P<ORDER_STATUS>#W\d+)"
+    r"|(?P<EARLY_RISERS_PROMOTION>\bearly\s*risers?\b)"
+    r"|(?P<PRODUCT_RECOMMENDATION>(?-i:\b[A-Z]{4}\d{3}\b)|\b(?:backpack|tent|jacket|ski|hiking\s+boot)s?\b)",
+    re.IGNORECASE,
+)
+_FAST_INTENT_VETO_RE = re.compile(
+    r"\b(?:buy|purchase|cart|checkout|pay|payment|refund|return|exchange|apply|cancel|change|update|modify|"
+    r"order(?!\s*#?W\d))\b",
+    re.IGNORECASE,
+)
+# Order and complaint cues: a query naming a product type for one of these is about an order, not a recommendation
+_PRODUCT_FAST_PATH_VETO_RE = re.compile(
+    r"\b(?:ordered|ship(?:ped|ping|ment)?|arriv(?:e|ed|al)|deliver(?:y|ed)?|track(?:ing)?|where(?:'s|\s+is)|"
+    r"broken|damaged|defective|missing|wrong|complain\w*)\b",
+    re.IGNORECASE,
+)
+_EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+_SKU_RE = re.compile(r"\b[A-Z]{4}\d{3}\b", re.ASCII)
+_HAS_WORD_CHAR_RE = re.compile(r"[^\W_]")  # Any letter or digit
+
+# Parsing the routing LLM's reply
+_JSON_CODE_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+_INTENT_JSON_RE = re.compile(r'\{[^{}]*"intent"[^{}]*\}', re.DOTALL)
+_INTENT_VALUE_RE = re.compile(r'"intent":\s*"([^"]+)"')
+# Reply in a supervised consolidation, possibly truncated before the closing quote
+_FINAL_REPLY_RE = re.compile(r'\s*\{\s*"final"\s*:\s*"(.*?)(?:"\s*\}\s*)?$', re.DOTALL)
+
+# Coordinator prompt templates, loaded once per agent
+_COORDINATOR_ACTIONS = ("route", "route_batch", "unknown", "consolidate", "consolidate_with_supervision", "supervisor")
+
+# Key information in delegate responses
+_RESPONSE_ORDER_INFO_RE = re.compile(r"#(?P<order>W\d+)|(?P<sku>SO[A-Z]{2}\d+)", re.ASCII)
+_RESPONSE_STATUS_RE = re.compile(r"delivered|fulfilled|in-transit|error", re.IGNORECASE)
+_ORDER_STATUS_PRIORITY = ("delivered", "fulfilled", "in-transit", "error")
+_RESPONSE_NAME_RE = re.compile(r"hello ([^!]+)!", re.IGNORECASE)
+_RESPONSE_SKU_RE = re.compile(r"(SO[A-Z]{2}\d+)", re.ASCII)
+_RESPONSE_PROMO_CODE_RE = re.compile(r"EARLY\d+[A-Z0-9]+", re.ASCII)
+
+
 class AdventureOutfittersAgent(Agent):
     """
     Adventure Outfitters customer service agent responsible for routing customer queries
     to specialized agents based on detected intent and generating consolidated responses.
     """
 
-    def __init__(self, name: str, sub_agents: List[Agent], session_id: str):
+    # Intent detection is a small classification task, so it can run on a smaller, faster model than
+    # the replies; None uses LLM_MODEL
+    ROUTING_LLM_MODEL: Optional[str] = os.getenv("INTENT_LLM_MODEL") or None
+
+    # Routing replies shared by every coordinator; only low-temperature requests are cached
+    _routing_cache = ResponseCache()
+
+    def __init__(
+        self,
+        name: str,
+        sub_agents: List[Agent],
+        session_id: str,
+        template_manager: Optional[TemplateManager] = None,
+    ):
         """
         Initializes the AdventureOutfittersAgent with a set of sub-agents.
         """
-        super().__init__(name, session_id)
+        super().__init__(name, session_id, template_manager)
         self.sub_agents = {agent.name: agent for agent in sub_agents}
         self.conversation_memory = ConversationMemory()
+        # System prompts are static: byte-identical on every turn so providers can reuse the cached prefix
+        templates = {
+            action: self.template_manager.create_template("coordinator", action)
+            for action in _COORDINATOR_ACTIONS
+        }
+        self._system_prompts = {action: template["system"] for action, template in templates.items()}
+        self._user_templates = {action: template.get("user", "") for action, template in templates.items()}
+        routing_adapter = self.llm_adapter
+        if self.ROUTING_LLM_MODEL:
+            routing_adapter = LLMAdapterRegistry.get(self.LLM_PROVIDER, self.ROUTING_LLM_MODEL)
+        self._routing_llm = CachedLLMAdapter(routing_adapter, self._routing_cache)
         logger.info(f"{self.name} initialized with {len(self.sub_agents)} sub-agents.")
 
-    def determine_intent(self, query: str) -> tuple[Intent, dict]:
+    def determine_intent(self, query: str, context: Optional[str] = None) -> tuple[Intent, dict]:
         """
         Determines the customer's intent and extracts entities based on their query using the LLM.
         Now includes conversation context to better understand contextual references.
 
+        Args:
+            query (str): The customer's query
+            context (Optional[str]): Pre-computed conversation context string; read from memory if omitted
+
         Returns:
             tuple: (Intent, entities_dict)
         """
         logger.info(f"Determining intent for query: '{query}'")
-        try:
+        fast_match = self._match_intent_fast(query)
+        if fast_match is not None:
+            return fast_match
 
-            template = self.template_manager.create_template("coordinator", "route")
-            system_instructions = template.get("system", "")
+        try:
 
-            user_instructions = self.template_manager.fill_template(template.get("user", ""), query=query)
-            user_instructions += self._get_conversation_context_string(query)
+            user_instructions = self.template_manager.fill_template(self._user_templates["route"], query=query)
 
-            messages = [
-                {"role": "system", "content": system_instructions},
-                {"role": "user", "content": user_instructions},
-            ]
+            if context is None:
+                context = self._get_conversation_context_string(query)
+            messages = self._prompt_messages("route", user_instructions, context)
 
-            response = self.llm_adapter.chat(
-                messages, temperature=0.1
+            response = self._routing_llm.chat(
+                messages, temperature=0.1, json_mode=True
             )  # Lower temperature for more deterministic intent detection
 
             if response.get("success"):
@@ -69,37 +159,36 @@ class AdventureOutfittersAgent(Agent):
                     # Try multiple parsing strategies
                     out_dict = None
 
-                    # Strategy 1: Direct JSON parsing
-                    if response_text.startswith("{") and response_text.endswith("}"):
-                        try:
-                            out_dict = json.loads(response_text)
-                        except json.JSONDecodeError:
-                            pass
+                    # Strategy 1: Direct JSON parsing, the normal case in JSON mode
+                    try:
+                        out_dict = json_loads(response_text)
+                    except json.JSONDecodeError:
+                        pass
+                    if not isinstance(out_dict, dict):
+                        out_dict = None
 
                     # Strategy 2: Extract JSON from markdown code blocks
                     if out_dict is None:
-                        import re
-
                         # Look for JSON in code blocks
-                        json_match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", response_text, re.DOTALL)
+                        json_match = _JSON_CODE_BLOCK_RE.search(response_text)
                         if json_match:
                             try:
-                                out_dict = json.loads(json_match.group(1))
+                                out_dict = json_loads(json_match.group(1))
                             except json.JSONDecodeError:
                                 pass
 
                     # Strategy 3: Extract any JSON-like structure
                     if out_dict is None:
-                        json_match = re.search(r'\{[^{}]*"intent"[^{}]*\}', response_text, re.DOTALL)
+                        json_match = _INTENT_JSON_RE.search(response_text)
                         if json_match:
                             try:
-                                out_dict = json.loads(json_match.group())
+                                out_dict = json_loads(json_match.group())
                             except json.JSONDecodeError:
                                 pass
 
                     # Strategy 4: Look for intent value directly
                     if out_dict is None:
-                        intent_match = re.search(r'"intent":\s*"([^"]+)"', response_text)
+                        intent_match = _INTENT_VALUE_RE.search(response_text)
                         if intent_match:
                             out_dict = {"intent": intent_match.group(1), "entities": {}}
 
@@ -110,18 +199,15 @@ class AdventureOutfittersAgent(Agent):
                     intent_str = out_dict.get("intent", "UNKNOWN").upper()
                     entities = out_dict.get("entities", {})
 
-                    context_info = self.conversation_memory.get_contextual_info(query)
-                    if context_info and intent_str == "PRODUCT_RECOMMENDATION":
-                        if context_info.get("referenced_products"):
-                            entities["ReferencedProducts"] = context_info["referenced_products"]
-                        if context_info.get("referenced_order"):
-                            entities["ReferencedOrder"] = context_info["referenced_order"]
+                    if intent_str == "PRODUCT_RECOMMENDATION":
+                        self._add_contextual_entities(query, entities)
 
                     logger.info(f"Determined intent: {intent_str}")
                     logger.info(f"Extracted entities: {entities}")
 
-                    if intent_str in [intent.name for intent in Intent]:
-                        return Intent[intent_str], entities
+                    intent = Intent.__members__.get(intent_str)
+                    if intent is not None:
+                        return intent, entities
                     else:
                         logger.warning(f"Invalid intent '{intent_str}', defaulting to UNKNOWN")
                         return Intent.UNKNOWN, {}
@@ -138,10 +224,124 @@ class AdventureOutfittersAgent(Agent):
             logger.error(f"Unexpected error while determining intent: {e}")
             return Intent.UNKNOWN, {}
 
+    def determine_intents(self, queries: List[str], batch_size: int = 40) -> List[tuple[Intent, dict]]:
+        """
+        Determine the intents and entities of many independent queries, e.g. for replaying or
+        re-classifying logged conversations. Queries the regex fast path can't settle are sent to
+        the LLM batch_size at a time, in one request per batch; queries missing from a batch reply
+        are routed one by one. Conversation memory is neither read nor updated, so use
+        determine_intent() for live turns.
+
+        Returns:
+            list: (Intent, entities_dict) per query, in input order
+        """
+        results: List[Optional[tuple[Intent, dict]]] = [self._match_intent_fast(query) for query in queries]
+        pending = [index for index, result in enumerate(results) if result is None]
+
+        batch_size = max(1, batch_size)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start : start + batch_size]
+            numbered = "\n".join(f"{number}. {json.dumps(queries[index])}" for number, index in enumerate(batch, 1))
+            user_instructions = self.template_manager.fill_template(
+                self._user_templates["route_batch"], queries=numbered
+            )
+            response = self._routing_llm.chat(
+                self._prompt_messages("route", user_instructions), temperature=0.1, json_mode=True
+            )
+
+            if response.get("success"):
+                for number, (intent, entities) in self._parse_batch_intents(response["content"]).items():
+                    if 1 <= number <= len(batch):
+                        results[batch[number - 1]] = (intent, entities)
+            else:
+                logger.error(f"Batch intent request failed: {response.get('error')}")
+
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = self.determine_intent(queries[index])
+        return results
+
+    @staticmethod
+    def _parse_batch_intents(response_text: str) -> dict:
+        """
+        Parse a batch routing reply into {query number: (Intent, entities)}, skipping malformed entries.
+        """
+        try:
+            out = json_loads(response_text.strip())
+        except json.JSONDecodeError:
+            json_match = _JSON_CODE_BLOCK_RE.search(response_text)
+            try:
+                out = json_loads(json_match.group(1)) if json_match else None
+            except json.JSONDecodeError:
+                out = None
+
+        entries = out.get("results") if isinstance(out, dict) else out
+        if not isinstance(entries, list):
+            logger.error(f"No intent list found in batch response: {response_text}")
+            return {}
+
+        parsed = {}
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get("index"), int):
+                continue
+            intent = Intent.__members__.get(str(entry.get("intent", "UNKNOWN")).upper(), Intent.UNKNOWN)
+            entities = entry.get("entities") if isinstance(entry.get("entities"), dict) else {}
+            parsed[entry["index"]] = (intent, entities)
+        return parsed
+
+    def _match_intent_fast(self, query: str) -> Optional[tuple[Intent, dict]]:
+        """
+        Classify queries with a single unambiguous cue (an order number, a SKU or product type,
+        or the Early Risers promotion) without an LLM call, extracting entities with regexes.
+
+        Returns:
+            tuple: (Intent, entities_dict), or None if the LLM should decide
+        """
+        if _FAST_INTENT_VETO_RE.search(query):
+            return None
+        groups = {match.lastgroup: match.group() for match in _FAST_INTENT_RE.finditer(query)}
+        if len(groups) != 1:
+            return None
+
+        intent_str, matched = next(iter(groups.items()))
+        entities = {}
+        if intent_str == "ORDER_STATUS":
+            entities["OrderNumber"] = matched.upper()
+            email = _EMAIL_RE.search(query)
+            if email:
+                entities["Email"] = email.group()
+        elif intent_str == "PRODUCT_RECOMMENDATION":
+            if _PRODUCT_FAST_PATH_VETO_RE.search(query):
+                return None
+            sku = _SKU_RE.search(query)
+            if sku:
+                entities["SKU"] = sku.group()
+            else:
+                entities["ProductName"] = matched.lower()
+            self._add_contextual_entities(query, entities)
+
+        logger.info(f"Determined intent without LLM: {intent_str}")
+        logger.info(f"Extracted entities: {entities}")
+        return Intent[intent_str], entities
+
+    def _add_contextual_entities(self, query: str, entities: dict) -> None:
+        """
+        Add products and orders referenced from earlier in the conversation to product entities.
+        """
+        context_info = self.conversation_memory.get_contextual_info(query)
+        if context_info:
+            if context_info.get("referenced_products"):
+                entities["ReferencedProducts"] = context_info["referenced_products"]
+            if context_info.get("referenced_order"):
+                entities["ReferencedOrder"] = context_info["referenced_order"]
+
     def _format_context_for_llm(self, context_info: dict) -> str:
         """
         Format conversation context information for the LLM.
 
+        Product lists keep only the last CONTEXT_MAX_PRODUCTS SKUs and the text is capped at
+        CONTEXT_MAX_CHARS, so the prompt stays the same size however long the session runs.
+
         Args:
             context_info (dict): Context information from ConversationMemory
 
@@ -154,125 +354,233 @@ class AdventureOutfittersAgent(Agent):
             order = context_info["referenced_order"]
             order_num = order.get("order_number")
             customer = order.get("customer_name")
-            products = order.get("products", [])
+            products = order.get("products", [])[-CONTEXT_MAX_PRODUCTS:]
             context_parts.append(f"Recently looked up order: {order_num} for {customer} " f"with products {products}")
 
         if context_info.get("referenced_products"):
-            products = context_info["referenced_products"]
+            products = context_info["referenced_products"][-CONTEXT_MAX_PRODUCTS:]
             context_parts.append(f"Recently mentioned products: {products}")
 
         if context_info.get("customer_email"):
             context_parts.append(f"Customer email: {context_info['customer_email']}")
 
         if context_info.get("recent_interactions_summary"):
-            context_parts.append(f"Recent activity: {context_info['recent_interactions_summary']}")
+            summary = textwrap.shorten(
+                context_info["recent_interactions_summary"], CONTEXT_MAX_SUMMARY_CHARS, placeholder="..."
+            )
+            context_parts.append(f"Recent activity: {summary}")
 
-        return "\n".join(context_parts) if context_parts else "No relevant context available."
+        if not context_parts:
+            return "No relevant context available."
+        context = "\n".join(context_parts)
+        return context if len(context) <= CONTEXT_MAX_CHARS else context[: CONTEXT_MAX_CHARS - 3] + "..."
 
-    def _generate_unknown_intent_response(self, query: str) -> Message:
+    def _generate_unknown_intent_response(
+        self, query: str, context_summary: Optional[str] = None, max_output_tokens: Optional[int] = None
+    ) -> Message:
         """
         Generate an LLM response for UNKNOWN intent queries using conversation context.
 
         Args:
             query (str): The user's query that couldn't be handled
+            context_summary (Optional[str]): Pre-computed conversation context; read from memory if omitted
+            max_output_tokens (Optional[int]): Cap on the generated response length
 
         Returns:
             Message: Generated response acknowledging the unsupported request
         """
         try:
-            template = self.template_manager.create_template("coordinator", "unknown")
-            system_instructions = template.get("system", "")
+            unknown_response = self._draft_unknown_intent_response(query, context_summary, max_output_tokens)
+            if unknown_response is None:
+                # Fallback to static response if LLM fails
+                return self._welcome_message()
+
+            # The unknown-intent prompt carries the guardrails itself, so there's no separate supervisor pass
+            return Message(content=unknown_response, sender=self.name, recipient="Customer")
+
+        except Exception as e:
+            logger.error(f"Error generating UNKNOWN intent response: {e}")
+            # Fallback to static response if there's an error
+            return self._welcome_message()
+
+    def _draft_unknown_intent_response(
+        self, query: str, context_summary: Optional[str] = None, max_output_tokens: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Generate the UNKNOWN intent reply. Its prompt includes the security guardrails.
 
-            # Format context information for the LLM
+        Returns:
+            Optional[str]: The drafted reply, or None if the LLM call failed
+        """
+        logger.info(f"Generating UNKNOWN intent response for query: '{query}'")
+
+        messages = self._unknown_intent_messages(query, context_summary)
+
+        response = self.llm_adapter.chat(
+            messages, temperature=0.5, max_output_tokens=max_output_tokens
+        )  # Higher temperature for more varied responses
+
+        if response.get("success"):
+            return response["content"].strip()
+
+        logger.error(f"UNKNOWN intent response generation failed: {response.get('error')}")
+        return None
+
+    def _unknown_intent_messages(self, query: str, context_summary: Optional[str] = None) -> List[dict]:
+        """
+        Build the prompt for an UNKNOWN intent reply, reading the conversation context from memory if
+        it isn't given.
+        """
+        # Format context information for the LLM
+        if context_summary is None:
             context_summary = self._get_conversation_context_string(query)
 
-            user_instructions = self.template_manager.fill_template(
-                template.get("user", ""), query=query, context_info=context_summary
-            )
+        user_instructions = self.template_manager.fill_template(
+            self._user_templates["unknown"], query=query, context_info=context_summary
+        )
+        return self._prompt_messages("unknown", user_instructions)
 
-            logger.info(f"Generating UNKNOWN intent response for query: '{query}'")
+    def _consolidation_messages(self, turn: dict, action: str = "consolidate") -> List[dict]:
+        """
+        Build the prompt that turns the sub-agent summary into a branded reply.
+        """
+        user_instructions = self.template_manager.fill_template(
+            self._user_templates[action], query=turn["query"], summary=turn["summary"], intent=turn["intent"].name
+        )
+        return self._prompt_messages(action, user_instructions, turn["context"])
+
+    def _draft_consolidated_response(
+        self, turn: dict, max_output_tokens: Optional[int] = None, supervised: bool = False
+    ) -> Optional[str]:
+        """
+        Consolidate the sub-agent summary into a branded reply.
 
-            messages = [
-                {"role": "system", "content": system_instructions},
-                {"role": "user", "content": user_instructions},
-            ]
+        Args:
+            turn (dict): Turn prepared by prepare_turn()
+            max_output_tokens (Optional[int]): Cap on the generated response length
+            supervised (bool): Apply the supervisor guardrails in the same call, so the reply needs no
+                separate review. The model answers in JSON, so this isn't used when streaming.
 
-            response = self.llm_adapter.chat(messages, temperature=0.5)  # Higher temperature for more varied responses
+        Returns:
+            Optional[str]: The consolidated reply, or None if the LLM call failed
+        """
+        action = "consolidate_with_supervision" if supervised else "consolidate"
 
-            if response.get("success"):
-                unknown_response = response["content"].strip()
-                
-                # Apply supervisor guardrails
-                supervisor_template = self.template_manager.create_template("coordinator", "supervisor")
-                supervisor_system = self.template_manager.fill_template(
-                    supervisor_template.get("system", ""), query=query, consolidated_response=unknown_response
-                )
-                supervisor_user = self.template_manager.fill_template(
-                    supervisor_template.get("user", ""), query=query, consolidated_response=unknown_response
-                )
-                
-                supervisor_messages = [
-                    {"role": "system", "content": supervisor_system},
-                    {"role": "user", "content": supervisor_user},
-                ]
-                
-                supervisor_response = self.llm_adapter.chat(supervisor_messages)
-                
-                if supervisor_response.get("success"):
-                    response_text = supervisor_response["content"].strip()
-                else:
-                    logger.error(f"Supervisor failed for unknown intent: {supervisor_response.get('error')}")
-                    response_text = unknown_response
-                    
-                return Message(content=response_text, sender=self.name, recipient="Customer")
-            else:
-                logger.error(f"UNKNOWN intent response generation failed: {response.get('error')}")
-                # Fallback to static response if LLM fails
-                welcome_msg = (
-                    "🏔️ Hello there, fellow adventurer! I'm here to help you with "
-                    "your Adventure Outfitters experience! 🌟\n\n🎒 I can help you with:\n"
-                    "• **Order Status & Tracking** - Check your order status and get "
-                    "tracking information\n• **Product Recommendations** - Find the "
-                    "perfect outdoor gear for your next adventure\n\nJust let me know "
-                    "what you need, and I'll get you equipped for your journey! "
-                    "Onward into the unknown! 🏔️"
-                )
-                return Message(
-                    content=welcome_msg,
-                    sender=self.name,
-                    recipient="Customer",
-                )
+        logger.info("Generating final response for the customer.")
 
-        except Exception as e:
-            logger.error(f"Error generating UNKNOWN intent response: {e}")
-            # Fallback to static response if there's an error
-            welcome_msg = (
-                "🏔️ Hello there, fellow adventurer! I'm here to help you with "
-                "your Adventure Outfitters experience! 🌟\n\n🎒 I can help you with:\n"
-                "• **Order Status & Tracking** - Check your order status and get "
-                "tracking information\n• **Product Recommendations** - Find the "
-                "perfect outdoor gear for your next adventure\n\nJust let me know "
-                "what you need, and I'll get you equipped for your journey! "
-                "Onward into the unknown! 🏔️"
-            )
-            return Message(
-                content=welcome_msg,
-                sender=self.name,
-                recipient="Customer",
-            )
+        # Consolidate the final response with Adventure Outfitters branding
+        messages = self._consolidation_messages(turn, action)
+
+        response = self.llm_adapter.chat(messages, max_output_tokens=max_output_tokens, json_mode=supervised)
+
+        if response.get("success"):
+            response_text = response["content"].strip()
+            return self._parse_final_reply(response_text) if supervised else response_text
+
+        logger.error(f"Final response generation failed: {response.get('error')}")
+        return None
+
+    @staticmethod
+    def _parse_final_reply(response_text: str) -> str:
+        """
+        Extract the reply from a supervised consolidation's {"final": ...} JSON. A reply cut short by
+        the output token cap is recovered as far as it got; text that isn't JSON is used as is.
+        """
+        try:
+            out_dict = json_loads(response_text)
+            if isinstance(out_dict, dict) and isinstance(out_dict.get("final"), str):
+                return out_dict["final"].strip()
+        except json.JSONDecodeError:
+            pass
+
+        final_match = _FINAL_REPLY_RE.match(response_text)
+        if final_match is None:
+            logger.warning("Supervised consolidation didn't return JSON, using the raw reply")
+            return response_text
+
+        partial = final_match.group(1).rstrip("\\")  # Drop a dangling escape from a truncated reply
+        try:
+            return json.loads(f'"{partial}"').strip()
+        except json.JSONDecodeError:
+            return partial.replace("\\n", "\n").replace('\\"', '"').strip()
+
+    def _supervisor_messages(self, query: str, draft_response: str) -> List[dict]:
+        """
+        Build the supervisor guardrail prompt that reviews a drafted reply.
+        """
+        supervisor_user = self.template_manager.fill_template(
+            self._user_templates["supervisor"], query=query, consolidated_response=draft_response
+        )
+
+        return self._prompt_messages("supervisor", supervisor_user)
+
+    def _prompt_messages(self, action: str, user_instructions: str, context: str = "") -> List[dict]:
+        """
+        Build the chat messages for a coordinator prompt: the static system prompt first, then the
+        per-turn user instructions, then the conversation context (if any) as its own trailing message.
+        """
+        messages = [
+            {"role": "system", "content": self._system_prompts[action]},
+            {"role": "user", "content": user_instructions},
+        ]
+        if context:
+            messages.append({"role": "user", "content": context})
+        return messages
+
+    def _welcome_message(self) -> Message:
+        """
+        Static introduction used when an UNKNOWN intent reply can't be generated.
+        """
+        welcome_msg = (
+            "🏔️ Hello there, fellow adventurer! I'm here to help you with "
+            "your Adventure Outfitters experience! 🌟\n\n🎒 I can help you with:\n"
+            "• **Order Status & Tracking** - Check your order status and get "
+            "tracking information\n• **Product Recommendations** - Find the "
+            "perfect outdoor gear for your next adventure\n\nJust let me know "
+            "what you need, and I'll get you equipped for your journey! "
+            "Onward into the unknown! 🏔️"
+        )
+        return Message(
+            content=welcome_msg,
+            sender=self.name,
+            recipient="Customer",
+            metadata={"fallback": True},
+        )
+
+    def _empty_query_message(self) -> Message:
+        """
+        Static reply for a message with no words in it.
+        """
+        empty_msg = (
+            "🏔️ I didn't catch that, adventurer! Could you tell me what you need? I can check "
+            "your order status or help you find the perfect gear. Onward into the unknown! 🌟"
+        )
+        return Message(
+            content=empty_msg,
+            sender=self.name,
+            recipient="Customer",
+        )
+
+    def _generation_failed_message(self) -> Message:
+        """
+        Static reply used when the consolidated response can't be generated.
+        """
+        error_msg = (
+            "🏔️ I encountered an issue while processing your request. "
+            "Please try again! Onward into the unknown! 🌟"
+        )
+        return Message(
+            content=error_msg,
+            sender=self.name,
+            recipient="Customer",
+            metadata={"fallback": True},
+        )
 
     def route_to_agent(self, intent: Intent) -> Optional[Agent]:
         """
         Routes the query to the appropriate sub-agent based on the determined intent.
         """
-        intent_to_agent = {
-            Intent.ORDER_STATUS: "OrderStatusAgent",
-            Intent.PRODUCT_RECOMMENDATION: "ProductRecommendationAgent",
-            Intent.EARLY_RISERS_PROMOTION: "EarlyRisersPromotionAgent",
-            Intent.UNKNOWN: None,
-        }
-
-        agent_name = intent_to_agent.get(intent)
+        agent_name = _INTENT_TO_AGENT_NAME.get(intent)
         if not agent_name:
             logger.info(f"No valid agent found for intent: {intent}")
             return None
@@ -280,18 +588,38 @@ class AdventureOutfittersAgent(Agent):
         logger.info(f"Routing to agent: '{agent_name}'")
         return self.sub_agents.get(agent_name)
 
-    def process(self, message: Message) -> Message:
+    def process(self, message: Message, max_output_tokens: Optional[int] = None) -> Message:
         """
         Processes the incoming message, determines intent, routes to the appropriate sub-agent,
         and returns a consolidated response. Now includes conversation memory management.
+        max_output_tokens caps the length of the generated customer-facing response.
+        """
+        return self.complete_turn(self.prepare_turn(message), max_output_tokens)
+
+    def prepare_turn(self, message: Message) -> dict:
+        """
+        Runs the stateful part of a turn: intent detection, delegation to the sub-agent and the
+        conversation memory update.
+
+        Everything the response generation needs is captured in the returned turn, so
+        complete_turn() no longer reads agent state and the next turn can be prepared while
+        this one is still being consolidated.
         """
         logger.info(f"{self.name} processing message: '{message.content}'")
 
         try:
             query = message.content
 
+            # Nothing to route in an empty or punctuation-only message, so skip the LLM entirely
+            if not _HAS_WORD_CHAR_RE.search(query):
+                logger.info("Query has no words, asking the customer to rephrase")
+                return {"response": self._empty_query_message()}
+
+            # Memory is unchanged until this turn is recorded, so routing and consolidation share one context
+            past_conversation_context = self._get_conversation_context_string(query)
+
             # Determine the customer's intent and extract entities
-            intent, entities = self.determine_intent(query)
+            intent, entities = self.determine_intent(query, past_conversation_context)
 
             # Route to the appropriate sub-agent
             sub_agent = self.route_to_agent(intent)
@@ -300,12 +628,9 @@ class AdventureOutfittersAgent(Agent):
                 self.conversation_memory.add_interaction(
                     intent=intent.name, query=query, entities=entities, agent_used="None", key_info={}
                 )
-
-                # Generate LLM response for UNKNOWN intent with conversation context
-                return self._generate_unknown_intent_response(query)
+                return {"query": query, "intent": intent, "context": self._get_conversation_context_string(query)}
 
             summary = ""
-            past_conversation_context = self._get_conversation_context_string(query)
             if sub_agent is not None:
                 # Create message with entities in metadata
                 sub_message = Message(
@@ -328,78 +653,181 @@ class AdventureOutfittersAgent(Agent):
                     intent=intent.name, query=query, entities=entities, agent_used=sub_agent.name, key_info=key_info
                 )
 
-            # Consolidate the final response with Adventure Outfitters branding
-            template = self.template_manager.create_template("coordinator", "consolidate")
-            system_instructions = self.template_manager.fill_template(
-                template.get("system", ""), query=query, summary=summary, intent=intent.name
-            )
-            user_instructions = self.template_manager.fill_template(
-                template.get("user", ""), query=query, summary=summary
-            )
+            return {"query": query, "intent": intent, "summary": summary, "context": past_conversation_context}
 
-            user_instructions += past_conversation_context
+        except Exception as e:
+            return {"response": self._processing_error_message(e)}
 
-            logger.info("Generating final response for the customer.")
+    def complete_turn(self, turn: dict, max_output_tokens: Optional[int] = None) -> Message:
+        """
+        Generates the customer-facing response for a turn prepared by prepare_turn(),
+        optionally capped at max_output_tokens.
+        """
+        if "response" in turn:
+            return turn["response"]
 
-            messages = [
-                {"role": "system", "content": system_instructions},
-                {"role": "user", "content": user_instructions},
-            ]
+        try:
+            query = turn["query"]
 
-            response = self.llm_adapter.chat(messages)
+            if turn["intent"] == Intent.UNKNOWN:
+                # Generate LLM response for UNKNOWN intent with conversation context
+                return self._generate_unknown_intent_response(query, turn["context"], max_output_tokens)
 
-            if response.get("success"):
-                consolidated_response = response["content"].strip()
-                
-                # Apply supervisor guardrails
-                supervisor_template = self.template_manager.create_template("coordinator", "supervisor")
-                supervisor_system = self.template_manager.fill_template(
-                    supervisor_template.get("system", ""), query=query, consolidated_response=consolidated_response
-                )
-                supervisor_user = self.template_manager.fill_template(
-                    supervisor_template.get("user", ""), query=query, consolidated_response=consolidated_response
-                )
-                
-                supervisor_messages = [
-                    {"role": "system", "content": supervisor_system},
-                    {"role": "user", "content": supervisor_user},
-                ]
-                
-                supervisor_response = self.llm_adapter.chat(supervisor_messages)
-                
-                if supervisor_response.get("success"):
-                    final_response_text = supervisor_response["content"].strip()
-                else:
-                    logger.error(f"Supervisor failed, using consolidated response: {supervisor_response.get('error')}")
-                    final_response_text = consolidated_response
-                    
-                return Message(content=final_response_text, sender=self.name, recipient="Customer")
+            # One call drafts the reply and applies the supervisor guardrails
+            final_response_text = self._draft_consolidated_response(turn, max_output_tokens, supervised=True)
+            if final_response_text is None:
+                return self._generation_failed_message()
+
+            return Message(content=final_response_text, sender=self.name, recipient="Customer")
+
+        except Exception as e:
+            return self._processing_error_message(e)
+
+    def complete_turn_stream(self, turn: dict, max_output_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Streaming counterpart of complete_turn(): yields the reply in chunks as the LLM generates it.
+
+        The text generated so far is run through the local content checks before each chunk is
+        sent, and the last SUPERVISOR_STREAM_HOLDBACK_CHARS are held back until the checks have seen
+        what follows them. The unreviewed length bound doesn't apply: a long reply can't be recalled
+        once partly sent, so it is checked for content instead. A reply flagged before anything was
+        sent is streamed through the supervisor instead; one flagged later is cut off before the
+        flagged text. Queries that look like prompt-injection attempts are drafted first and
+        streamed through the supervisor. Falls back to complete_turn() if the stream fails before
+        producing any text.
+        """
+        if "response" in turn:
+            yield turn["response"].content
+            return
+
+        query = turn["query"]
+        if is_injection_attempt(query):
+            yield from self._stream_reviewed_reply(turn, max_output_tokens)
+            return
+
+        try:
+            if turn["intent"] == Intent.UNKNOWN:
+                logger.info(f"Generating UNKNOWN intent response for query: '{query}'")
+                messages = self._unknown_intent_messages(query, turn["context"])
+                stream_args = {"temperature": 0.5}  # Same as the non-streamed unknown-intent reply
             else:
-                logger.error(f"Final response generation failed: {response.get('error')}")
-                error_msg = (
-                    "🏔️ I encountered an issue while processing your request. "
-                    "Please try again! Onward into the unknown! 🌟"
-                )
-                return Message(
-                    content=error_msg,
-                    sender=self.name,
-                    recipient="Customer",
-                )
+                logger.info("Generating final response for the customer.")
+                messages = self._consolidation_messages(turn)
+                stream_args = {}
+        except Exception as e:
+            yield self._processing_error_message(e).content
+            return
 
+        draft_response = ""
+        sent = 0
+        flagged = False
+        try:
+            stream = self.llm_adapter.chat_stream(messages, max_output_tokens=max_output_tokens, **stream_args)
+            for chunk in stream:
+                draft_response += chunk
+                # The last word may still be growing, so mid-stream only whole words are checked
+                checked = self._whole_words_end(draft_response, len(draft_response))
+                if has_risky_content(query, draft_response[:checked]):
+                    flagged = True
+                    break
+                release = self._whole_words_end(draft_response, checked - SUPERVISOR_STREAM_HOLDBACK_CHARS)
+                if release > sent:
+                    yield draft_response[sent:release]
+                    sent = release
+
+            if flagged and not sent:
+                # The supervisor reviews the whole draft
+                draft_response += "".join(stream)
+            flagged = flagged or has_risky_content(query, draft_response)
         except Exception as e:
-            import traceback
+            logger.error(f"Response stream failed: {e}")
+            if not sent:
+                yield self.complete_turn(turn, max_output_tokens).content
+            return
+
+        if not flagged:
+            yield draft_response[sent:]
+        elif sent:
+            logger.warning("Streamed reply flagged by the guardrails after part of it was sent, withholding the rest")
+        else:
+            yield from self._stream_supervisor(query, draft_response, max_output_tokens)
+
+    @staticmethod
+    def _whole_words_end(text: str, end: int) -> int:
+        """
+        Index just past the last whitespace in text[:end], or 0 if there is none.
+        """
+        end = max(0, end)
+        return max(text.rfind(" ", 0, end), text.rfind("\n", 0, end)) + 1
 
-            traceback.print_exc()
-            logger.error(f"Unexpected error during processing: {e.with_traceback(e.__traceback__)}")
-            error_msg = (
-                "🏔️ I encountered an error while processing your request. "
-                "Please try again later! Onward into the unknown! 🌟"
-            )
-            return Message(
-                content=error_msg,
-                sender=self.name,
-                recipient="Customer",
-            )
+    def _stream_reviewed_reply(self, turn: dict, max_output_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Draft the reply, then stream the supervisor's final wording of it. Falls back to the same
+        static or drafted replies as complete_turn() when a step fails.
+        """
+        query = turn["query"]
+        try:
+            if turn["intent"] == Intent.UNKNOWN:
+                draft_response = self._draft_unknown_intent_response(query, turn["context"], max_output_tokens)
+                fallback = self._welcome_message
+            else:
+                draft_response = self._draft_consolidated_response(turn, max_output_tokens)
+                fallback = self._generation_failed_message
+        except Exception as e:
+            if turn["intent"] == Intent.UNKNOWN:
+                logger.error(f"Error generating UNKNOWN intent response: {e}")
+                yield self._welcome_message().content
+            else:
+                yield self._processing_error_message(e).content
+            return
+
+        if draft_response is None:
+            yield fallback().content
+            return
+
+        if not needs_supervisor(query, draft_response):
+            yield draft_response
+            return
+
+        yield from self._stream_supervisor(query, draft_response, max_output_tokens)
+
+    def _stream_supervisor(
+        self, query: str, draft_response: str, max_output_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Apply the supervisor guardrails to a drafted reply, streaming the supervisor's output.
+        Falls back to the draft if the stream fails before producing any text.
+        """
+        streamed = False
+        try:
+            for chunk in self.llm_adapter.chat_stream(
+                self._supervisor_messages(query, draft_response), max_output_tokens=max_output_tokens
+            ):
+                streamed = True
+                yield chunk
+        except Exception as e:
+            logger.error(f"Supervisor stream failed: {e}")
+            if not streamed:
+                yield draft_response
+
+    def _processing_error_message(self, e: Exception) -> Message:
+        """
+        Logs an unexpected processing error and returns the customer-facing error message.
+        """
+        import traceback
+
+        traceback.print_exc()
+        logger.error(f"Unexpected error during processing: {e.with_traceback(e.__traceback__)}")
+        error_msg = (
+            "🏔️ I encountered an error while processing your request. "
+            "Please try again later! Onward into the unknown! 🌟"
+        )
+        return Message(
+            content=error_msg,
+            sender=self.name,
+            recipient="Customer",
+            metadata={"fallback": True},
+        )
 
     def _extract_key_info_from_response(self, intent: Intent, sub_response: Message, entities: dict) -> dict:
         """
@@ -415,50 +843,40 @@ class AdventureOutfittersAgent(Agent):
         """
         try:
             key_info = {}
-            response_content = sub_response.content.lower()
-
             if intent == Intent.ORDER_STATUS:
-                # Extract order information from the response
-                import re
-
-                # Look for order number
-                order_match = re.search(r"#(W\d+)", sub_response.content)
-                if order_match:
-                    key_info["order_number"] = f"#{order_match.group(1)}"
-
-                # Look for customer name
-                name_match = re.search(r"hello ([^!]+)!", sub_response.content, re.IGNORECASE)
+                # Order number and product SKUs in one pass over the response
+                content = sub_response.content
+                products = []
+                for match in _RESPONSE_ORDER_INFO_RE.finditer(content):
+                    if match.lastgroup == "sku":
+                        products.append(match.group("sku"))
+                    elif "order_number" not in key_info:
+                        key_info["order_number"] = f"#{match.group('order')}"
+
+                # Customer name is matched on its own: "hello ...!" can span order numbers and SKUs
+                name_match = _RESPONSE_NAME_RE.search(content)
                 if name_match:
                     key_info["customer_name"] = name_match.group(1).strip()
 
-                # Look for products (SKUs)
-                product_matches = re.findall(r"(SO[A-Z]{2}\d+)", sub_response.content)
-                if product_matches:
-                    key_info["products"] = product_matches
-
-                # Look for status
-                if "delivered" in response_content:
-                    key_info["status"] = "delivered"
-                elif "fulfilled" in response_content:
-                    key_info["status"] = "fulfilled"
-                elif "in-transit" in response_content:
-                    key_info["status"] = "in-transit"
-                elif "error" in response_content:
-                    key_info["status"] = "error"
+                if products:
+                    key_info["products"] = products
+
+                # First status in priority order among those mentioned
+                mentioned = {status.lower() for status in _RESPONSE_STATUS_RE.findall(content)}
+                for status in _ORDER_STATUS_PRIORITY:
+                    if status in mentioned:
+                        key_info["status"] = status
+                        break
 
             elif intent == Intent.PRODUCT_RECOMMENDATION:
                 # Extract mentioned products from product recommendations
-                import re
-
-                product_matches = re.findall(r"(SO[A-Z]{2}\d+)", sub_response.content)
+                product_matches = _RESPONSE_SKU_RE.findall(sub_response.content)
                 if product_matches:
                     key_info["products_mentioned"] = product_matches
 
             elif intent == Intent.EARLY_RISERS_PROMOTION:
                 # Extract promo code if generated
-                import re
-
-                promo_match = re.search(r"EARLY\d+[A-Z0-9]+", sub_response.content)
+                promo_match = _RESPONSE_PROMO_CODE_RE.search(sub_response.content)
                 if promo_match:
                     key_info["promo_code"] = promo_match.group()
 
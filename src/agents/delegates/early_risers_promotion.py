@@ -1,13 +1,21 @@
 import os
-import uuid
+import secrets
+import threading
 from datetime import datetime
-
-import pytz
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
 
 from src.agents.agent import Agent
 from src.common.message import Message
 from src.common.logging import logger
-from src.common.io import ensure_directory_exists, load_json, save_json
+from src.common.io import JsonWriteBehind, load_json, load_jsonl_from
+from src.constants import EARLY_RISERS_END_HOUR, EARLY_RISERS_START_HOUR, EARLY_RISERS_TIMEZONE
+from src.prompt.manage import TemplateManager
+
+_PACIFIC = ZoneInfo(EARLY_RISERS_TIMEZONE)
+
+# Promo code saves happen off the request path
+_promo_writer = JsonWriteBehind()
 
 
 class EarlyRisersPromotionAgent(Agent):
@@ -15,58 +23,94 @@ class EarlyRisersPromotionAgent(Agent):
     Agent responsible for handling Early Risers promotion requests (8-10 AM Pacific Time).
     """
 
-    def __init__(self, name: str, session_id: str):
-        super().__init__(name, session_id)
-        self.promo_db_path = "./data/promo_codes.json"
+    # Promo codes by session for each log file, with the byte offset the log has been read up to
+    _promo_code_cache: Dict[str, Tuple[int, dict]] = {}
+    _promo_code_lock = threading.Lock()
+
+    def __init__(self, name: str, session_id: str, template_manager: Optional[TemplateManager] = None):
+        super().__init__(name, session_id, template_manager)
+        self.promo_db_path = "./data/promo_codes.jsonl"
+        # Codes were kept in one JSON file before the append-only log
+        self.legacy_promo_db_path = "./data/promo_codes.json"
         self.promo_codes = self._load_promo_codes()
 
     def _load_promo_codes(self) -> dict:
         """
-        Load existing promo codes from the database.
+        Get the promo codes keyed by session id. The dict is shared by every agent using the same
+        log, and only the records appended since the last read (by this process or another) are
+        read into it; codes issued in this process that haven't been written yet are kept. Codes
+        from the legacy JSON file are read when the dict is first built, so sessions that got a
+        code before the switch keep it.
+        """
+        try:
+            size = os.path.getsize(self.promo_db_path)
+        except OSError:
+            size = 0
+
+        with self._promo_code_lock:
+            cached = self._promo_code_cache.get(self.promo_db_path)
+            if cached is not None and cached[0] == size:
+                return cached[1]
+
+            offset, promo_codes = cached if cached is not None else (0, self._load_legacy_promo_codes())
+            if size < offset:  # The log was replaced, so read it again from the start
+                offset = 0
+            records, offset = load_jsonl_from(self.promo_db_path, offset)
+            promo_codes.update(
+                (record["session_id"], {"promo_code": record["promo_code"], "generated_at": record["generated_at"]})
+                for record in records
+            )
+            self._promo_code_cache[self.promo_db_path] = (offset, promo_codes)
+            return promo_codes
+
+    def _load_legacy_promo_codes(self) -> dict:
+        """
+        Get the promo codes from the legacy JSON file, keyed by session id, or {} if there is none.
         """
-        if os.path.exists(self.promo_db_path):
-            return load_json(self.promo_db_path) or {}
-        return {}
+        if not os.path.exists(self.legacy_promo_db_path):
+            return {}
+        return load_json(self.legacy_promo_db_path) or {}
 
-    def _save_promo_codes(self):
+    def _save_promo_code(self, session_id: str) -> None:
         """
-        Save promo codes to the database.
+        Queue one session's promo code to be appended to the log in the background.
         """
-        ensure_directory_exists(os.path.dirname(self.promo_db_path))
-        save_json(self.promo_db_path, self.promo_codes)
+        _promo_writer.append(self.promo_db_path, {"session_id": session_id, **self.promo_codes[session_id]})
 
-    def is_early_risers_time(self) -> bool:
+    def is_early_risers_time(self, current_time: Optional[datetime] = None) -> bool:
         """
         Check if current time is within Early Risers promotion hours (8-10 AM Pacific).
         """
-        pacific = pytz.timezone("US/Pacific")
-        current_time = datetime.now(pacific)
-        current_hour = current_time.hour
+        if current_time is None:
+            current_time = datetime.now(_PACIFIC)
 
         # Early Risers promotion is active from 8:00 AM to 10:00 AM Pacific
-        return 7 <= current_hour < 10
+        return EARLY_RISERS_START_HOUR <= current_time.hour < EARLY_RISERS_END_HOUR
 
-    def generate_promo_code(self) -> str:
+    def generate_promo_code(self, current_time: Optional[datetime] = None) -> str:
         """
-        Generate a unique promo code for the customer.
+        Generate a unique promo code for the customer, dated current_time (defaults to now).
         """
-        # Create a unique code using date and UUID
-        timestamp_date = datetime.now().strftime("%Y%m%d")
-
-        # Check if the customer has already used a code today
-        if self.session_id in self.promo_codes:
-            return self.promo_codes[self.session_id]["promo_code"]
-
-        unique_id = str(uuid.uuid4())[:8].upper()
-        promo_code = f"EARLY{timestamp_date}{unique_id}"
-
-        # Store the promo code
-        self.promo_codes[self.session_id] = {
-            "promo_code": promo_code,
-            "generated_at": datetime.now().isoformat(),
-        }
-
-        self._save_promo_codes()
+        with self._promo_code_lock:
+            # Check if the customer has already used a code today
+            if self.session_id in self.promo_codes:
+                return self.promo_codes[self.session_id]["promo_code"]
+
+            # Create a unique code using the date and a random suffix
+            if current_time is None:
+                current_time = datetime.now(_PACIFIC)
+            timestamp_date = current_time.strftime("%Y%m%d")
+
+            unique_id = secrets.token_hex(4).upper()
+            promo_code = f"EARLY{timestamp_date}{unique_id}"
+
+            # Store the promo code
+            self.promo_codes[self.session_id] = {
+                "promo_code": promo_code,
+                "generated_at": current_time.isoformat(),
+            }
+
+        self._save_promo_code(self.session_id)
         return promo_code
 
     def process(self, message: Message) -> Message:
@@ -77,15 +121,13 @@ class EarlyRisersPromotionAgent(Agent):
         query = message.content
 
         try:
-            # Check if it's Early Risers time
-            if not self.is_early_risers_time():
-                pacific = pytz.timezone("US/Pacific")
-                current_time = datetime.now(pacific)
-                current_hour = current_time.hour
+            current_time = datetime.now(_PACIFIC)
 
+            # Check if it's Early Risers time
+            if not self.is_early_risers_time(current_time):
                 time_msg = (
                     f"🏔️ The Early Risers promotion is only available from 8:00 AM to "
-                    f"10:00 AM Pacific Time! It's currently {current_hour:02d}:"
+                    f"10:00 AM Pacific Time! It's currently {current_time.hour:02d}:"
                     f"{current_time.minute:02d} Pacific. Rise early tomorrow to catch "
                     f"this amazing 10% discount! Onward into the unknown! 🌅"
                 )
@@ -96,23 +138,16 @@ class EarlyRisersPromotionAgent(Agent):
                 )
 
             # Generate unique promo code
-            promo_code = self.generate_promo_code()
-
-            pacific = pytz.timezone("US/Pacific")
-            current_time = datetime.now(pacific)
+            promo_code = self.generate_promo_code(current_time)
 
             response_text = (
-                f"🌅 Good morning, early riser! You're up bright and early at "
+                "🌅 Good morning, early riser! You're up bright and early at "
                 f"{current_time.strftime('%I:%M %p')} Pacific Time! 🏔️\n\n"
-            )
-            response_text += f"🎉 Here's your exclusive Early Risers 10% discount code:\n\n"
-            response_text += f"**{promo_code}**\n\n"
-            response_text += (
-                f"✨ This code gives you 10% off your entire order! Use it at checkout before it expires.\n\n"
-            )
-            response_text += (
-                f"🌟 Thanks for being an early bird! The mountains are calling, and "
-                f"you're ready to answer! Onward into the unknown! 🏔️"
+                "🎉 Here's your exclusive Early Risers 10% discount code:\n\n"
+                f"**{promo_code}**\n\n"
+                "✨ This code gives you 10% off your entire order! Use it at checkout before it expires.\n\n"
+                "🌟 Thanks for being an early bird! The mountains are calling, and "
+                "you're ready to answer! Onward into the unknown! 🏔️"
             )
 
             logger.info(f"Generated promo code {promo_code} for session {self.session_id}")
@@ -1,11 +1,65 @@
 import json
 import re
+from typing import Dict, List, Optional, Tuple
 
 from src.agents.agent import Agent
 from src.common.message import Message
+from src.common.response_cache import CachedLLMAdapter, ResponseCache
 from src.common.logging import logger
 from src.memory.manage import StateManager
-from src.common.io import load_json
+from src.common.io import json_loads, load_json_shared
+from src.prompt.manage import TemplateManager
+
+_EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+# "#W001", or a bare "W001" standing on its own
+_ORDER_NUMBER_RE = re.compile(r"#(W\d+)|\b(W\d+)\b", re.ASCII)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_DIGIT_RE = re.compile(r"\d")
+_WHITESPACE_RE = re.compile(r"\s")
+_MAY_HOLD_ORDER_INFO_RE = re.compile(r"[@\d]")
+
+
+class _OrderIndex:
+    """
+    Lookup of orders by (casefolded email, order number without "#"), keeping the first order for each key.
+    """
+
+    def __init__(self, orders: list) -> None:
+        self.orders = orders
+        self.by_key: Dict[Tuple[str, str], dict] = {}
+        for order in orders:
+            self.by_key.setdefault(self.key(order.get("Email", ""), order.get("OrderNumber", "")), order)
+
+    @staticmethod
+    def key(email: str, order_number: str) -> Tuple[str, str]:
+        """
+        Index key for an order: emails match regardless of case and surrounding whitespace, and
+        "#W001" and "W001" find the same order.
+        """
+        return email.strip().casefold(), order_number.strip().lstrip("#")
+
+    def get(self, email: str, order_number: str) -> Optional[dict]:
+        """
+        Get the order for an email and order number, or None.
+        """
+        return self.by_key.get(self.key(email, order_number))
+
+
+# Index of the last order list looked up. fresh_conversation pipelines share one list, so one slot
+# serves them all, and a reloaded list replaces the old index instead of keeping it alive.
+_order_index: Optional[_OrderIndex] = None
+
+
+def _get_order_index(orders: list) -> _OrderIndex:
+    """
+    Get the index for an order list, building it if the list isn't the one last indexed.
+    """
+    global _order_index
+    index = _order_index
+    if index is None or index.orders is not orders:
+        index = _OrderIndex(orders)
+        _order_index = index
+    return index
 
 
 class OrderStatusAgent(Agent):
@@ -13,26 +67,53 @@ class OrderStatusAgent(Agent):
     Agent responsible for handling order status and tracking queries.
     """
 
-    def __init__(self, name: str, session_id: str):
-        super().__init__(name, session_id)
-        self.orders_data = load_json("./data/customer_orders.json") or []
+    # Extraction replies shared by every order agent, keyed on the full prompt
+    _extraction_cache = ResponseCache()
+
+    def __init__(
+        self,
+        name: str,
+        session_id: str,
+        orders_data: Optional[list] = None,
+        template_manager: Optional[TemplateManager] = None,
+    ):
+        super().__init__(name, session_id, template_manager)
+        self.orders_data = (
+            orders_data if orders_data is not None else load_json_shared("./data/customer_orders.json") or []
+        )
         self.state_manager = StateManager()
 
+    @property
+    def _extraction_llm(self) -> CachedLLMAdapter:
+        """
+        The agent's LLM adapter, answering repeated extraction prompts from the shared cache.
+        """
+        return CachedLLMAdapter(self.llm_adapter, self._extraction_cache)
+
     def find_order(self, email: str, order_number: str) -> dict:
         """
         Find an order by email and order number.
         """
-        for order in self.orders_data:
-            if order.get("Email", "").lower() == email.lower() and order.get("OrderNumber", "") == order_number:
-                return order
-        return None
+        return _get_order_index(self.orders_data).get(email, order_number)
+
+    def find_orders(self, lookups: List[Tuple[str, str]]) -> List[Optional[dict]]:
+        """
+        Find several orders at once.
+
+        Args:
+            lookups: (email, order_number) pairs to look up
+
+        Returns:
+            The matching order for each pair, in input order, or None where nothing matched
+        """
+        index = _get_order_index(self.orders_data)
+        return [index.get(email, order_number) for email, order_number in lookups]
 
     def extract_email_from_text(self, text: str) -> str:
         """
         Extract email address from text using regex.
         """
-        email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        match = re.search(email_pattern, text)
+        match = _EMAIL_RE.search(text)
         return match.group() if match else None
 
     def extract_order_number_from_text(self, text: str) -> str:
@@ -40,17 +121,9 @@ class OrderStatusAgent(Agent):
         Extract order number from text using regex.
         Handles both #W001 and W001 formats.
         """
-        # Try with # prefix first
-        order_pattern = r"#W\d+"
-        match = re.search(order_pattern, text)
-        if match:
-            return match.group()
-
-        # Try without # prefix, but ensure it starts with W and has digits
-        order_pattern = r"\bW\d+\b"
-        match = re.search(order_pattern, text)
+        match = _ORDER_NUMBER_RE.search(text)
         if match:
-            return "#" + match.group()  # Add # prefix for consistency
+            return "#" + (match.group(1) or match.group(2))  # Add # prefix for consistency
 
         return None
 
@@ -68,19 +141,19 @@ class OrderStatusAgent(Agent):
                 {"role": "user", "content": user_instructions},
             ]
 
-            response = self.llm_adapter.chat(messages)
+            response = self._extraction_llm.chat(messages, temperature=0.1)  # Low temperature, so cacheable
 
             if response.get("success"):
                 try:
                     response_text = response["content"]
                     # Try to parse JSON response
                     if response_text.startswith("{") and response_text.endswith("}"):
-                        out_dict = json.loads(response_text)
+                        out_dict = json_loads(response_text)
                     else:
                         # Extract JSON from response if wrapped
-                        json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+                        json_match = _JSON_OBJECT_RE.search(response_text)
                         if json_match:
-                            out_dict = json.loads(json_match.group())
+                            out_dict = json_loads(json_match.group())
                         else:
                             return None, None
 
@@ -99,28 +172,17 @@ class OrderStatusAgent(Agent):
             logger.error(f"Error extracting order info: {e}")
             return None, None
 
-    def _generate_order_response(self, email: str, order_number: str) -> Message:
+    def format_order_status(self, email: str, order_number: str, order: Optional[dict]) -> str:
         """
-        Generate order status response message.
+        Format the customer-facing status message for an order, or the not-found message if order is None.
         """
-        order = self.find_order(email, order_number)
-
         if not order:
-            # Don't clear state when order not found - user might want to try again
-            not_found_msg = (
+            return (
                 f"🏔️ I couldn't find order **{order_number}** for `{email}` in our system. "
                 f"\n\nCould you double-check your order number? Our order numbers typically "
                 f"look like #W001, #W002, etc. You can also try a different email if you "
                 f"used multiple addresses.\n\nOnward into the unknown! 🌟"
             )
-            return Message(
-                content=not_found_msg,
-                sender=self.name,
-                recipient="AdventureOutfittersAgent",
-            )
-
-        # Clear state only on successful order lookup
-        self.state_manager.clear_state()
 
         # Generate order status response
         status = order.get("Status", "unknown")
@@ -145,7 +207,26 @@ class OrderStatusAgent(Agent):
             status_message += tracking_info
 
         status_message += "\n\n🌟 Thanks for choosing Adventure Outfitters! Onward into the unknown! 🏔️"
+        return status_message
+
+    def _generate_order_response(self, email: str, order_number: str) -> Message:
+        """
+        Generate order status response message.
+        """
+        order = self.find_order(email, order_number)
+
+        if not order:
+            # Don't clear state when order not found - user might want to try again
+            return Message(
+                content=self.format_order_status(email, order_number, None),
+                sender=self.name,
+                recipient="AdventureOutfittersAgent",
+            )
+
+        # Clear state only on successful order lookup
+        self.state_manager.clear_state()
 
+        status_message = self.format_order_status(email, order_number, order)
         return Message(content=status_message, sender=self.name, recipient="AdventureOutfittersAgent")
 
     def process(self, message: Message) -> Message:
@@ -186,7 +267,7 @@ class OrderStatusAgent(Agent):
                 return self._generate_order_response(email_from_current, stored_order)
 
             # If user provides just an email (and it looks like a standalone email)
-            if email_from_current and not order_from_current and "@" in query and len(query.split()) == 1:
+            if email_from_current and not order_from_current and not _WHITESPACE_RE.search(query.strip()):
                 self.state_manager.add_entry("email", email_from_current)
                 email_msg = (
                     f"🏔️ Got it! I have your email: {email_from_current}. Now I need "
@@ -214,7 +295,7 @@ class OrderStatusAgent(Agent):
             # Handle case where we have stored email but user provides invalid order format
             if stored_email and not order_from_current and not email_from_current:
                 # Check if the input might be an attempted order number but in wrong format
-                if query.strip().isdigit() or any(char.isdigit() for char in query):
+                if _DIGIT_RE.search(query):
                     invalid_order_msg = (
                         f"🏔️ I have your email ({stored_email}) but that doesn't look like "
                         f"one of our order numbers. Our order numbers start with 'W' and look "
@@ -240,8 +321,9 @@ class OrderStatusAgent(Agent):
                     recipient="AdventureOutfittersAgent",
                 )
 
-            # Try to extract both from current query using LLM as fallback
-            if not email_from_current and not order_from_current:
+            # Try to extract both from current query using LLM as fallback. Emails need an "@" and order
+            # numbers a digit, so queries with neither can't hold either and skip the LLM call.
+            if not email_from_current and not order_from_current and _MAY_HOLD_ORDER_INFO_RE.search(query):
                 email, order_number = self.extract_order_info(query)
                 email_from_current = email_from_current or email
                 order_from_current = order_from_current or order_number
@@ -1,9 +1,86 @@
+import heapq
 import json
+import re
+import textwrap
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional
 
 from src.agents.agent import Agent
 from src.common.message import Message
+from src.common.response_cache import CachedLLMAdapter, ResponseCache
+from src.constants import DEFAULT_TEMPERATURE
 from src.common.logging import logger
-from src.common.io import load_json
+from src.common.io import load_json_shared
+from src.prompt.manage import TemplateManager
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _prompt_info(product: dict) -> dict:
+    """
+    The product fields given to the LLM.
+    """
+    return {
+        "name": product.get("ProductName", ""),
+        "sku": product.get("SKU", ""),
+        "description": product.get("Description", ""),
+        "inventory": product.get("Inventory", 0),
+        "tags": product.get("Tags", []),
+    }
+
+
+def _prompt_json(product: dict) -> str:
+    """
+    The product's prompt fields as indented JSON, ready to sit inside a JSON list.
+    """
+    return textwrap.indent(json.dumps(_prompt_info(product), indent=2), "  ")
+
+
+class _CatalogIndex:
+    """
+    Precomputed search words and SKU lookup for a product list.
+    """
+
+    def __init__(self, products: list) -> None:
+        self.products = products
+        # Words of each product's name, description and tags, lowercased, in catalog order
+        token_sets: List[FrozenSet[str]] = [
+            frozenset(
+                _WORD_RE.findall(
+                    " ".join((product.get("ProductName", ""), product.get("Description", ""), *product.get("Tags", [])))
+                    .lower()
+                )
+            )
+            for product in products
+        ]
+        # Catalog positions of the products containing each word
+        self.postings: Dict[str, List[int]] = {}
+        for position, words in enumerate(token_sets):
+            for word in words:
+                self.postings.setdefault(word, []).append(position)
+        # Prompt JSON of each product, by id()
+        self.prompt_json: Dict[int, str] = {id(product): _prompt_json(product) for product in products}
+        # Catalog positions of each SKU
+        self.sku_positions: Dict[str, List[int]] = {}
+        for position, product in enumerate(products):
+            self.sku_positions.setdefault(product.get("SKU"), []).append(position)
+
+
+# Index of the last product list searched. fresh_conversation pipelines share one list, so one slot
+# serves them all, and a reloaded catalog replaces the old index instead of keeping it alive.
+_catalog_index: Optional[_CatalogIndex] = None
+
+
+def _get_catalog_index(products: list) -> _CatalogIndex:
+    """
+    Get the index for a product list, building it if the list isn't the one last indexed.
+    """
+    global _catalog_index
+    index = _catalog_index
+    if index is None or index.products is not products:
+        index = _CatalogIndex(products)
+        _catalog_index = index
+    return index
 
 
 class ProductRecommendationAgent(Agent):
@@ -11,38 +88,70 @@ class ProductRecommendationAgent(Agent):
     Agent responsible for handling product recommendation queries.
     """
 
-    def __init__(self, name: str, session_id: str):
-        super().__init__(name, session_id)
-        self.products_data = load_json("./data/product_catalog.json") or []
+    # Recommendation replies shared by every product agent, keyed on the query and product data in the prompt
+    _recommendation_cache = ResponseCache()
+
+    def __init__(
+        self,
+        name: str,
+        session_id: str,
+        products_data: Optional[list] = None,
+        template_manager: Optional[TemplateManager] = None,
+    ):
+        super().__init__(name, session_id, template_manager)
+        self.products_data = (
+            products_data if products_data is not None else load_json_shared("./data/product_catalog.json") or []
+        )
+
+    @property
+    def _recommendation_llm(self) -> CachedLLMAdapter:
+        """
+        The agent's LLM adapter, answering repeated recommendation prompts from the shared cache.
+        """
+        return CachedLLMAdapter(self.llm_adapter, self._recommendation_cache, max_temperature=DEFAULT_TEMPERATURE)
 
     def search_products(self, query: str) -> list:
         """
         Search for products based on query keywords.
         """
-        query_lower = query.lower()
-        matching_products = []
-
-        for product in self.products_data:
-            # Search in product name, description, and tags
-            product_text = (
-                product.get("ProductName", "").lower()
-                + " "
-                + product.get("Description", "").lower()
-                + " "
-                + " ".join(product.get("Tags", [])).lower()
-            )
+        index = _get_catalog_index(self.products_data)
+        query_words = set(_WORD_RE.findall(query.lower()))
 
-            # Simple keyword matching
-            query_words = query_lower.split()
-            matches = sum(1 for word in query_words if word in product_text)
+        # Count matching query words per product, touching only products that contain one of them
+        scores = Counter(position for word in query_words for position in index.postings.get(word, ()))
 
-            if matches > 0:
-                product["relevance_score"] = matches
-                matching_products.append(product)
+        # Top 5 by relevance score; ties keep catalog order
+        top = heapq.nlargest(5, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [index.products[position] for position, _ in top]
 
-        # Sort by relevance score
-        matching_products.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-        return matching_products[:5]  # Return top 5 matches
+    def _products_json(self, products: list) -> str:
+        """
+        Serialize products for the recommendation prompt, as json.dumps(..., indent=2) of their prompt fields.
+        Catalog products reuse the JSON precomputed in the catalog index.
+        """
+        prompt_json = _get_catalog_index(self.products_data).prompt_json
+        items = [prompt_json.get(id(product)) or _prompt_json(product) for product in products]
+        return "[\n" + ",\n".join(items) + "\n]" if items else "[]"
+
+    def _recommend(self, query: str, products: list) -> Optional[Message]:
+        """
+        Ask the LLM to present the products for the query. Returns None if the LLM call fails.
+        """
+        template = self.template_manager.create_template("delegate", "product_recommendation")
+        user_instructions = self.template_manager.fill_template(
+            template.get("user", ""), query=query, products=self._products_json(products)
+        )
+        messages = [
+            {"role": "system", "content": template.get("system", "")},
+            {"role": "user", "content": user_instructions},
+        ]
+
+        response = self._recommendation_llm.chat(messages)
+        if response.get("success"):
+            return Message(content=response["content"].strip(), sender=self.name, recipient="AdventureOutfittersAgent")
+
+        logger.error(f"Product recommendation generation failed: {response.get('error')}")
+        return None
 
     def get_products_by_skus(self, skus: list) -> list:
         """
@@ -54,11 +163,9 @@ class ProductRecommendationAgent(Agent):
         Returns:
             list: List of matching products
         """
-        matching_products = []
-        for product in self.products_data:
-            if product.get("SKU") in skus:
-                matching_products.append(product)
-        return matching_products
+        index = _get_catalog_index(self.products_data)
+        positions = sorted({position for sku in set(skus) for position in index.sku_positions.get(sku, [])})
+        return [index.products[position] for position in positions]
 
     def process(self, message: Message) -> Message:
         """
@@ -85,42 +192,14 @@ class ProductRecommendationAgent(Agent):
                 matching_products = self.get_products_by_skus(sku_list)
 
                 if matching_products:
-                    # Generate detailed information about the specific product
-                    template = self.template_manager.create_template("delegate", "product_recommendation")
-                    system_instructions = template.get("system", "")
-
-                    # Prepare product information for the LLM
-                    products_info = []
-                    for product in matching_products:
-                        product_info = {
-                            "name": product.get("ProductName", ""),
-                            "sku": product.get("SKU", ""),
-                            "description": product.get("Description", ""),
-                            "inventory": product.get("Inventory", 0),
-                            "tags": product.get("Tags", []),
-                        }
-                        products_info.append(product_info)
-
                     # Modify the query to be more specific for SKU lookups
                     sku_query = (
                         f"The customer is asking about product with SKU {direct_sku}. "
                         f"Please provide detailed information about this specific product."
                     )
-
-                    user_instructions = self.template_manager.fill_template(
-                        template.get("user", ""), query=sku_query, products=json.dumps(products_info, indent=2)
-                    )
-
-                    messages = [
-                        {"role": "system", "content": system_instructions},
-                        {"role": "user", "content": user_instructions},
-                    ]
-
-                    response = self.llm_adapter.chat(messages)
-
-                    if response.get("success"):
-                        recommendation_text = response["content"].strip()
-                        return Message(content=recommendation_text, sender=self.name, recipient="AdventureOutfittersAgent")
+                    recommendation = self._recommend(sku_query, matching_products)
+                    if recommendation:
+                        return recommendation
 
             # Handle contextual queries about specific products
             if referenced_products and not matching_products:
@@ -128,43 +207,15 @@ class ProductRecommendationAgent(Agent):
                 matching_products = self.get_products_by_skus(referenced_products)
 
                 if matching_products:
-                    # Generate detailed information about the specific products
-                    template = self.template_manager.create_template("delegate", "product_recommendation")
-                    system_instructions = template.get("system", "")
-
-                    # Prepare product information for the LLM with context
-                    products_info = []
-                    for product in matching_products:
-                        product_info = {
-                            "name": product.get("ProductName", ""),
-                            "sku": product.get("SKU", ""),
-                            "description": product.get("Description", ""),
-                            "inventory": product.get("Inventory", 0),
-                            "tags": product.get("Tags", []),
-                        }
-                        products_info.append(product_info)
-
                     # Modify the query to be more specific for contextual responses
                     contextual_query = (
                         f"The customer is asking about these specific products from their "
                         f"recent order or previous inquiry: {query}. Please provide "
                         f"detailed information about these products."
                     )
-
-                    user_instructions = self.template_manager.fill_template(
-                        template.get("user", ""), query=contextual_query, products=json.dumps(products_info, indent=2)
-                    )
-
-                    messages = [
-                        {"role": "system", "content": system_instructions},
-                        {"role": "user", "content": user_instructions},
-                    ]
-
-                    response = self.llm_adapter.chat(messages)
-
-                    if response.get("success"):
-                        recommendation_text = response["content"].strip()
-                        return Message(content=recommendation_text, sender=self.name, recipient="AdventureOutfittersAgent")
+                    recommendation = self._recommend(contextual_query, matching_products)
+                    if recommendation:
+                        return recommendation
 
             # If no specific products found through SKU or contextual lookup, do regular search
             if not matching_products:
@@ -184,50 +235,22 @@ class ProductRecommendationAgent(Agent):
                 )
 
             # Generate product recommendations using LLM
-            template = self.template_manager.create_template("delegate", "product_recommendation")
-            system_instructions = template.get("system", "")
-
-            # Prepare product information for the LLM
-            products_info = []
-            for product in matching_products:
-                product_info = {
-                    "name": product.get("ProductName", ""),
-                    "sku": product.get("SKU", ""),
-                    "description": product.get("Description", ""),
-                    "inventory": product.get("Inventory", 0),
-                    "tags": product.get("Tags", []),
-                }
-                products_info.append(product_info)
-
-            user_instructions = self.template_manager.fill_template(
-                template.get("user", ""), query=query, products=json.dumps(products_info, indent=2)
-            )
-
-            messages = [
-                {"role": "system", "content": system_instructions},
-                {"role": "user", "content": user_instructions},
-            ]
-
-            response = self.llm_adapter.chat(messages)
-
-            if response.get("success"):
-                recommendation_text = response["content"].strip()
-                return Message(content=recommendation_text, sender=self.name, recipient="AdventureOutfittersAgent")
-            else:
-                logger.error(f"Product recommendation generation failed: {response.get('error')}")
-
-                # Fallback to simple product listing
-                response_text = "🏔️ Here are some great products I found for you:\n\n"
-                for i, product in enumerate(matching_products[:3], 1):
-                    response_text += (
-                        f"{i}. **{product.get('ProductName', 'Unknown Product')}** (SKU: {product.get('SKU', 'N/A')})\n"
-                    )
-                    response_text += f"   {product.get('Description', 'No description available')}\n"
-                    response_text += f"   In Stock: {product.get('Inventory', 0)} units\n\n"
+            recommendation = self._recommend(query, matching_products)
+            if recommendation:
+                return recommendation
+
+            # Fallback to simple product listing
+            response_text = "🏔️ Here are some great products I found for you:\n\n"
+            for i, product in enumerate(matching_products[:3], 1):
+                response_text += (
+                    f"{i}. **{product.get('ProductName', 'Unknown Product')}** (SKU: {product.get('SKU', 'N/A')})\n"
+                )
+                response_text += f"   {product.get('Description', 'No description available')}\n"
+                response_text += f"   In Stock: {product.get('Inventory', 0)} units\n\n"
 
-                response_text += "🌟 These products are perfect for your next adventure! Onward into the unknown! 🏔️"
+            response_text += "🌟 These products are perfect for your next adventure! Onward into the unknown! 🏔️"
 
-                return Message(content=response_text, sender=self.name, recipient="AdventureOutfittersAgent")
+            return Message(content=response_text, sender=self.name, recipient="AdventureOutfittersAgent")
 
         except Exception as e:
             logger.error(f"Error in ProductRecommendationAgent: {e}")
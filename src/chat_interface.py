@@ -6,6 +6,7 @@ Interactive chat loop for customers to communicate with the Adventure Outfitters
 
 import os
 import sys
+import threading
 import uuid
 
 from src.common.logging import logger
@@ -22,6 +23,8 @@ class ChatInterface:
         self.session_id = str(uuid.uuid4())
         self.pipeline = AdventureOutfittersPipeline(self.session_id)
         self.session_active = True
+        # Warms the pipeline up in the background while the customer types their first message
+        self._warmup = threading.Thread(target=self.pipeline.warmup, name="pipeline-warmup", daemon=True)
 
     def display_welcome(self):
         """Display welcome message and instructions."""
@@ -71,6 +74,7 @@ class ChatInterface:
     def run(self):
         """Run the interactive chat interface."""
         self.display_welcome()
+        self._warmup.start()
 
         while self.session_active:
             try:
@@ -95,11 +99,12 @@ class ChatInterface:
                     print()  # Add spacing after help
                     continue
 
-                # Process the query through the agent pipeline
+                # Process the query through the agent pipeline, once the warmup is done
+                self._warmup.join()
                 print("\nAdventure Outfitters: ", end="", flush=True)
-                response = self.pipeline.process_query(user_input)
-                print(response)
-                print()  # Add spacing after response
+                for chunk in self.pipeline.process_query_stream(user_input):
+                    print(chunk, end="", flush=True)
+                print("\n")  # End the response and add spacing after it
 
             except Exception as e:
                 logger.error(f"Error in chat interface: {e}")
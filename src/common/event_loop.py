@@ -0,0 +1,21 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+
+def _loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """
+    Event loop constructor to use: uvloop's when it is installed, otherwise asyncio's default.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+def run(main: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine to completion like asyncio.run, on a uvloop event loop when uvloop is available.
+    """
+    with asyncio.Runner(loop_factory=_loop_factory()) as runner:
+        return runner.run(main)
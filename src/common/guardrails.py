@@ -0,0 +1,85 @@
+import re
+
+from src.constants import SUPERVISOR_MAX_UNREVIEWED_CHARS
+
+# Attempts to change the persona, reveal internals or steer the agent off its instructions
+_INJECTION_RE = re.compile(
+    r"\b(?:act\s+as|pretend|role[\s-]?play|talk\s+like|speak\s+like|you\s+are\s+now|ignore\s+(?:all\s+|any\s+)?"
+    r"(?:previous|prior|above|your)|disregard|jailbreak|system\s+prompt|instructions|developer\s+mode)\b",
+    re.IGNORECASE,
+)
+# Internal details or off-topic subjects the brand shouldn't talk about
+_OFF_BRAND_RE = re.compile(
+    r"\b(?:system\s+prompt|api[\s_-]?key|access\s+token|password|politic\w*|election|diagnos\w*|"
+    r"prescri\w*|medication|lawsuit|legal\s+advice)\b",
+    re.IGNORECASE,
+)
+_EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+_PHONE_RE = re.compile(r"(?<!\w)(?:\+?1[\s.-]?)?\(?\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}(?!\w)")
+_CARD_CANDIDATE_RE = re.compile(r"(?<!\d)(?:\d[ -]?){12,18}\d(?!\d)")
+
+
+def _passes_luhn(digits: str) -> bool:
+    """
+    Luhn checksum, used to tell card numbers apart from other long digit runs.
+    """
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit)
+        if position % 2:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return total % 10 == 0
+
+
+def is_injection_attempt(query: str) -> bool:
+    """
+    Check a customer query for prompt-injection or persona-change cues.
+    """
+    return _INJECTION_RE.search(query) is not None
+
+
+def has_risky_content(query: str, response: str) -> bool:
+    """
+    Check a reply for content the supervisor must review: off-brand subjects, or contact or card
+    details beyond the email the customer gave. Unlike needs_supervisor, the reply's length isn't
+    checked, so this also applies to a reply that is still being streamed.
+
+    Args:
+        query: The customer's query
+        response: The reply, or the part of it generated so far
+
+    Returns:
+        True if the reply has risky content
+    """
+    if _OFF_BRAND_RE.search(response):
+        return True
+
+    query_emails = {email.lower() for email in _EMAIL_RE.findall(query)}
+    if any(email.lower() not in query_emails for email in _EMAIL_RE.findall(response)):
+        return True
+    if _PHONE_RE.search(response):
+        return True
+    return any(_passes_luhn(re.sub(r"\D", "", match)) for match in _CARD_CANDIDATE_RE.findall(response))
+
+
+def needs_supervisor(query: str, response: str) -> bool:
+    """
+    Decide whether a drafted reply needs the supervisor LLM's guardrail review.
+
+    The review is skipped only when nothing looks risky: the query shows no prompt-injection or
+    persona-change attempt, and the reply is of normal length, stays on brand and discloses no
+    contact or card details beyond the email the customer gave.
+
+    Args:
+        query: The customer's query
+        response: The drafted reply
+
+    Returns:
+        True if the supervisor should review the reply
+    """
+    if is_injection_attempt(query) or len(response) > SUPERVISOR_MAX_UNREVIEWED_CHARS:
+        return True
+    return has_risky_content(query, response)
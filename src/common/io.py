@@ -1,17 +1,44 @@
+import atexit
 import json
 import os
-from typing import Any, Dict, Optional
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.common.logging import logger
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the standard library json is used without it
+    orjson = None
+
+
+def json_loads(data: str) -> Any:
+    """
+    Parse a JSON string, with orjson when it is installed. Errors are json.JSONDecodeError either way.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(data: Any) -> str:
+    """
+    Serialize data to a compact single-line JSON string, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
 
 def load_json(filename: str) -> Optional[Dict[str, Any]]:
     """
     Load a JSON file and return its contents.
     """
     try:
-        with open(filename, "r") as file:
-            return json.load(file)
+        with open(filename, "r", encoding="utf-8") as file:
+            return json_loads(file.read())
     except FileNotFoundError:
         logger.error(f"File '{filename}' not found.")
         return None
@@ -23,20 +50,111 @@ def load_json(filename: str) -> Optional[Dict[str, Any]]:
         raise
 
 
+# Parsed data files shared by every caller of load_json_shared: filename -> (mtime in ns, data)
+_shared_json: Dict[str, Tuple[int, Any]] = {}
+_shared_json_lock = threading.Lock()
+
+
+def load_json_shared(filename: str) -> Optional[Any]:
+    """
+    Load a read-only JSON data file, parsing it again only when its modification time changes;
+    callers get the same parsed object, so it must not be modified. Files that fail to load
+    aren't cached and are retried next time.
+    """
+    try:
+        mtime = os.stat(filename).st_mtime_ns
+    except OSError:
+        return load_json(filename)
+
+    with _shared_json_lock:
+        cached = _shared_json.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        data = load_json(filename)
+        if data is not None:
+            _shared_json[filename] = (mtime, data)
+        return data
+
+
 def save_json(filename: str, data: Dict[str, Any]) -> None:
     """
     Save data to a JSON file.
     """
     try:
         os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, "w") as file:
-            json.dump(data, file, indent=2)
+        if orjson is not None:
+            with open(filename, "wb") as file:
+                file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filename, "w", encoding="utf-8") as file:
+                file.write(json.dumps(data, indent=2))
+        with _shared_json_lock:
+            _shared_json.pop(filename, None)
         logger.info(f"Data saved to {filename}")
     except Exception as e:
         logger.error(f"Error saving JSON file: {e}")
         raise
 
 
+def load_jsonl(filename: str) -> List[Dict[str, Any]]:
+    """
+    Load a JSON Lines file, one record per line. Returns [] if the file doesn't exist; lines that
+    aren't valid JSON (e.g. a line cut short by a crash) are skipped.
+    """
+    records = []
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json_loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping invalid JSON on line {line_number} of '{filename}'")
+    except FileNotFoundError:
+        return []
+    return records
+
+
+def load_jsonl_from(filename: str, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Load the records of a JSON Lines file that start at or after byte offset, and return them with
+    the offset just past the last complete line, to pass in on the next call. A trailing line with
+    no newline yet (an append in progress) is left for the next call. Returns ([], offset) if the
+    file doesn't exist.
+    """
+    try:
+        with open(filename, "rb") as file:
+            file.seek(offset)
+            data = file.read()
+    except FileNotFoundError:
+        return [], offset
+
+    end = data.rfind(b"\n") + 1
+    records = []
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json_loads(line.decode("utf-8")))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.warning(f"Skipping invalid JSON line in '{filename}'")
+    return records, offset + end
+
+
+def append_jsonl(filename: str, records: List[Dict[str, Any]]) -> None:
+    """
+    Append records to a JSON Lines file, one line each.
+    """
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, "a", encoding="utf-8") as file:
+            file.write("".join(json_dumps(record) + "\n" for record in records))
+    except Exception as e:
+        logger.error(f"Error appending to JSON Lines file: {e}")
+        raise
+
+
 def ensure_directory_exists(path: str) -> None:
     """
     Ensure that the directory exists, creating it if it doesn't.
@@ -47,3 +165,96 @@ def ensure_directory_exists(path: str) -> None:
     except OSError as e:
         logger.error(f"Failed to create directory at {path}: {str(e)}")
         raise
+
+
+class JsonWriteBehind:
+    """
+    Saves JSON files and appends to JSON Lines files on a background thread so callers don't
+    wait on disk I/O.
+
+    Writes queued within max_delay_ms of each other (up to max_batch of them) are drained
+    together: only the newest data for each saved file is written, and appended records are
+    written in order with one open per file. When the queue is full the write happens
+    synchronously instead. Pending writes are flushed at interpreter exit.
+    """
+
+    def __init__(self, maxsize: int = 256, max_batch: int = 32, max_delay_ms: float = 50) -> None:
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=maxsize)
+        self._max_batch = max_batch
+        self._max_delay = max_delay_ms / 1000
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def save(self, filename: str, data: Dict[str, Any]) -> None:
+        """
+        Queue data to be saved to filename. The caller must not mutate data afterwards.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((filename, data, False))
+        except queue.Full:
+            logger.warning(f"Write-behind queue full, saving {filename} synchronously")
+            save_json(filename, data)
+
+    def append(self, filename: str, record: Dict[str, Any]) -> None:
+        """
+        Queue a record to be appended to the JSON Lines file filename.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((filename, record, True))
+        except queue.Full:
+            logger.warning(f"Write-behind queue full, appending to {filename} synchronously")
+            append_jsonl(filename, [record])
+
+    def flush(self) -> None:
+        """
+        Block until every queued write has been saved.
+        """
+        self._queue.join()
+
+    def start(self) -> None:
+        """
+        Start the writer thread if it isn't running yet. Called by save, so calling it up front is optional.
+        """
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._drain, name="json-write-behind", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._max_delay
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            latest: Dict[str, Dict[str, Any]] = {}
+            appended: Dict[str, List[Dict[str, Any]]] = {}
+            for filename, data, append in batch:
+                if append:
+                    appended.setdefault(filename, []).append(data)
+                else:
+                    latest[filename] = data
+
+            for filename, data in latest.items():
+                try:
+                    save_json(filename, data)
+                except Exception:
+                    pass  # save_json has logged it; keep the writer alive
+            for filename, records in appended.items():
+                try:
+                    append_jsonl(filename, records)
+                except Exception:
+                    pass  # append_jsonl has logged it; keep the writer alive
+            for _ in batch:
+                self._queue.task_done()
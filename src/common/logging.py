@@ -1,17 +1,16 @@
+import functools
 import logging
 import os
 
 
+@functools.lru_cache(maxsize=None)
 def custom_path_filter(path: str) -> str:
     """
     Filters the provided file path to shorten it by removing the project root portion.
+    Cached, since records only ever come from a few dozen source files.
     """
-    project_root = "project_20250805_1626_customer_bot"
-
-    idx = path.find(project_root)
-    if idx != -1:
-        path = path[idx + len(project_root) :]
-    return path
+    _, found, tail = path.partition("project_20250805_1626_customer_bot")
+    return tail if found else path
 
 
 class CustomLogRecord(logging.LogRecord):
@@ -6,6 +6,8 @@ class Message:
     Represents a message with content, sender, recipient, and optional metadata.
     """
 
+    __slots__ = ("content", "sender", "recipient", "metadata")
+
     def __init__(self, content: str, sender: str, recipient: str, metadata: Optional[Dict[str, str]] = None) -> None:
         """
         Initializes the Message object.
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from src.constants import DEFAULT_TEMPERATURE
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of LLM responses keyed by a hash of the request.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_output_tokens: Optional[int],
+        json_mode: bool = False,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> str:
+        """
+        Hash the request, including the provider and model that answer it, since caches are shared by
+        agents that may use different models. Temperature is bucketed to 0.1 so float noise doesn't
+        split entries.
+        """
+        payload = json.dumps(
+            [messages, round(temperature, 1), max_output_tokens, json_mode, provider, model], sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a copy of the cached response, or None on a miss.
+        """
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                return None
+            self._entries.move_to_end(key)
+        return dict(response)
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Store a response, evicting the least recently used entry when full.
+        """
+        with self._lock:
+            self._entries[key] = dict(response)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Drop every cached response.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedLLMAdapter:
+    """
+    Wraps an LLMAdapter and reuses responses to repeated near-deterministic chat requests.
+
+    Only requests at or below max_temperature without tools are cached, and only successful
+    responses are stored; everything else goes straight to the wrapped adapter. Other attributes
+    are delegated to the wrapped adapter.
+    """
+
+    def __init__(self, adapter, cache: Optional[ResponseCache] = None, max_temperature: float = 0.1) -> None:
+        self._adapter = adapter
+        self._cache = cache if cache is not None else ResponseCache()
+        self._max_temperature = max_temperature
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict]] = None,
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+        json_mode: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Send a chat request, answering from the cache when the same request was seen before.
+        """
+        if tools or round(temperature, 1) > self._max_temperature:
+            return self._adapter.chat(messages, tools, temperature, max_output_tokens, json_mode)
+
+        key = ResponseCache.key(
+            messages,
+            temperature,
+            max_output_tokens,
+            json_mode,
+            getattr(self._adapter, "provider_name", None),
+            getattr(self._adapter, "model", None),
+        )
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self._adapter.chat(messages, tools, temperature, max_output_tokens, json_mode)
+        if response.get("success"):
+            self._cache.put(key, response)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._adapter, name)
@@ -0,0 +1,48 @@
+import time
+from typing import Iterable, Iterator
+
+
+def stream_prefix(chunks: Iterable[str], limit: int) -> Iterator[str]:
+    """
+    Yield streamed text chunks until `limit` characters have been produced, then stop.
+
+    The source stream is closed on exit, so an LLM stream stops generating once the caller
+    has all the text it is going to show.
+    """
+    chunks = iter(chunks)
+    remaining = limit
+    try:
+        for chunk in chunks:
+            if len(chunk) >= remaining:
+                yield chunk[:remaining]
+                return
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def batch_stream(chunks: Iterable[str], max_chars: int = 64, max_ms: float = 50) -> Iterator[str]:
+    """
+    Coalesce small streamed chunks into larger ones, so a consumer writing each chunk to a
+    terminal issues one write per batch instead of one per token.
+
+    A batch is flushed once it holds `max_chars` characters or `max_ms` milliseconds have passed
+    since the last flush, whichever comes first; whatever is left is flushed at the end.
+    """
+    buffer = []
+    size = 0
+    last_flush = time.monotonic()
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        now = time.monotonic()
+        if size >= max_chars or (now - last_flush) * 1000 >= max_ms:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+            last_flush = now
+    if buffer:
+        yield "".join(buffer)
@@ -28,7 +28,7 @@ TEMPLATES_DIR = "config/templates"
 # Data Files
 CUSTOMER_ORDERS_FILE = "data/customer_orders.json"
 PRODUCT_CATALOG_FILE = "data/product_catalog.json"
-PROMO_CODES_FILE = "data/promo_codes.json"
+PROMO_CODES_FILE = "data/promo_codes.jsonl"
 
 # Agent Names
 COORDINATOR_AGENT = "AdventureOutfittersAgent"
@@ -90,9 +90,27 @@ SUCCESS_MESSAGES = {
 }
 
 # Chat Interface
-CHAT_QUIT_COMMANDS = ["quit", "exit", "bye", "q"]
-CHAT_HELP_COMMANDS = ["help", "h", "?"]
+CHAT_QUIT_COMMANDS = frozenset({"quit", "exit", "bye", "q"})
+CHAT_HELP_COMMANDS = frozenset({"help", "h", "?"})
 
 # LLM Configuration
 DEFAULT_TEMPERATURE = 0.3
 MAX_TOKENS = 1000
+DEFAULT_MAX_OUTPUT_TOKENS = 3000  # Generation cap when a caller doesn't set max_output_tokens
+
+# LLM HTTP connection pool, shared by all calls to a provider
+LLM_HTTP_TIMEOUT = 30.0
+LLM_HTTP_MAX_CONNECTIONS = 32
+# Chat requests in flight per adapter across all sessions; extra requests wait for a free slot
+LLM_MAX_CONCURRENT_REQUESTS = LLM_HTTP_MAX_CONNECTIONS
+
+# Supervisor guardrails: drafts longer than this always get the LLM review
+SUPERVISOR_MAX_UNREVIEWED_CHARS = 1500
+# Streamed replies keep this many trailing chars unsent until the guardrails have seen what follows,
+# so an email, phone or card number is checked whole before any of it goes out
+SUPERVISOR_STREAM_HOLDBACK_CHARS = 64
+
+# Conversation context sent to the LLM: bounded so prompts don't grow with session length
+CONTEXT_MAX_PRODUCTS = 10
+CONTEXT_MAX_SUMMARY_CHARS = 500
+CONTEXT_MAX_CHARS = 1500
@@ -2,11 +2,48 @@
 LLM-agnostic adapter interface with pluggable providers.
 """
 
+import atexit
+import functools
+import hashlib
+import importlib.util
+import json
 import os
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
-
-from src.constants import DEFAULT_TEMPERATURE
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.constants import (
+    DEFAULT_MAX_OUTPUT_TOKENS,
+    DEFAULT_TEMPERATURE,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_TIMEOUT,
+    LLM_MAX_CONCURRENT_REQUESTS,
+)
+from src.common.logging import logger
+
+
+@functools.lru_cache(maxsize=32)
+def _prompt_cache_key(system_prompt: str) -> str:
+    """
+    Stable key for a system prompt, hashed once per distinct prompt.
+    """
+    return f"system-{hashlib.blake2b(system_prompt.encode(), digest_size=16).hexdigest()}"
+
+
+def _pooled_client_args() -> Dict[str, Any]:
+    """
+    httpx.Client arguments for a provider's connection pool: keep-alive connections sized for
+    concurrent agents, and HTTP/2 when the h2 package is installed so requests share connections.
+    """
+    import httpx
+
+    return {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(
+            max_connections=LLM_HTTP_MAX_CONNECTIONS, max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS
+        ),
+    }
 
 
 class LLMProvider(ABC):
@@ -23,15 +60,41 @@ class LLMProvider(ABC):
         messages: List[Dict[str, str]],
         tools: Optional[List[Dict]] = None,
         temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+        json_mode: bool = False,
     ) -> Dict[str, Any]:
-        """Send chat request with optional tools."""
+        """
+        Send chat request with optional tools, capping generation at max_output_tokens if given.
+        With json_mode the provider is asked to reply with a single JSON object.
+        """
         pass
 
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Stream the response text in chunks as it is generated. Raises RuntimeError on failure.
+        Providers without a streaming API yield the whole response as one chunk.
+        """
+        response = self.chat(messages, temperature=temperature, max_output_tokens=max_output_tokens)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        yield response["content"]
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if provider is available."""
         pass
 
+    def close(self) -> None:
+        """Release the provider's pooled HTTP connections."""
+        close = getattr(getattr(self, "client", None), "close", None)
+        if close is not None:
+            close()
+
 
 class GeminiProvider(LLMProvider):
     """Google Gemini provider implementation."""
@@ -40,13 +103,23 @@ class GeminiProvider(LLMProvider):
         self.client = None
         self.model = None
         self.available = False
+        self._types = None  # google.genai.types, imported once the provider is initialized
 
     def initialize(self, api_key: str, model: str = "gemini-2.5-flash-lite") -> bool:
         """Initialize Gemini provider."""
         try:
             import google.genai as genai
+            from google.genai import types
+
+            self._types = types
 
-            self.client = genai.Client(api_key=api_key)
+            # One pooled client for every request made through this provider
+            self.client = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(
+                    timeout=int(LLM_HTTP_TIMEOUT * 1000), client_args=_pooled_client_args()
+                ),
+            )
             self.model = model
             self.available = True
             print(f"✅ Gemini provider initialized with {model}")
@@ -61,6 +134,8 @@ class GeminiProvider(LLMProvider):
         messages: List[Dict[str, str]],
         tools: Optional[List[Dict]] = None,
         temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+        json_mode: bool = False,
     ) -> Dict[str, Any]:
         """Send chat request to Gemini."""
         if not self.available:
@@ -70,15 +145,14 @@ class GeminiProvider(LLMProvider):
             }
 
         try:
-            from google.genai import types
-
             # Build conversation context
             conversation_context = self._build_conversation_context(messages)
 
             # Create config with proper format
-            config = types.GenerateContentConfig(
+            config = self._types.GenerateContentConfig(
                 temperature=temperature,
-                max_output_tokens=3000,
+                max_output_tokens=max_output_tokens or DEFAULT_MAX_OUTPUT_TOKENS,
+                response_mime_type="application/json" if json_mode else None,
             )
 
             # Add tools to config if provided
@@ -95,7 +169,14 @@ class GeminiProvider(LLMProvider):
                 config=config,
             )
 
-            return self._parse_response(response)
+            result = self._parse_response(response)
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                result["usage"] = {
+                    "prompt_tokens": usage.prompt_token_count or 0,
+                    "cached_tokens": usage.cached_content_token_count or 0,
+                }
+            return result
 
         except Exception as e:
             print(f"❌ Gemini API error: {e}")
@@ -104,6 +185,29 @@ class GeminiProvider(LLMProvider):
                 "error": str(e),
             }
 
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Stream a chat response from Gemini."""
+        if not self.available:
+            raise RuntimeError("Provider not available")
+
+        config = self._types.GenerateContentConfig(
+            temperature=temperature,
+            max_output_tokens=max_output_tokens or DEFAULT_MAX_OUTPUT_TOKENS,
+        )
+        stream = self.client.models.generate_content_stream(
+            model=self.model,
+            contents=self._build_conversation_context(messages),
+            config=config,
+        )
+        for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
     def is_available(self) -> bool:
         """Check if Gemini provider is available."""
         return self.available
@@ -189,9 +293,14 @@ class OpenAIProvider(LLMProvider):
     def initialize(self, api_key: str, model: str = "gpt-4o-mini") -> bool:
         """Initialize OpenAI provider."""
         try:
+            import httpx
             from openai import OpenAI
 
-            self.client = OpenAI(api_key=api_key)
+            # One pooled client for every request made through this provider
+            self.client = OpenAI(
+                api_key=api_key,
+                http_client=httpx.Client(timeout=LLM_HTTP_TIMEOUT, **_pooled_client_args()),
+            )
             self.model = model
             self.available = True
             print(f"✅ OpenAI provider initialized with {model}")
@@ -206,6 +315,8 @@ class OpenAIProvider(LLMProvider):
         messages: List[Dict[str, str]],
         tools: Optional[List[Dict]] = None,
         temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+        json_mode: bool = False,
     ) -> Dict[str, Any]:
         """Send chat request to OpenAI."""
         if not self.available:
@@ -215,12 +326,18 @@ class OpenAIProvider(LLMProvider):
             }
 
         try:
+            request_args = self._prompt_cache_args(messages)
+            if json_mode:
+                request_args["response_format"] = {"type": "json_object"}
+
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 tools=tools,
                 tool_choice="auto" if tools else None,
                 temperature=temperature,
+                max_tokens=max_output_tokens,
+                **request_args,
             )
 
             return self._parse_response(response)
@@ -232,10 +349,42 @@ class OpenAIProvider(LLMProvider):
                 "error": str(e),
             }
 
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Stream a chat response from OpenAI."""
+        if not self.available:
+            raise RuntimeError("Provider not available")
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+            stream=True,
+            **self._prompt_cache_args(messages),
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     def is_available(self) -> bool:
         """Check if OpenAI provider is available."""
         return self.available
 
+    @staticmethod
+    def _prompt_cache_args(messages: List[Dict[str, str]]) -> Dict[str, str]:
+        """
+        Route requests sharing a system prompt to the same prompt cache, so the prefix
+        is not processed again on every call.
+        """
+        if not messages or messages[0].get("role") != "system":
+            return {}
+        return {"prompt_cache_key": _prompt_cache_key(messages[0]["content"])}
+
     def _parse_response(self, response) -> Dict[str, Any]:
         """Parse OpenAI response into standardized format."""
         try:
@@ -247,6 +396,7 @@ class OpenAIProvider(LLMProvider):
                     "prompt_tokens": response.usage.prompt_tokens,
                     "completion_tokens": response.usage.completion_tokens,
                     "total_tokens": response.usage.total_tokens,
+                    "cached_tokens": getattr(response.usage.prompt_tokens_details, "cached_tokens", None) or 0,
                 },
             }
 
@@ -254,8 +404,6 @@ class OpenAIProvider(LLMProvider):
             if message.tool_calls:
                 result["tool_calls"] = []
                 for tool_call in message.tool_calls:
-                    import json
-
                     result["tool_calls"].append(
                         {
                             "id": tool_call.id,
@@ -282,6 +430,11 @@ class LLMAdapter:
         """Initialize adapter with specified provider."""
         self.provider_name = provider
         self.provider = None
+        self._prompt_tokens = 0
+        self._cached_tokens = 0
+        self._usage_lock = threading.Lock()
+        # Shared by every session using this adapter, so bursts queue here instead of timing out in the pool
+        self._request_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENT_REQUESTS)
 
         # Create provider instance
         if provider.lower() == "gemini":
@@ -300,25 +453,89 @@ class LLMAdapter:
         # Use provided values or defaults
         final_model = model or default_model
         final_api_key = api_key or default_api_key
+        self.model = final_model
 
         if not final_api_key:
             print(f"⚠️  No API key provided for {provider}")
             return
 
         # Initialize the provider
-        self.provider.initialize(final_api_key, final_model)
+        if self.provider.initialize(final_api_key, final_model):
+            atexit.register(self.provider.close)
 
     def chat(
         self,
         messages: List[Dict[str, str]],
         tools: Optional[List[Dict]] = None,
         temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+        json_mode: bool = False,
     ) -> Dict[str, Any]:
-        """Send chat request using the configured provider."""
+        """Send chat request using the configured provider, waiting for a free request slot if needed."""
         if not self.provider:
             return {"content": "🏔️ No LLM provider configured!", "error": "No provider"}
 
-        return self.provider.chat(messages, tools, temperature)
+        with self._request_slots:
+            response = self.provider.chat(messages, tools, temperature, max_output_tokens, json_mode)
+        self._record_usage(response.get("usage"))
+        return response
+
+    def batch_chat(
+        self,
+        messages_batch: List[List[Dict[str, str]]],
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Send independent chat requests concurrently over the pooled connections; responses keep input order."""
+
+        def send(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+            return self.chat(messages, temperature=temperature, max_output_tokens=max_output_tokens)
+
+        if len(messages_batch) <= 1:
+            return [send(messages) for messages in messages_batch]
+
+        workers = min(len(messages_batch), LLM_HTTP_MAX_CONNECTIONS)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-batch") as executor:
+            return list(executor.map(send, messages_batch))
+
+    def _record_usage(self, usage: Optional[Dict[str, int]]) -> None:
+        """Add a response's prompt and cached-prefix token counts to the running totals."""
+        if not usage:
+            return
+        with self._usage_lock:
+            self._prompt_tokens += usage.get("prompt_tokens") or 0
+            self._cached_tokens += usage.get("cached_tokens") or 0
+        logger.debug(
+            f"Prompt cache: {usage.get('cached_tokens') or 0}/{usage.get('prompt_tokens') or 0} tokens cached "
+            f"this call, {self.get_prompt_cache_stats()['hit_ratio']:.0%} overall"
+        )
+
+    def get_prompt_cache_stats(self) -> Dict[str, Any]:
+        """Get prompt tokens sent, how many were served from the provider's prefix cache, and the ratio."""
+        with self._usage_lock:
+            prompt_tokens, cached_tokens = self._prompt_tokens, self._cached_tokens
+        return {
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "hit_ratio": cached_tokens / prompt_tokens if prompt_tokens else 0.0,
+        }
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_output_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Stream a chat response in text chunks using the configured provider. Raises RuntimeError on failure."""
+        if not self.provider:
+            raise RuntimeError("No provider")
+
+        return self.provider.chat_stream(messages, temperature, max_output_tokens)
+
+    def close(self) -> None:
+        """Release the provider's pooled HTTP connections."""
+        if self.provider:
+            self.provider.close()
 
     def is_available(self) -> bool:
         """Check if the adapter is available."""
@@ -332,6 +549,7 @@ class LLMAdapter:
         """Switch to a different provider at runtime."""
         try:
             old_provider = self.provider_name
+            self.close()
             self.__init__(provider, model, api_key)
 
             if self.is_available():
@@ -344,3 +562,22 @@ class LLMAdapter:
         except Exception as e:
             print(f"❌ Error switching provider: {e}")
             return False
+
+
+class LLMAdapterRegistry:
+    """Process-wide LLMAdapter instances, one per (provider, model), created on first request."""
+
+    _adapters: Dict[tuple, LLMAdapter] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, provider: str = "gemini", model: Optional[str] = None) -> LLMAdapter:
+        """Get the shared adapter for a provider and model; model None means the provider's default."""
+        key = (provider.lower(), model)
+        adapter = cls._adapters.get(key)
+        if adapter is None:
+            with cls._lock:
+                adapter = cls._adapters.get(key)
+                if adapter is None:
+                    adapter = cls._adapters[key] = LLMAdapter(provider, model)
+        return adapter
@@ -1,8 +1,47 @@
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import copy
+import hashlib
+import itertools
+import json
+import re
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Optional
 
 from src.common.logging import logger
 
+# Phrases suggesting the query refers back to an earlier order or its products
+_ORDER_REFERENCE_KEYWORDS = (
+    "that order",
+    "my order",
+    "the order",
+    "this order",
+    "those products",
+    "these products",
+    "the products",
+    "my products",
+    "what are those",
+    "what are these",
+    "tell me about",
+    "more about",
+)
+
+# Phrases suggesting the query refers back to products mentioned earlier
+_PRODUCT_REFERENCE_KEYWORDS = (
+    "those products",
+    "these products",
+    "the products",
+    "what are those",
+    "what are these",
+    "tell me about them",
+    "more details",
+    "more info",
+    "describe them",
+)
+
+# Each keyword list as one alternation, so a query is scanned once per list
+_ORDER_REFERENCE_RE = re.compile("|".join(map(re.escape, _ORDER_REFERENCE_KEYWORDS)))
+_PRODUCT_REFERENCE_RE = re.compile("|".join(map(re.escape, _PRODUCT_REFERENCE_KEYWORDS)))
+
 
 class ConversationMemory:
     """
@@ -18,8 +57,13 @@ class ConversationMemory:
         Initialize the ConversationMemory with empty context.
         """
         self._conversation_context: Dict[str, Any] = {}
-        self._recent_interactions: List[Dict[str, Any]] = []
         self._max_recent_interactions = 5  # Keep last 5 interactions for context
+        # Bounded ring buffer: appending past the limit drops the oldest interaction
+        self._recent_interactions: Deque[Dict[str, Any]] = deque(maxlen=self._max_recent_interactions)
+        self._intent_counter: Counter = Counter()  # Intents over the whole conversation
+        # Latest value of each entity field and the turn it was last seen in, over the whole conversation
+        self._latest_entities: Dict[str, Any] = {}
+        self._entity_turns: Dict[str, int] = {}
         logger.info("ConversationMemory initialized")
 
     def add_interaction(
@@ -41,29 +85,61 @@ class ConversationMemory:
             key_info (Optional[Dict[str, Any]]): Key information from the response
                 (e.g., order details, products mentioned)
         """
-        try:
-            interaction = {
-                "timestamp": datetime.now().isoformat(),
-                "intent": intent,
-                "query": query,
-                "entities": entities,
-                "agent_used": agent_used,
-                "key_info": key_info or {},
-            }
+        interaction = {
+            "timestamp": time.time_ns(),  # Nanoseconds since the epoch
+            "intent": intent,
+            "query": query,
+            "entities": entities,
+            "agent_used": agent_used,
+            "key_info": key_info or {},
+        }
+
+        self._recent_interactions.append(interaction)
+        self._intent_counter[intent] += 1
+        self._record_entities(entities)
 
-            self._recent_interactions.append(interaction)
+        # Update conversation context based on the interaction
+        self._update_context(interaction)
 
-            # Keep only the most recent interactions
-            if len(self._recent_interactions) > self._max_recent_interactions:
-                self._recent_interactions = self._recent_interactions[-self._max_recent_interactions :]
+        logger.info(f"Added interaction to conversation memory: intent={intent}, agent={agent_used}")
 
-            # Update conversation context based on the interaction
-            self._update_context(interaction)
+    def _record_entities(self, entities: Dict[str, Any]) -> None:
+        """
+        Update the latest value and last-seen turn of each entity field present in an interaction.
 
-            logger.info(f"Added interaction to conversation memory: intent={intent}, agent={agent_used}")
+        Args:
+            entities (Dict[str, Any]): Entities extracted for the interaction
+        """
+        turn = sum(self._intent_counter.values())
+        for field, value in entities.items():
+            if value:
+                self._latest_entities[field] = value
+                self._entity_turns[field] = turn
 
-        except Exception as e:
-            logger.error(f"Error adding interaction to conversation memory: {e}")
+    def get_latest_entity(self, field: str, default: Any = None) -> Any:
+        """
+        Get the most recent value of an entity field, even if its interaction has left the recent window.
+
+        Args:
+            field (str): Entity field name (Email, OrderNumber, ProductName, SKU, ReferencedProducts, ...)
+            default (Any): Value returned if the field was never extracted
+
+        Returns:
+            Any: Latest value of the field
+        """
+        return self._latest_entities.get(field, default)
+
+    def get_entity_turn(self, field: str) -> Optional[int]:
+        """
+        Get the 1-based turn in which an entity field was last extracted.
+
+        Args:
+            field (str): Entity field name
+
+        Returns:
+            Optional[int]: Turn number, or None if the field was never extracted
+        """
+        return self._entity_turns.get(field)
 
     def _update_context(self, interaction: Dict[str, Any]) -> None:
         """
@@ -72,42 +148,38 @@ class ConversationMemory:
         Args:
             interaction (Dict[str, Any]): The interaction to process
         """
-        try:
-            intent = interaction["intent"]
-            entities = interaction["entities"]
-            key_info = interaction["key_info"]
-
-            # Update customer information if available
-            if entities.get("Email"):
-                self._conversation_context["customer_email"] = entities["Email"]
-
-            # Handle order-related context
-            if intent == "ORDER_STATUS" and key_info:
-                order_info = {
-                    "order_number": key_info.get("order_number"),
-                    "customer_name": key_info.get("customer_name"),
-                    "products": key_info.get("products", []),
-                    "status": key_info.get("status"),
-                    "last_checked": interaction["timestamp"],
-                }
-                self._conversation_context["last_order_lookup"] = order_info
-
-                # Store product references for contextual questions
-                if key_info.get("products"):
-                    self._conversation_context["recent_products"] = key_info["products"]
-
-            # Handle product recommendation context
-            elif intent == "PRODUCT_RECOMMENDATION" and key_info:
-                if key_info.get("products_mentioned"):
-                    self._conversation_context["recent_products"] = key_info["products_mentioned"]
-
-            # Handle promotion context
-            elif intent == "EARLY_RISERS_PROMOTION" and key_info:
-                if key_info.get("promo_code"):
-                    self._conversation_context["last_promo_code"] = key_info["promo_code"]
+        intent = interaction["intent"]
+        entities = interaction["entities"]
+        key_info = interaction["key_info"]
+
+        # Update customer information if available
+        if entities.get("Email"):
+            self._conversation_context["customer_email"] = entities["Email"]
+
+        # Handle order-related context
+        if intent == "ORDER_STATUS" and key_info:
+            order_info = {
+                "order_number": key_info.get("order_number"),
+                "customer_name": key_info.get("customer_name"),
+                "products": key_info.get("products", []),
+                "status": key_info.get("status"),
+                "last_checked": interaction["timestamp"],
+            }
+            self._conversation_context["last_order_lookup"] = order_info
 
-        except Exception as e:
-            logger.error(f"Error updating conversation context: {e}")
+            # Store product references for contextual questions
+            if key_info.get("products"):
+                self._conversation_context["recent_products"] = key_info["products"]
+
+        # Handle product recommendation context
+        elif intent == "PRODUCT_RECOMMENDATION" and key_info:
+            if key_info.get("products_mentioned"):
+                self._conversation_context["recent_products"] = key_info["products_mentioned"]
+
+        # Handle promotion context
+        elif intent == "EARLY_RISERS_PROMOTION" and key_info:
+            if key_info.get("promo_code"):
+                self._conversation_context["last_promo_code"] = key_info["promo_code"]
 
     def get_contextual_info(self, current_query: str) -> Dict[str, Any]:
         """
@@ -121,14 +193,15 @@ class ConversationMemory:
         """
         try:
             context = {}
+            query_lower = current_query.lower()
 
             # Check if query might be referring to previous order
-            if self._is_order_reference(current_query):
+            if self._is_order_reference(query_lower):
                 if "last_order_lookup" in self._conversation_context:
                     context["referenced_order"] = self._conversation_context["last_order_lookup"]
 
             # Check if query might be referring to products
-            if self._is_product_reference(current_query):
+            if self._is_product_reference(query_lower):
                 if "recent_products" in self._conversation_context:
                     context["referenced_products"] = self._conversation_context["recent_products"]
 
@@ -146,58 +219,29 @@ class ConversationMemory:
             logger.error(f"Error getting contextual info: {e}")
             return {}
 
-    def _is_order_reference(self, query: str) -> bool:
+    def _is_order_reference(self, query_lower: str) -> bool:
         """
         Check if the query might be referring to a previous order lookup.
 
         Args:
-            query (str): The user query
+            query_lower (str): The user query, lowercased
 
         Returns:
             bool: True if query seems to reference previous order
         """
-        order_reference_keywords = [
-            "that order",
-            "my order",
-            "the order",
-            "this order",
-            "those products",
-            "these products",
-            "the products",
-            "my products",
-            "what are those",
-            "what are these",
-            "tell me about",
-            "more about",
-        ]
-
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in order_reference_keywords)
+        return _ORDER_REFERENCE_RE.search(query_lower) is not None
 
-    def _is_product_reference(self, query: str) -> bool:
+    def _is_product_reference(self, query_lower: str) -> bool:
         """
         Check if the query might be referring to products mentioned earlier.
 
         Args:
-            query (str): The user query
+            query_lower (str): The user query, lowercased
 
         Returns:
             bool: True if query seems to reference previous products
         """
-        product_reference_keywords = [
-            "those products",
-            "these products",
-            "the products",
-            "what are those",
-            "what are these",
-            "tell me about them",
-            "more details",
-            "more info",
-            "describe them",
-        ]
-
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in product_reference_keywords)
+        return _PRODUCT_REFERENCE_RE.search(query_lower) is not None
 
     def _get_recent_summary(self) -> str:
         """
@@ -206,49 +250,112 @@ class ConversationMemory:
         Returns:
             str: Summary of recent interactions
         """
-        try:
-            if not self._recent_interactions:
-                return ""
-
-            key_info = {}
-            summary_parts = []
-            for interaction in self._recent_interactions[-3:]:  # Last 3 interactions
-                intent = interaction["intent"]
-                key_info = interaction.get("key_info", {})
-
-                if intent == "ORDER_STATUS":
-                    if key_info.get("order_number", ""):
-                        summary_parts.append(
-                            f"Looked up order {key_info['order_number']} with products {key_info.get('products', [])}"
-                        )
-                elif intent == "PRODUCT_RECOMMENDATION":
-                    summary_parts.append(f"Provided product recommendations about {key_info.get('products_mentioned', [])}")
-                elif intent == "EARLY_RISERS_PROMOTION":
-                    summary_parts.append(f"Provided Early Risers promotion code {key_info.get('promo_code', '')}")
-                elif intent == "WHO_ARE_YOU":
-                    summary_parts.append(f"Provided a brief introduction about Adventure Outfitters")
-                else:
-                    summary_parts.append(f"No relevant intent was detected. Asked the user to clarify and reiterated about the capabilities of the agent")
-                if key_info.get("entities"):
-                    summary_parts.append(f"Entities that were extracted from the user query: {key_info.get('entities', [])}")
-
-            return "; ".join(summary_parts)
-
-        except Exception as e:
-            logger.error(f"Error generating recent summary: {e}")
+        if not self._recent_interactions:
             return ""
 
+        key_info = {}
+        summary_parts = []
+        recent = itertools.islice(self._recent_interactions, max(0, len(self._recent_interactions) - 3), None)
+        for interaction in recent:  # Last 3 interactions
+            intent = interaction["intent"]
+            key_info = interaction.get("key_info", {})
+
+            if intent == "ORDER_STATUS":
+                if key_info.get("order_number", ""):
+                    summary_parts.append(
+                        f"Looked up order {key_info['order_number']} with products {key_info.get('products', [])}"
+                    )
+            elif intent == "PRODUCT_RECOMMENDATION":
+                summary_parts.append(f"Provided product recommendations about {key_info.get('products_mentioned', [])}")
+            elif intent == "EARLY_RISERS_PROMOTION":
+                summary_parts.append(f"Provided Early Risers promotion code {key_info.get('promo_code', '')}")
+            elif intent == "WHO_ARE_YOU":
+                summary_parts.append(f"Provided a brief introduction about Adventure Outfitters")
+            else:
+                summary_parts.append(f"No relevant intent was detected. Asked the user to clarify and reiterated about the capabilities of the agent")
+            if key_info.get("entities"):
+                summary_parts.append(f"Entities that were extracted from the user query: {key_info.get('entities', [])}")
+
+        return "; ".join(summary_parts)
+
     def clear_context(self) -> None:
         """
         Clear all conversation context (useful for new conversations).
         """
         self._conversation_context.clear()
         self._recent_interactions.clear()
+        self._intent_counter.clear()
+        self._latest_entities.clear()
+        self._entity_turns.clear()
         logger.info("Conversation context cleared")
 
+    def fingerprint(self) -> str:
+        """
+        Get a short hash of the conversation state, ignoring timestamps.
+
+        Two memories with the same fingerprint give the coordinator the same context,
+        so a response produced from one is valid for the other.
+
+        Returns:
+            str: Hex digest identifying the current conversation state
+        """
+        context = dict(self._conversation_context)
+        if "last_order_lookup" in context:
+            context["last_order_lookup"] = {
+                key: value for key, value in context["last_order_lookup"].items() if key != "last_checked"
+            }
+        interactions = [
+            {key: value for key, value in interaction.items() if key != "timestamp"}
+            for interaction in self._recent_interactions
+        ]
+        payload = json.dumps({"context": context, "interactions": interactions}, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a deep copy of the conversation state that can later be passed to restore().
+
+        Returns:
+            Dict[str, Any]: Copy of the conversation context, recent interactions, intent counts and latest entities
+        """
+        return copy.deepcopy(
+            {
+                **self.get_full_context(),
+                "intent_counts": self.get_intent_counts(),
+                "latest_entities": self._latest_entities,
+                "entity_turns": self._entity_turns,
+            }
+        )
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Replace the conversation state with a copy of a previous snapshot.
+
+        Args:
+            snapshot (Dict[str, Any]): State returned by snapshot()
+        """
+        snapshot = copy.deepcopy(snapshot)
+        self._conversation_context = snapshot["context"]
+        self._recent_interactions = deque(snapshot["recent_interactions"], maxlen=self._max_recent_interactions)
+        self._intent_counter = Counter(snapshot["intent_counts"])
+        self._latest_entities = snapshot["latest_entities"]
+        self._entity_turns = snapshot["entity_turns"]
+
+    def get_intent_counts(self) -> Dict[str, int]:
+        """
+        Get how many interactions of each intent the conversation has had.
+
+        Unlike recent_interactions, the counts cover the whole conversation.
+
+        Returns:
+            Dict[str, int]: Interaction count per intent name
+        """
+        return dict(self._intent_counter)
+
     def get_full_context(self) -> Dict[str, Any]:
         """
         Get the full conversation context for debugging or advanced use cases.
+        The returned containers are the live ones, not copies.
 
         Returns:
             Dict[str, Any]: Full conversation context
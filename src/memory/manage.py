@@ -57,6 +57,25 @@ class StateManager:
         """
         return self._state.get(key)
 
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of the current state entries.
+
+        Returns:
+            Dict[str, Any]: The state entries in insertion order.
+        """
+        return dict(self._state)
+
+    def restore(self, entries: Dict[str, Any]) -> None:
+        """
+        Replace the state with previously snapshotted entries.
+
+        Args:
+            entries (Dict[str, Any]): Entries returned by snapshot().
+        """
+        self._state = OrderedDict(entries)
+        self._state_md = self.to_markdown() if self._state else None
+
     def clear_state(self) -> None:
         """
         Clear all state entries.
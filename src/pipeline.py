@@ -1,11 +1,70 @@
-from typing import List, Union
+import asyncio
+import difflib
+import functools
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple, Union
 
 from src.agents.coordinator import AdventureOutfittersAgent
-from src.agents.delegates.early_risers_promotion import EarlyRisersPromotionAgent
+from src.agents.delegates.early_risers_promotion import EarlyRisersPromotionAgent, _promo_writer
 from src.agents.delegates.order_status import OrderStatusAgent
 from src.agents.delegates.product_recommendation import ProductRecommendationAgent
+from src.agents.agent import Agent
+from src.common import event_loop
+from src.common.io import load_json_shared
 from src.common.message import Message
 from src.common.logging import logger
+from src.constants import CUSTOMER_ORDERS_FILE, PRODUCT_CATALOG_FILE
+from src.prompt.manage import TemplateManager
+
+# Requests that pull product catalog context into the prompt, or are long themselves
+_PREFILL_HEAVY_KEYWORDS = frozenset({"recommend", "show", "compare", "summarize"})
+_PREFILL_HEAVY_WORDS = 40
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Queries naming an order, SKU or email must match exactly to be served from cache
+_CACHE_EXACT_ONLY_RE = re.compile(r"\d|@")
+
+
+def _request_kind(query: str) -> Literal["prefill_heavy", "decode_heavy"]:
+    """
+    Classify a query by where its LLM time goes. Catalog browsing and long queries carry large
+    prompts (prefill heavy); short follow-ups such as order numbers, SKUs, emails and
+    pronoun questions carry small prompts (decode heavy).
+    """
+    words = _WORD_RE.findall(query.lower())
+    if len(query.split()) > _PREFILL_HEAVY_WORDS or _PREFILL_HEAVY_KEYWORDS.intersection(words):
+        return "prefill_heavy"
+    return "decode_heavy"
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_template_manager() -> TemplateManager:
+    """
+    Parsed template config shared by every pipeline, loaded once per process.
+    """
+    template_manager = TemplateManager(Agent.TEMPLATE_PATH)
+    template_manager.preload()
+    return template_manager
+
+
+def _build_shared_resources() -> Dict:
+    """
+    Get the read-only resources every pipeline needs: the order and product data and the
+    parsed template config, shared by every pipeline that isn't given its own resources.
+    The data files are parsed once and again only when they change on disk (see
+    load_json_shared), so new pipelines pick up edited data; a file that fails to load is
+    retried by the next pipeline.
+    """
+    return {
+        "orders_data": load_json_shared(CUSTOMER_ORDERS_FILE) or [],
+        "products_data": load_json_shared(PRODUCT_CATALOG_FILE) or [],
+        "template_manager": _shared_template_manager(),
+    }
 
 
 class AdventureOutfittersPipeline:
@@ -13,12 +72,41 @@ class AdventureOutfittersPipeline:
     Main pipeline for Adventure Outfitters customer service agent system.
     """
 
-    def __init__(self, session_id: str):
+    # Upper bound on sessions processed concurrently by process_queries_batch
+    MAX_BATCH_WORKERS = 8
+
+    # Opt-in response cache shared by all pipelines, see enable_response_cache
+    _response_cache: Optional[OrderedDict] = None
+    _response_cache_maxsize = 256
+    _response_cache_ttl: Optional[float] = None
+    _response_cache_similarity = 0.95
+    _response_cache_lock = threading.Lock()
+
+    def __init__(
+        self, session_id: Optional[str] = None, shared_resources: Optional[Dict] = None, warmup: bool = False
+    ):
+        session_id = session_id or str(uuid.uuid4())
         self.session_id = session_id
+        # Plain pipelines reuse the process-wide data and templates too; pass a dict to override them
+        shared_resources = _build_shared_resources() if shared_resources is None else shared_resources
+        template_manager = shared_resources.get("template_manager")
+
         # Initialize specialized agents
-        self.order_status_agent = OrderStatusAgent(name="OrderStatusAgent", session_id=session_id)
-        self.product_recommendation_agent = ProductRecommendationAgent(name="ProductRecommendationAgent", session_id=session_id)
-        self.early_risers_promotion_agent = EarlyRisersPromotionAgent(name="EarlyRisersPromotionAgent", session_id=session_id)
+        self.order_status_agent = OrderStatusAgent(
+            name="OrderStatusAgent",
+            session_id=session_id,
+            orders_data=shared_resources.get("orders_data"),
+            template_manager=template_manager,
+        )
+        self.product_recommendation_agent = ProductRecommendationAgent(
+            name="ProductRecommendationAgent",
+            session_id=session_id,
+            products_data=shared_resources.get("products_data"),
+            template_manager=template_manager,
+        )
+        self.early_risers_promotion_agent = EarlyRisersPromotionAgent(
+            name="EarlyRisersPromotionAgent", session_id=session_id, template_manager=template_manager
+        )
 
         # Initialize the main coordinator agent
         self.adventure_outfitters_agent = AdventureOutfittersAgent(
@@ -29,33 +117,378 @@ class AdventureOutfittersPipeline:
                 self.early_risers_promotion_agent,
             ],
             session_id=session_id,
+            template_manager=template_manager,
         )
 
         logger.info(f"Adventure Outfitters Pipeline initialized successfully for session {session_id}")
 
+        if warmup:
+            self.warmup()
+
+    @classmethod
+    def fresh_conversation(cls, session_id: Optional[str] = None) -> "AdventureOutfittersPipeline":
+        """
+        Create a pipeline with its own conversation state that reuses the process-wide
+        order/product data and template config instead of loading them again.
+        """
+        return cls(session_id, shared_resources=_build_shared_resources())
+
+    def warmup(self) -> None:
+        """
+        Pay the one-off setup costs up front so the first real query runs at steady-state latency:
+        reads every template file, builds the order and catalog indexes, starts the promo-code
+        writer thread and sends a one-token request through each agent's LLM adapter to open its
+        HTTP connection. LLM failures are logged and ignored.
+        """
+        self.coordinator.template_manager.preload()
+        self.order_status_agent.find_order("", "")
+        self.product_recommendation_agent.search_products("warmup")
+        _promo_writer.start()
+
+        agents = [self.coordinator, *self.coordinator.sub_agents.values()]
+        adapters = {id(agent.llm_adapter): agent.llm_adapter for agent in agents}
+        for adapter in adapters.values():
+            if not adapter.is_available():
+                continue
+            try:
+                adapter.chat([{"role": "user", "content": "ping"}], max_output_tokens=1)
+            except Exception as e:
+                logger.warning(f"LLM warmup request failed for {adapter.get_provider_name()}: {e}")
+
+        logger.info(f"Pipeline warmed up for session {self.session_id}")
+
     @property
     def coordinator(self):
         """Access to the main coordinator agent."""
         return self.adventure_outfitters_agent
 
-    def process_query(self, query: str) -> str:
+    def reset_memory(self) -> None:
+        """
+        Start a new conversation on this pipeline: clears the conversation memory and any partial
+        order lookup, keeping the agents and session id.
+        """
+        self.coordinator.conversation_memory.clear_context()
+        self.order_status_agent.state_manager.clear_state()
+
+    @classmethod
+    def enable_response_cache(
+        cls, maxsize: int = 256, ttl_seconds: Optional[float] = None, similarity: float = 0.95
+    ) -> None:
         """
-        Process a single customer query and return the response.
+        Reuse responses for queries repeated from the same conversation state.
+
+        Entries are keyed on the normalized query and a fingerprint of the conversation and order
+        state, and a hit restores the state the original turn left behind. Meant for demo runs,
+        where fresh pipelines keep asking the same questions; Early Risers turns are never cached
+        because every request must get its own promo code.
+
+        Opening queries of a fresh conversation that don't name an order, SKU or email can also be
+        served from a near-identical cached query (difflib ratio >= similarity), so small wording or
+        punctuation differences still hit. Entries expire after ttl_seconds when it is set.
+        """
+        with cls._response_cache_lock:
+            cls._response_cache = OrderedDict()
+            cls._response_cache_maxsize = maxsize
+            cls._response_cache_ttl = ttl_seconds
+            cls._response_cache_similarity = similarity
+        logger.info(f"Response cache enabled with maxsize {maxsize}, ttl {ttl_seconds}, similarity {similarity}")
+
+    def process_query(self, query: str, max_output_tokens: Optional[int] = None) -> str:
+        """
+        Process a single customer query and return the response, using the response cache when enabled.
+        max_output_tokens caps the generated response, for callers that only show a prefix of it.
+        """
+        cache = self._response_cache
+        if cache is None:
+            return self._process_query_nocache(query, max_output_tokens)[0]
+
+        memory = self.coordinator.conversation_memory
+        state_before = self._state_fingerprint()
+        normalized = " ".join(query.split()).lower()
+        key = (normalized, state_before, max_output_tokens)
+        first_turn = not memory.get_full_context()["recent_interactions"]
+        allow_similar = first_turn and not _CACHE_EXACT_ONLY_RE.search(normalized)
+        cached = self._cache_lookup(key, allow_similar)
+
+        if cached is not None:
+            response, state_after = cached
+            self._restore_state(state_after)
+            logger.info(f"Response cache hit for query: '{query}'")
+            return response
+
+        response, generated = self._process_query_nocache(query, max_output_tokens)
+
+        # Only cache generated replies to turns that were recorded in memory and don't hand out a promo code.
+        # A static fallback would otherwise be replayed for every repeat of a query whose LLM call failed.
+        recent_interactions = memory.get_full_context()["recent_interactions"]
+        if (
+            generated
+            and recent_interactions
+            and self._state_fingerprint() != state_before
+            and recent_interactions[-1]["intent"] != "EARLY_RISERS_PROMOTION"
+        ):
+            expires_at = time.monotonic() + self._response_cache_ttl if self._response_cache_ttl else None
+            with self._response_cache_lock:
+                cache[key] = (response, self._snapshot_state(), expires_at)
+                if len(cache) > self._response_cache_maxsize:
+                    cache.popitem(last=False)
+
+        return response
+
+    def _cache_lookup(self, key: tuple, allow_similar: bool) -> Optional[tuple]:
+        """
+        Find a live cache entry for key, falling back to the most similar query cached from the same
+        state when allow_similar is set. Returns (response, state) or None.
+        """
+        cache = self._response_cache
+        normalized, state, max_output_tokens = key
+        now = time.monotonic()
+        with self._response_cache_lock:
+            entry = cache.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= now:
+                del cache[key]
+                entry = None
+
+            if entry is None and allow_similar:
+                best_ratio = self._response_cache_similarity
+                matcher = difflib.SequenceMatcher(b=normalized, autojunk=False)
+                for candidate_key, candidate in cache.items():
+                    expired = candidate[2] is not None and candidate[2] <= now
+                    if candidate_key[1:] != (state, max_output_tokens) or expired:
+                        continue
+                    matcher.set_seq1(candidate_key[0])
+                    if matcher.quick_ratio() >= best_ratio and matcher.ratio() >= best_ratio:
+                        best_ratio = matcher.ratio()
+                        key, entry = candidate_key, candidate
+
+            if entry is None:
+                return None
+            cache.move_to_end(key)
+            return entry[0], entry[1]
+
+    def _state_fingerprint(self) -> str:
+        """
+        Fingerprint of everything a turn reads besides the query: conversation memory and order lookup state.
+        """
+        memory_fingerprint = self.coordinator.conversation_memory.fingerprint()
+        return f"{memory_fingerprint}:{self.order_status_agent.state_manager.to_markdown()}"
+
+    def _snapshot_state(self) -> Dict:
+        """
+        Copy the conversation memory and order lookup state.
+        """
+        return {
+            "memory": self.coordinator.conversation_memory.snapshot(),
+            "order_state": self.order_status_agent.state_manager.snapshot(),
+        }
+
+    def _restore_state(self, state: Dict) -> None:
+        """
+        Restore state captured by _snapshot_state.
+        """
+        self.coordinator.conversation_memory.restore(state["memory"])
+        self.order_status_agent.state_manager.restore(state["order_state"])
+
+    def _process_query_nocache(self, query: str, max_output_tokens: Optional[int] = None) -> Tuple[str, bool]:
+        """
+        Process a single customer query, bypassing the response cache. Returns the response and
+        whether it was generated, False when a static fallback or error reply was sent instead.
         """
         try:
             message = Message(content=query, sender="Customer", recipient="AdventureOutfittersAgent")
-            response_message = self.adventure_outfitters_agent.process(message)
+            response_message = self.adventure_outfitters_agent.process(message, max_output_tokens)
 
             logger.info(f"Query processed: '{query}' -> Response: '{response_message.content[:100]}...'")
-            return response_message.content
+            return response_message.content, not response_message.metadata.get("fallback")
 
         except Exception as e:
-            logger.error(f"Error processing query '{query}': {e}")
-            unexpected_error_msg = (
-                "🏔️ I encountered an unexpected error. Please try again or contact "
-                "our support team. Onward into the unknown! 🌟"
-            )
-            return unexpected_error_msg
+            return self._unexpected_error_response(query, e), False
+
+    def process_query_stream(self, query: str, max_output_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Process a single customer query and yield the response in chunks as the LLM generates it.
+
+        Conversation memory is updated before the first chunk is yielded. Streamed turns don't use
+        the response cache.
+        """
+        try:
+            message = Message(content=query, sender="Customer", recipient="AdventureOutfittersAgent")
+            turn = self.adventure_outfitters_agent.prepare_turn(message)
+        except Exception as e:
+            yield self._unexpected_error_response(query, e)
+            return
+
+        yield from self.adventure_outfitters_agent.complete_turn_stream(turn, max_output_tokens)
+
+    @staticmethod
+    def _unexpected_error_response(query: str, e: Exception) -> str:
+        """
+        Log a failed query and return the customer-facing fallback message.
+        """
+        logger.error(f"Error processing query '{query}': {e}")
+        unexpected_error_msg = (
+            "🏔️ I encountered an unexpected error. Please try again or contact "
+            "our support team. Onward into the unknown! 🌟"
+        )
+        return unexpected_error_msg
+
+    async def aprocess_query(self, query: str, max_output_tokens: Optional[int] = None) -> str:
+        """
+        Async counterpart of process_query.
+
+        The LLM providers expose blocking clients, so the query runs in a worker thread and the event
+        loop stays free to drive other conversations while this one waits on the network.
+        """
+        return await asyncio.to_thread(self.process_query, query, max_output_tokens)
+
+    async def aprocess_conversation(
+        self,
+        queries: List[str],
+        depth: int = 2,
+        on_turn_prepared: Optional[Callable[[int], None]] = None,
+        max_output_tokens: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Process the turns of one conversation in order, keeping up to `depth` turns in flight.
+
+        A turn only depends on the previous turn's routing, delegation and memory update, not on its
+        final wording. Once that stateful stage of turn N is done, turn N+1 starts while turn N's
+        consolidation and supervisor calls are still waiting on the LLM. `on_turn_prepared(index)` is
+        called after each turn's stateful stage, when conversation memory reflects that turn.
+        max_output_tokens caps each generated response.
+        """
+        in_flight = asyncio.Semaphore(max(1, depth))
+
+        async def complete(query: str, turn: dict) -> str:
+            try:
+                response_message = await asyncio.to_thread(
+                    self.adventure_outfitters_agent.complete_turn, turn, max_output_tokens
+                )
+                logger.info(f"Query processed: '{query}' -> Response: '{response_message.content[:100]}...'")
+                return response_message.content
+            except Exception as e:
+                return self._unexpected_error_response(query, e)
+            finally:
+                in_flight.release()
+
+        results: List[Union[str, asyncio.Task]] = []
+        for index, query in enumerate(queries):
+            await in_flight.acquire()
+            try:
+                message = Message(content=query, sender="Customer", recipient="AdventureOutfittersAgent")
+                turn = await asyncio.to_thread(self.adventure_outfitters_agent.prepare_turn, message)
+            except Exception as e:
+                in_flight.release()
+                results.append(self._unexpected_error_response(query, e))
+                continue
+
+            if on_turn_prepared is not None:
+                on_turn_prepared(index)
+            results.append(asyncio.create_task(complete(query, turn)))
+
+        return [await result if isinstance(result, asyncio.Task) else result for result in results]
+
+    def process_conversation(
+        self, queries: List[str], depth: int = 2, max_output_tokens: Optional[int] = None
+    ) -> List[str]:
+        """
+        Blocking wrapper around aprocess_conversation for callers outside an event loop.
+        """
+        return event_loop.run(self.aprocess_conversation(queries, depth=depth, max_output_tokens=max_output_tokens))
+
+    @classmethod
+    def process_queries_batch(
+        cls,
+        queries: List[str],
+        session_ids: Optional[List[str]] = None,
+        max_output_tokens: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Process a batch of queries and return the responses in input order.
+
+        Queries sharing a session id form one conversation and are processed in order on the same
+        pipeline; distinct sessions are independent and run concurrently, so the LLM round-trips of
+        independent scenarios overlap instead of queueing behind each other. When no session ids are
+        given, every query is treated as its own single-turn session. max_output_tokens caps each response.
+
+        Sessions are split into a prefill-heavy lane (catalog browsing, long queries) and a decode-heavy
+        lane (short follow-ups), each with its own workers, so quick lookups don't queue behind
+        large-prompt requests.
+        """
+        if session_ids is None:
+            session_ids = [str(uuid.uuid4()) for _ in queries]
+        if len(session_ids) != len(queries):
+            raise ValueError("session_ids must have the same length as queries.")
+
+        conversations: Dict[str, List[int]] = {}
+        for index, session_id in enumerate(session_ids):
+            conversations.setdefault(session_id, []).append(index)
+
+        responses: List[str] = [""] * len(queries)
+
+        def run_conversation(session_id: str, indices: List[int]) -> None:
+            pipeline = cls.fresh_conversation(session_id)
+            for index in indices:
+                responses[index] = pipeline.process_query(queries[index], max_output_tokens)
+
+        # A conversation runs in one lane; any prefill-heavy turn puts it in the prefill lane
+        prefill_lane, decode_lane = [], []
+        for session_id, indices in conversations.items():
+            if any(_request_kind(queries[index]) == "prefill_heavy" for index in indices):
+                prefill_lane.append((session_id, indices))
+            else:
+                decode_lane.append((session_id, indices))
+
+        # Longest conversations first: similar-sized requests run side by side and the longest ones
+        # don't start last and stretch the batch
+        def estimated_size(conversation: tuple) -> tuple:
+            indices = conversation[1]
+            return len(indices), sum(len(queries[index].split()) for index in indices)
+
+        prefill_lane.sort(key=estimated_size, reverse=True)
+        decode_lane.sort(key=estimated_size, reverse=True)
+
+        def lane_workers(lane: list, other_lane: list) -> int:
+            share = cls.MAX_BATCH_WORKERS // 2 if other_lane else cls.MAX_BATCH_WORKERS
+            return max(1, min(share, len(lane)))
+
+        with ThreadPoolExecutor(max_workers=lane_workers(prefill_lane, decode_lane)) as prefill_pool, \
+                ThreadPoolExecutor(max_workers=lane_workers(decode_lane, prefill_lane)) as decode_pool:
+            futures = [prefill_pool.submit(run_conversation, sid, indices) for sid, indices in prefill_lane]
+            futures += [decode_pool.submit(run_conversation, sid, indices) for sid, indices in decode_lane]
+            for future in futures:
+                future.result()
+
+        logger.info(
+            f"Processed batch of {len(queries)} queries across {len(conversations)} sessions "
+            f"({len(prefill_lane)} prefill-heavy, {len(decode_lane)} decode-heavy)"
+        )
+        return responses
+
+    def lookup_orders_bulk(self, lookups: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Look up several orders at once, without running a conversation turn per order.
+
+        Args:
+            lookups: (email, order_number) pairs
+
+        Returns:
+            One record per pair, in input order, with the email, order_number and matching order
+            (None if not found)
+        """
+        orders = self.order_status_agent.find_orders(lookups)
+        return [
+            {"email": email, "order_number": order_number, "order": order}
+            for (email, order_number), order in zip(lookups, orders)
+        ]
+
+    def format_order_responses_batch(self, records: List[Dict]) -> List[str]:
+        """
+        Format customer-facing status messages for records returned by lookup_orders_bulk.
+        Uses the order agent's own status template, so no LLM calls are made.
+        """
+        format_order_status = self.order_status_agent.format_order_status
+        return [format_order_status(record["email"], record["order_number"], record["order"]) for record in records]
 
     def execute(self, queries: Union[str, List[str]]) -> None:
         """
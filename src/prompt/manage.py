@@ -1,3 +1,5 @@
+import functools
+import os
 from typing import Dict
 
 import yaml
@@ -5,6 +7,15 @@ import yaml
 from src.common.logging import logger
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_yaml(filename: str, mtime: float) -> Dict:
+    """
+    Parse a YAML file. Keyed on the modification time as well, so an edited file is parsed again.
+    """
+    with open(filename, "r") as file:
+        return yaml.safe_load(file)
+
+
 class TemplateManager:
     """
     Simple template manager for loading and filling text templates.
@@ -15,14 +26,15 @@ class TemplateManager:
         Initialize the TemplateManager with a configuration file.
         """
         self.config = self._load_yaml(config_path)
+        self._template_files: Dict[str, str] = {}  # Template file contents by path, read once
+        self._templates: Dict[tuple, Dict[str, str]] = {}  # System/user templates by (role, action)
 
     def _load_yaml(self, filename: str) -> Dict:
         """
-        Load a YAML configuration file.
+        Load a YAML configuration file, reusing the parse while the file is unchanged.
         """
         try:
-            with open(filename, "r") as file:
-                return yaml.safe_load(file)
+            return _parse_yaml(filename, os.path.getmtime(filename))
         except FileNotFoundError:
             logger.error(f"Configuration file not found: {filename}")
             raise
@@ -41,13 +53,19 @@ class TemplateManager:
         Returns:
             Dictionary with 'system' and 'user' template content
         """
+        cached = self._templates.get((role, action))
+        if cached is not None:
+            return dict(cached)
+
         try:
             template_config = self.config[role][action]
 
-            return {
+            template = {
                 "system": self._load_template_file(template_config["system_instructions"]),
                 "user": self._load_template_file(template_config["user_instructions"]),
             }
+            self._templates[(role, action)] = template
+            return dict(template)
         except KeyError as e:
             logger.error(f"Template configuration not found: {role}.{action} - {e}")
             raise
@@ -55,13 +73,28 @@ class TemplateManager:
             logger.error(f"Error creating template for {role}.{action}: {e}")
             raise
 
+    def preload(self) -> None:
+        """
+        Read every template file named in the configuration, so the first turn doesn't pay for file I/O.
+        """
+        for role, actions in self.config.items():
+            for action in actions:
+                self.create_template(role, action)
+        logger.info(f"Preloaded {len(self._template_files)} template files")
+
     def _load_template_file(self, template_path: str) -> str:
         """
-        Load template content from a file.
+        Load template content from a file, reading each file only once.
         """
+        cached = self._template_files.get(template_path)
+        if cached is not None:
+            return cached
+
         try:
             with open(template_path, "r") as file:
-                return file.read()
+                content = file.read()
+            self._template_files[template_path] = content
+            return content
         except FileNotFoundError:
             logger.error(f"Template file not found: {template_path}")
             raise
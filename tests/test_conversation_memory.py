@@ -0,0 +1,97 @@
+"""
+Test suite for ConversationMemory bookkeeping.
+These tests don't depend on LLM responses.
+"""
+
+import unittest
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from memory.conversation import ConversationMemory
+
+
+class TestIntentCounts(unittest.TestCase):
+    """Test the per-intent interaction counts."""
+
+    def setUp(self):
+        """Set up an empty memory for each test."""
+        self.memory = ConversationMemory()
+
+    def test_counts_cover_whole_conversation(self):
+        """Test: Counts keep growing after old interactions leave the recent window."""
+        for _ in range(6):
+            self.memory.add_interaction("ORDER_STATUS", "#W001", {}, "OrderStatusAgent")
+        self.memory.add_interaction("UNKNOWN", "hello", {}, "None")
+
+        self.assertEqual(self.memory.get_intent_counts(), {"ORDER_STATUS": 6, "UNKNOWN": 1})
+        self.assertEqual(len(self.memory.get_full_context()["recent_interactions"]), 5)
+
+    def test_clear_and_restore(self):
+        """Test: Clearing resets the counts and restoring a snapshot brings them back."""
+        self.memory.add_interaction("PRODUCT_RECOMMENDATION", "backpacks", {}, "ProductRecommendationAgent")
+        snapshot = self.memory.snapshot()
+
+        self.memory.clear_context()
+        self.assertEqual(self.memory.get_intent_counts(), {})
+
+        self.memory.restore(snapshot)
+        self.assertEqual(self.memory.get_intent_counts(), {"PRODUCT_RECOMMENDATION": 1})
+
+    def test_restored_window_stays_bounded(self):
+        """Test: The recent window keeps its limit after a restore."""
+        snapshot = self.memory.snapshot()
+        self.memory.restore(snapshot)
+        for i in range(7):
+            self.memory.add_interaction("ORDER_STATUS", f"#W00{i}", {}, "OrderStatusAgent")
+
+        recent = self.memory.get_full_context()["recent_interactions"]
+        self.assertEqual([interaction["query"] for interaction in recent], [f"#W00{i}" for i in range(2, 7)])
+
+
+class TestLatestEntities(unittest.TestCase):
+    """Test the per-field latest entity store."""
+
+    def setUp(self):
+        """Set up an empty memory for each test."""
+        self.memory = ConversationMemory()
+
+    def test_latest_value_outlives_recent_window(self):
+        """Test: The latest value of a field is kept after its interaction is evicted."""
+        self.memory.add_interaction("ORDER_STATUS", "me@example.com", {"Email": "me@example.com"}, "OrderStatusAgent")
+        for _ in range(5):
+            self.memory.add_interaction(
+                "PRODUCT_RECOMMENDATION", "tents", {"ProductName": "tent"}, "ProductRecommendationAgent"
+            )
+
+        self.assertEqual(self.memory.get_latest_entity("Email"), "me@example.com")
+        self.assertEqual(self.memory.get_entity_turn("Email"), 1)
+        self.assertEqual(self.memory.get_entity_turn("ProductName"), 6)
+        self.assertIsNone(self.memory.get_latest_entity("SKU"))
+
+    def test_empty_values_are_ignored(self):
+        """Test: Empty entity values don't overwrite the latest known value."""
+        self.memory.add_interaction("ORDER_STATUS", "#W001", {"OrderNumber": "#W001"}, "OrderStatusAgent")
+        self.memory.add_interaction("ORDER_STATUS", "hm", {"OrderNumber": None}, "OrderStatusAgent")
+
+        self.assertEqual(self.memory.get_latest_entity("OrderNumber"), "#W001")
+
+
+class TestReferenceDetection(unittest.TestCase):
+    """Test detection of queries that refer back to earlier turns."""
+
+    def test_reference_phrases(self):
+        """Test: Reference phrases are found in any case; other queries aren't references."""
+        memory = ConversationMemory()
+        memory._conversation_context.update(last_order_lookup={"order_number": "#W001"}, recent_products=["SOBP001"])
+
+        self.assertIn("referenced_order", memory.get_contextual_info("What's in THAT ORDER?"))
+        self.assertIn("referenced_products", memory.get_contextual_info("Tell Me About Them please"))
+        self.assertNotIn("referenced_order", memory.get_contextual_info("I need a tent"))
+        self.assertNotIn("referenced_products", memory.get_contextual_info("Tell me about tents"))
+
+
+if __name__ == '__main__':
+    unittest.main()
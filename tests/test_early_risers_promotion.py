@@ -0,0 +1,149 @@
+"""
+Test suite for the Early Risers promotion window.
+These tests don't depend on LLM responses.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.delegates import early_risers_promotion
+from agents.delegates.early_risers_promotion import EarlyRisersPromotionAgent, _promo_writer
+from common.io import JsonWriteBehind, load_jsonl
+
+
+class TestEarlyRisersWindow(unittest.TestCase):
+    """Test the 8-10 AM Pacific eligibility check."""
+
+    def setUp(self):
+        """Set up the promotion agent."""
+        self.agent = EarlyRisersPromotionAgent(name="EarlyRisersPromotionAgent", session_id="test-session")
+        self.pacific = ZoneInfo("US/Pacific")
+
+    def test_inside_window(self):
+        """Test: 8:00 and 9:59 Pacific are eligible."""
+        self.assertTrue(self.agent.is_early_risers_time(datetime(2025, 8, 5, 8, 0, tzinfo=self.pacific)))
+        self.assertTrue(self.agent.is_early_risers_time(datetime(2025, 8, 5, 9, 59, tzinfo=self.pacific)))
+
+    def test_outside_window(self):
+        """Test: 7:30 and 10:00 Pacific are not eligible."""
+        self.assertFalse(self.agent.is_early_risers_time(datetime(2025, 8, 5, 7, 30, tzinfo=self.pacific)))
+        self.assertFalse(self.agent.is_early_risers_time(datetime(2025, 8, 5, 10, 0, tzinfo=self.pacific)))
+
+
+class TestJsonWriteBehind(unittest.TestCase):
+    """Test the background JSON writer used for promo codes."""
+
+    def test_flush_writes_latest_data(self):
+        """Test: After flush, the file holds the last data queued for it."""
+        writer = JsonWriteBehind()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "promo_codes.json")
+            for i in range(5):
+                writer.save(path, {"count": i})
+            writer.flush()
+
+            with open(path) as file:
+                self.assertEqual(json.load(file), {"count": 4})
+
+    def test_full_queue_saves_synchronously(self):
+        """Test: A save that doesn't fit in the queue is written before save returns."""
+        writer = JsonWriteBehind(maxsize=1)
+        writer.start = lambda: None  # No writer thread, so the queue stays full
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "promo_codes.json")
+            writer.save(path, {"queued": True})
+            writer.save(path, {"queued": False})
+
+            with open(path) as file:
+                self.assertEqual(json.load(file), {"queued": False})
+
+    def test_appended_records_keep_order(self):
+        """Test: Appended records are all written, in order, and a torn last line is skipped on load."""
+        writer = JsonWriteBehind()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "promo_codes.jsonl")
+            for i in range(5):
+                writer.append(path, {"count": i})
+            writer.flush()
+            with open(path, "a") as file:
+                file.write('{"count": ')
+
+            self.assertEqual(load_jsonl(path), [{"count": i} for i in range(5)])
+
+
+class TestPromoCodeLog(unittest.TestCase):
+    """Test the promo codes shared through the append-only log."""
+
+    def agent(self, session_id, path):
+        """Create an agent that reads and writes the log at path."""
+        agent = EarlyRisersPromotionAgent(name="EarlyRisersPromotionAgent", session_id=session_id)
+        agent.promo_db_path = path
+        agent.legacy_promo_db_path = os.path.join(os.path.dirname(path), "promo_codes.json")
+        agent.promo_codes = agent._load_promo_codes()
+        return agent
+
+    def test_agents_share_codes_in_process(self):
+        """Test: Agents on the same log share one dict, so a repeat request reuses the session's code."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "promo_codes.jsonl")
+            first = self.agent("session-1", path)
+            code = first.generate_promo_code()
+
+            second = self.agent("session-1", path)
+            self.assertIs(second.promo_codes, first.promo_codes)
+            self.assertEqual(second.generate_promo_code(), code)
+            _promo_writer.flush()
+
+    def test_codes_reload_from_log(self):
+        """Test: After a restart the codes are read back from the log, one record per issued code."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "promo_codes.jsonl")
+            code = self.agent("session-1", path).generate_promo_code()
+            _promo_writer.flush()
+
+            EarlyRisersPromotionAgent._promo_code_cache.pop(path)  # As if in a new process
+            self.assertEqual(self.agent("session-2", path).promo_codes["session-1"]["promo_code"], code)
+            self.assertEqual(len(load_jsonl(path)), 1)
+
+    def test_new_agents_read_only_appended_records(self):
+        """Test: After codes are appended, the next agent reads just the new records, not the whole log."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "promo_codes.jsonl")
+            for i in range(3):
+                self.agent(f"session-{i}", path).generate_promo_code()
+            _promo_writer.flush()
+            self.agent("reader", path)
+            size = os.path.getsize(path)
+
+            self.agent("session-3", path).generate_promo_code()
+            _promo_writer.flush()
+            with mock.patch.object(early_risers_promotion, "load_jsonl_from",
+                                   wraps=early_risers_promotion.load_jsonl_from) as load:
+                agent = self.agent("session-4", path)
+                self.agent("session-5", path)
+
+            load.assert_called_once_with(path, size)
+            self.assertEqual(len(agent.promo_codes), 4)
+
+    def test_legacy_codes_are_kept(self):
+        """Test: A session that got its code before the log existed is given the same code again."""
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy = {"session-1": {"promo_code": "EARLY20250101ABCD", "generated_at": "2025-01-01T08:30:00"}}
+            with open(os.path.join(tmp, "promo_codes.json"), "w") as file:
+                json.dump(legacy, file)
+
+            agent = self.agent("session-1", os.path.join(tmp, "promo_codes.jsonl"))
+            self.assertEqual(agent.generate_promo_code(), "EARLY20250101ABCD")
+
+
+if __name__ == '__main__':
+    unittest.main()
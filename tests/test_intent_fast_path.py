@@ -0,0 +1,175 @@
+"""
+Test suite for the coordinator's regex intent fast path.
+These tests don't depend on LLM responses.
+"""
+
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pipeline import AdventureOutfittersPipeline
+from src.agents.coordinator import Intent
+
+
+class TestIntentFastPath(unittest.TestCase):
+    """Test intents resolved without an LLM call."""
+
+    def setUp(self):
+        """Set up a coordinator for each test."""
+        self.coordinator = AdventureOutfittersPipeline().coordinator
+
+    def test_order_number_with_email(self):
+        """Test: An order number routes to order status with both entities extracted."""
+        intent, entities = self.coordinator._match_intent_fast("Check my order #w007 for ethan.harris@example.com")
+
+        self.assertEqual(intent.name, "ORDER_STATUS")
+        self.assertEqual(entities, {"OrderNumber": "#W007", "Email": "ethan.harris@example.com"})
+
+    def test_order_word_before_order_number(self):
+        """Test: "order" followed by the order number is still a plain status lookup."""
+        intent, entities = self.coordinator._match_intent_fast("Where is my order #W001?")
+        self.assertEqual(intent.name, "ORDER_STATUS")
+        self.assertEqual(entities, {"OrderNumber": "#W001"})
+
+    def test_sku_and_product_type(self):
+        """Test: SKUs and product types route to product recommendation."""
+        intent, entities = self.coordinator._match_intent_fast("Tell me about product SOBP001")
+        self.assertEqual(intent.name, "PRODUCT_RECOMMENDATION")
+        self.assertEqual(entities["SKU"], "SOBP001")
+
+        intent, entities = self.coordinator._match_intent_fast("I need a backpack for hiking")
+        self.assertEqual(intent.name, "PRODUCT_RECOMMENDATION")
+        self.assertEqual(entities["ProductName"], "backpack")
+
+    def test_early_risers(self):
+        """Test: The promotion name routes to Early Risers."""
+        intent, _ = self.coordinator._match_intent_fast("Early risers discount?")
+        self.assertEqual(intent.name, "EARLY_RISERS_PROMOTION")
+
+    def test_ambiguous_queries_fall_back_to_llm(self):
+        """Test: Mixed cues, unsupported actions and cue-less queries are left to the LLM."""
+        for query in [
+            "Can I get an early risers discount on a backpack?",
+            "Order the skis for me",
+            "Cancel order #W001",
+            "Change my order #W001 address",
+            "Please update order #W001 to ship faster",
+            "Where is my backpack? I ordered it last week",
+            "My tent arrived broken, what can I do?",
+            "has my tent shipped yet?",
+            "Tell me about abcd123",
+            "Tell me about sobp001",
+            "I want to buy a tent",
+            "What are those products exactly?",
+            "Hello there",
+        ]:
+            self.assertIsNone(self.coordinator._match_intent_fast(query), query)
+
+
+class TestIntentParsing(unittest.TestCase):
+    """Test parsing of the routing LLM's reply."""
+
+    def setUp(self):
+        """Set up a coordinator whose routing LLM returns a canned reply."""
+        self.coordinator = AdventureOutfittersPipeline().coordinator
+        self.requests = []
+
+    def route(self, reply):
+        """Route a cue-less query with the given LLM reply."""
+        def chat(messages, **kwargs):
+            self.requests.append(kwargs)
+            return {"content": reply, "success": True}
+
+        self.coordinator._routing_llm = SimpleNamespace(chat=chat)
+        return self.coordinator.determine_intent("Hello there")
+
+    def test_plain_json_requested_and_parsed(self):
+        """Test: The routing call asks for JSON mode and a bare JSON reply is parsed directly."""
+        intent, entities = self.route(' {"intent": "order_status", "entities": {"OrderNumber": "#W001"}}\n')
+
+        self.assertTrue(self.requests[0]["json_mode"])
+        self.assertEqual(intent.name, "ORDER_STATUS")
+        self.assertEqual(entities, {"OrderNumber": "#W001"})
+
+    def test_fenced_json_falls_back(self):
+        """Test: JSON wrapped in a markdown code block is still found."""
+        intent, _ = self.route('Here you go:\n```json\n{"intent": "EARLY_RISERS_PROMOTION", "entities": {}}\n```')
+        self.assertEqual(intent.name, "EARLY_RISERS_PROMOTION")
+
+
+class TestContextBounds(unittest.TestCase):
+    """Test that the conversation context sent to the LLM stays bounded."""
+
+    def test_long_sessions_are_capped(self):
+        """Test: Only the latest products are listed and the text never exceeds the char budget."""
+        coordinator = AdventureOutfittersPipeline().coordinator
+        skus = [f"SOBP{i:03d}" for i in range(50)]
+        context = coordinator._format_context_for_llm({
+            "referenced_products": skus,
+            "recent_interactions_summary": "Provided product recommendations; " * 200,
+            "customer_email": "john.doe@example.com",
+        })
+
+        self.assertIn("SOBP049", context)
+        self.assertNotIn("SOBP039", context)
+        self.assertLessEqual(len(context), 1500)
+
+
+class TestKeyInfoExtraction(unittest.TestCase):
+    """Test the key information recorded in memory from delegate responses."""
+
+    def test_order_status_response(self):
+        """Test: Order number, name, SKUs and the highest-priority status are extracted."""
+        coordinator = AdventureOutfittersPipeline().coordinator
+        response = SimpleNamespace(content="Hello John Doe! Order #W001 had an error, now delivered: SOBP001, SOSK002.")
+        key_info = coordinator._extract_key_info_from_response(Intent.ORDER_STATUS, response, {})
+
+        self.assertEqual(key_info, {"order_number": "#W001", "customer_name": "John Doe",
+                                    "products": ["SOBP001", "SOSK002"], "status": "delivered"})
+
+
+class TestBatchIntents(unittest.TestCase):
+    """Test routing many queries with one LLM request."""
+
+    def test_batch_keeps_order_and_falls_back(self):
+        """Test: Fast-path queries skip the LLM, the rest share one request, and missing entries are routed singly."""
+        coordinator = AdventureOutfittersPipeline().coordinator
+        prompts = []
+
+        def chat(messages, **kwargs):
+            prompts.append(messages[-1]["content"])
+            return {"content": '{"results": [{"index": 2, "intent": "who_are_you", "entities": {}}, '
+                               '{"index": 1, "intent": "ORDER_STATUS", "entities": {"Email": "a@b.co"}}]}',
+                    "success": True}
+
+        coordinator._routing_llm = SimpleNamespace(chat=chat)
+        results = coordinator.determine_intents(["Where is my stuff? a@b.co", "Early risers discount?",
+                                                 "Who are you?", "Hello there"])
+
+        self.assertEqual([intent.name for intent, _ in results],
+                         ["ORDER_STATUS", "EARLY_RISERS_PROMOTION", "WHO_ARE_YOU", "UNKNOWN"])
+        self.assertEqual(results[0][1], {"Email": "a@b.co"})
+        self.assertEqual(len(prompts), 2)  # One batch, then "Hello there" on its own
+        self.assertNotIn("Early risers", prompts[0])
+
+
+class TestEmptyQueries(unittest.TestCase):
+    """Test that queries without words never reach the LLM."""
+
+    def test_empty_and_punctuation_only(self):
+        """Test: Empty, blank and punctuation-only queries get the rephrase prompt without routing."""
+        pipeline = AdventureOutfittersPipeline()
+        pipeline.coordinator.determine_intent = None  # Would fail if routing ran
+
+        for query in ["", "   ", "?!...", "🏔️"]:
+            response = pipeline.process_query(query)
+            self.assertIn("didn't catch that", response, query)
+        self.assertEqual(pipeline.coordinator.conversation_memory.get_intent_counts(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,14 +3,17 @@ Core test suite for Order Status functionality.
 Focuses on essential conversation flows to avoid API rate limits.
 """
 
+import gc
 import unittest
 import sys
 import os
+import weakref
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from pipeline import AdventureOutfittersPipeline
+from agents.delegates.order_status import OrderStatusAgent
 
 
 class TestOrderStatusCore(unittest.TestCase):
@@ -159,6 +162,27 @@ class TestOrderStatusRegression(unittest.TestCase):
         self.assertIn('couldn\'t find', response.lower())
 
 
+class _Orders(list):
+    """An order list that can be weakly referenced, to check when it is freed."""
+
+
+class TestOrderIndex(unittest.TestCase):
+    """Test the shared order lookup index. These tests don't depend on LLM responses."""
+
+    def test_reloaded_orders_replace_the_old_index(self):
+        """Test: Looking up orders in a reloaded list drops the old list's index so the old list can be freed."""
+        refs = []
+        for i in range(5):
+            orders = _Orders([{"Email": "me@example.com", "OrderNumber": "#W001", "Status": f"v{i}"}])
+            refs.append(weakref.ref(orders))
+            agent = OrderStatusAgent(name="OrderStatusAgent", session_id="test-session", orders_data=orders)
+            self.assertEqual(agent.find_order("ME@example.com", "W001")["Status"], f"v{i}")
+            del agent, orders
+        gc.collect()
+
+        self.assertEqual([ref() is None for ref in refs], [True] * 4 + [False])
+
+
 if __name__ == '__main__':
     # Run core tests only
     unittest.main(verbosity=2)
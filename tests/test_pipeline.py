@@ -0,0 +1,392 @@
+"""
+Test suite for pipeline construction and batching helpers.
+These tests don't depend on LLM responses.
+"""
+
+import json
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pipeline import AdventureOutfittersPipeline, _request_kind
+from src.common.message import Message
+from src.common.response_cache import CachedLLMAdapter
+from src.llm_adapter import LLMAdapter, LLMAdapterRegistry
+
+
+ORDERS = [
+    {"CustomerName": "John Doe", "Email": "john.doe@example.com", "OrderNumber": "#W001",
+     "ProductsOrdered": ["SOBP001"], "Status": "delivered", "TrackingNumber": "TRK123456789"},
+]
+CATALOG = [{"ProductName": "Summit Pack", "SKU": "SOBP001", "Description": "A 40L hiking backpack", "Tags": []}]
+
+
+class TestFreshConversation(unittest.TestCase):
+    """Test pipelines created through the shared-resource factory."""
+
+    def setUp(self):
+        """Point the shared resources at temporary data files."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.orders_file = os.path.join(directory.name, "customer_orders.json")
+        self.catalog_file = os.path.join(directory.name, "product_catalog.json")
+        self.write(self.orders_file, ORDERS)
+        self.write(self.catalog_file, CATALOG)
+
+        for name, value in [("CUSTOMER_ORDERS_FILE", self.orders_file), ("PRODUCT_CATALOG_FILE", self.catalog_file)]:
+            patcher = patch(f"pipeline.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def write(path, data):
+        """Write data to a JSON file."""
+        with open(path, "w") as file:
+            json.dump(data, file)
+
+    def test_shares_loaded_resources(self):
+        """Test: Fresh conversations reuse catalog data and templates."""
+        first = AdventureOutfittersPipeline.fresh_conversation()
+        second = AdventureOutfittersPipeline.fresh_conversation()
+
+        self.assertIs(first.product_recommendation_agent.products_data,
+                      second.product_recommendation_agent.products_data)
+        self.assertIs(first.order_status_agent.orders_data, second.order_status_agent.orders_data)
+        self.assertIs(first.coordinator.template_manager, second.coordinator.template_manager)
+
+    def test_failed_load_is_retried(self):
+        """Test: A pipeline built while a data file is missing doesn't leave later pipelines without it."""
+        os.remove(self.catalog_file)
+        self.assertEqual(AdventureOutfittersPipeline.fresh_conversation().product_recommendation_agent.products_data, [])
+
+        self.write(self.catalog_file, CATALOG)
+        self.assertEqual(AdventureOutfittersPipeline.fresh_conversation().product_recommendation_agent.products_data,
+                         CATALOG)
+
+    def test_edited_data_reaches_new_pipelines(self):
+        """Test: A pipeline built after a data file changes gets the new data."""
+        self.assertEqual(AdventureOutfittersPipeline.fresh_conversation().order_status_agent.orders_data, ORDERS)
+
+        edited = [dict(ORDERS[0], Status="in-transit")]
+        self.write(self.orders_file, edited)
+        os.utime(self.orders_file, ns=(0, os.stat(self.orders_file).st_mtime_ns + 1))
+        pipeline = AdventureOutfittersPipeline.fresh_conversation()
+        self.assertEqual(pipeline.order_status_agent.orders_data, edited)
+        self.assertEqual(pipeline.order_status_agent.find_order("john.doe@example.com", "#W001")["Status"],
+                         "in-transit")
+
+    def test_conversation_state_is_isolated(self):
+        """Test: Each fresh conversation gets its own session and memory."""
+        first = AdventureOutfittersPipeline.fresh_conversation()
+        second = AdventureOutfittersPipeline.fresh_conversation()
+
+        self.assertNotEqual(first.session_id, second.session_id)
+        self.assertIsNot(first.coordinator.conversation_memory, second.coordinator.conversation_memory)
+        self.assertIsNot(first.order_status_agent.state_manager, second.order_status_agent.state_manager)
+
+    def test_plain_pipelines_share_template_manager(self):
+        """Test: Agents built without shared resources still reuse one TemplateManager."""
+        first = AdventureOutfittersPipeline()
+        second = AdventureOutfittersPipeline()
+
+        self.assertIs(first.coordinator.template_manager, second.order_status_agent.template_manager)
+
+    def test_agents_share_llm_adapter(self):
+        """Test: Agents with the same provider and model resolve to one registry adapter."""
+        pipeline = AdventureOutfittersPipeline()
+        self.assertIs(pipeline.coordinator.llm_adapter, pipeline.order_status_agent.llm_adapter)
+        self.assertIs(pipeline.coordinator.llm_adapter, LLMAdapterRegistry.get("gemini"))
+        self.assertIsNot(LLMAdapterRegistry.get("gemini", "other-model"), LLMAdapterRegistry.get("gemini"))
+
+    def test_routing_model_override(self):
+        """Test: Intent detection uses the ROUTING_LLM_MODEL adapter while replies keep the shared one."""
+        coordinator_class = type(AdventureOutfittersPipeline().coordinator)
+        original = coordinator_class.ROUTING_LLM_MODEL
+        coordinator_class.ROUTING_LLM_MODEL = "small-model"
+        try:
+            coordinator = AdventureOutfittersPipeline().coordinator
+        finally:
+            coordinator_class.ROUTING_LLM_MODEL = original
+
+        self.assertIs(coordinator._routing_llm._adapter, LLMAdapterRegistry.get("gemini", "small-model"))
+        self.assertIs(coordinator.llm_adapter, LLMAdapterRegistry.get("gemini"))
+
+    def test_reset_memory_starts_new_conversation(self):
+        """Test: reset_memory clears conversation memory and partial order lookups."""
+        pipeline = AdventureOutfittersPipeline.fresh_conversation()
+        fingerprint = pipeline._state_fingerprint()
+        pipeline.coordinator.conversation_memory.add_interaction("ORDER_STATUS", "#W001", {}, "OrderStatusAgent")
+        pipeline.order_status_agent.state_manager.add_entry("order_number", "#W001")
+
+        pipeline.reset_memory()
+        self.assertEqual(pipeline._state_fingerprint(), fingerprint)
+
+    def test_warmup_leaves_conversation_untouched(self):
+        """Test: Warming up a pipeline records nothing in its conversation state."""
+        pipeline = AdventureOutfittersPipeline.fresh_conversation()
+        fingerprint = pipeline._state_fingerprint()
+
+        pipeline.warmup()
+        self.assertEqual(pipeline._state_fingerprint(), fingerprint)
+
+
+class TestOrderLookupBulk(unittest.TestCase):
+    """Test bulk order lookup and formatting."""
+
+    def setUp(self):
+        """Set up a pipeline over a small in-memory order list."""
+        orders = [
+            {"CustomerName": "John Doe", "Email": "john.doe@example.com", "OrderNumber": "#W001",
+             "ProductsOrdered": ["SOBP001"], "Status": "delivered", "TrackingNumber": "TRK123456789"},
+            {"CustomerName": "Bob Brown", "Email": "bob.brown@example.com", "OrderNumber": "#W004",
+             "ProductsOrdered": ["SOSK002"], "Status": "error", "TrackingNumber": None},
+        ]
+        self.pipeline = AdventureOutfittersPipeline(shared_resources={"orders_data": orders})
+
+    def test_lookup_preserves_input_order(self):
+        """Test: Records come back in input order, with None for unknown orders."""
+        records = self.pipeline.lookup_orders_bulk([
+            ("bob.brown@example.com", "#W004"),
+            ("nobody@example.com", "#W999"),
+            ("John.Doe@example.com", "#W001"),
+        ])
+
+        self.assertEqual([r["order_number"] for r in records], ["#W004", "#W999", "#W001"])
+        self.assertEqual(records[0]["order"]["CustomerName"], "Bob Brown")
+        self.assertIsNone(records[1]["order"])
+        self.assertEqual(records[2]["order"]["CustomerName"], "John Doe")
+
+    def test_lookup_ignores_hash_prefix(self):
+        """Test: Order numbers with and without the leading # find the same order."""
+        agent = self.pipeline.order_status_agent
+        self.assertIs(
+            agent.find_order("john.doe@example.com", "W001"), agent.find_order("john.doe@example.com", "#W001")
+        )
+        self.assertIsNotNone(agent.find_order("john.doe@example.com", "W001"))
+        self.assertIsNotNone(agent.find_order(" JOHN.DOE@example.com ", "#W001"))
+
+    def test_queries_without_order_info_skip_llm_extraction(self):
+        """Test: A query with no "@" or digit gets the instructions without an LLM extraction call."""
+        agent = self.pipeline.order_status_agent
+        agent.extract_order_info = None  # Would fail if the LLM fallback ran
+
+        response = agent.process(Message(content="Check my order please", sender="Customer", recipient=agent.name))
+        self.assertIn("I need your email address and order number", response.content)
+
+    def test_batch_formatting_matches_single_lookup(self):
+        """Test: Batch formatting gives the same text as a conversational lookup."""
+        records = self.pipeline.lookup_orders_bulk([("john.doe@example.com", "#W001"), ("nobody@example.com", "#W999")])
+        responses = self.pipeline.format_order_responses_batch(records)
+
+        single = self.pipeline.order_status_agent._generate_order_response("john.doe@example.com", "#W001")
+        self.assertEqual(responses[0], single.content)
+        self.assertIn("TRK123456789", responses[0])
+        self.assertIn("couldn't find order", responses[1])
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test the opt-in response cache."""
+
+    def setUp(self):
+        """Enable a fresh cache for each test."""
+        AdventureOutfittersPipeline.enable_response_cache()
+        self.replies = 0
+
+    def tearDown(self):
+        """Disable the cache so other tests hit the coordinator."""
+        AdventureOutfittersPipeline._response_cache = None
+
+    def conversation(self, success=True):
+        """Create a fresh conversation whose LLM routes every query to UNKNOWN and answers with a new reply."""
+        def chat(messages, **kwargs):
+            self.replies += 1
+            if not success:
+                return {"error": "LLM unavailable", "success": False}
+            return {"content": f"🏔️ Reply {self.replies}", "success": True}
+
+        pipeline = AdventureOutfittersPipeline.fresh_conversation()
+        pipeline.coordinator._routing_llm = SimpleNamespace(
+            chat=lambda messages, **kwargs: {"content": '{"intent": "UNKNOWN", "entities": {}}', "success": True}
+        )
+        pipeline.coordinator.llm_adapter = SimpleNamespace(chat=chat)
+        return pipeline
+
+    def test_repeated_query_restores_memory(self):
+        """Test: A repeated query from the same state reuses the response and memory update."""
+        first = self.conversation()
+        response = first.process_query("Who are you?")
+
+        second = self.conversation()
+        second.adventure_outfitters_agent.process = None  # Would fail if the coordinator ran
+        self.assertEqual(second.process_query("  who are   you? "), response)
+        self.assertEqual(second.coordinator.conversation_memory.fingerprint(),
+                         first.coordinator.conversation_memory.fingerprint())
+
+    def test_failed_generation_is_not_cached(self):
+        """Test: The static reply sent when the LLM call fails is not replayed for a repeated query."""
+        self.conversation(success=False).process_query("Who are you?")
+        self.assertEqual(len(AdventureOutfittersPipeline._response_cache), 0)
+
+        self.assertEqual(self.conversation().process_query("Who are you?"), f"🏔️ Reply {self.replies}")
+
+    def test_different_state_misses_cache(self):
+        """Test: The same query from a different conversation state is not served from cache."""
+        pipeline = self.conversation()
+        first = pipeline.process_query("Who are you?")
+        fingerprint = pipeline.coordinator.conversation_memory.fingerprint()
+
+        self.assertNotEqual(pipeline.process_query("Who are you?"), first)
+        self.assertNotEqual(pipeline.coordinator.conversation_memory.fingerprint(), fingerprint)
+
+    def test_near_identical_opening_query_hits(self):
+        """Test: A fresh conversation's opening query can reuse a near-identical cached one."""
+        response = self.conversation().process_query("Who are you?")
+
+        pipeline = self.conversation()
+        pipeline.adventure_outfitters_agent.process = None  # Would fail if the coordinator ran
+        self.assertEqual(pipeline.process_query("Who are you??"), response)
+
+    def test_entity_queries_need_exact_match(self):
+        """Test: Queries naming an order are never matched by similarity."""
+        self.conversation().process_query("Check order #W001")
+
+        pipeline = self.conversation()
+        processed = []
+        pipeline._process_query_nocache = (
+            lambda query, max_output_tokens=None: (processed.append(query), ("reply", True))[1]
+        )
+        pipeline.process_query("Check order #W002")
+        self.assertEqual(processed, ["Check order #W002"])
+
+    def test_expired_entries_miss(self):
+        """Test: Entries are dropped once their TTL has passed."""
+        AdventureOutfittersPipeline.enable_response_cache(ttl_seconds=-1)
+        self.conversation().process_query("Who are you?")
+
+        pipeline = self.conversation()
+        key = ("who are you?", pipeline._state_fingerprint(), None)
+        self.assertIsNone(pipeline._cache_lookup(key, True))
+        self.assertEqual(len(AdventureOutfittersPipeline._response_cache), 0)
+
+
+class TestStaticSystemPrompts(unittest.TestCase):
+    """Test that coordinator system prompts stay identical across turns."""
+
+    def test_turn_content_only_in_user_messages(self):
+        """Test: Query and draft text go in user messages; the system prompt is the same for every turn."""
+        coordinator = AdventureOutfittersPipeline().coordinator
+        first = coordinator._supervisor_messages("Who are you?", "I'm your guide!")
+        second = coordinator._supervisor_messages("Check order #W001", "It shipped!")
+
+        self.assertEqual(first[0], second[0])
+        self.assertNotIn("{", first[0]["content"])
+        self.assertIn("It shipped!", second[1]["content"])
+
+
+class TestBatchChat(unittest.TestCase):
+    """Test concurrent batch requests through the LLM adapter."""
+
+    def test_responses_keep_input_order(self):
+        """Test: batch_chat returns one response per request, in input order."""
+        adapter = LLMAdapter("openai", api_key="")
+        adapter.chat = lambda messages, **kwargs: {"content": messages[-1]["content"]}
+
+        batch = [[{"role": "user", "content": f"question {i}"}] for i in range(5)]
+        responses = adapter.batch_chat(batch, max_output_tokens=1)
+        self.assertEqual([r["content"] for r in responses], [f"question {i}" for i in range(5)])
+
+    def test_concurrent_requests_are_capped(self):
+        """Test: No more than the adapter's request slots reach the provider at once."""
+        adapter = LLMAdapter("openai", api_key="")
+        adapter._request_slots = threading.BoundedSemaphore(2)
+        in_flight, peak, lock = [0], [0], threading.Lock()
+
+        def chat(*args):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            return {"content": "reply"}
+
+        adapter.provider = SimpleNamespace(chat=chat)
+        adapter.batch_chat([[{"role": "user", "content": "hi"}]] * 8)
+        self.assertEqual(peak[0], 2)
+
+
+class TestCachedLLMAdapter(unittest.TestCase):
+    """Test reuse of repeated low-temperature LLM requests."""
+
+    def setUp(self):
+        """Wrap an adapter that counts the requests reaching it."""
+        self.sent = []
+        adapter = LLMAdapter("openai", api_key="")
+        adapter.chat = lambda messages, *args: self.sent.append(messages) or {"content": "reply", "success": True}
+        self.cached = CachedLLMAdapter(adapter)
+        self.messages = [{"role": "user", "content": "Where is my order?"}]
+
+    def test_repeated_request_is_served_from_cache(self):
+        """Test: An identical deterministic request only reaches the provider once."""
+        first = self.cached.chat(self.messages, temperature=0.1)
+        second = self.cached.chat(self.messages, temperature=0.1000001)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.sent), 1)
+
+    def test_models_do_not_share_entries(self):
+        """Test: The same request to another model sharing the cache still reaches the provider."""
+        other = LLMAdapter("openai", model="gpt-4o", api_key="")
+        other.chat = lambda messages, *args: self.sent.append(messages) or {"content": "other", "success": True}
+        other_cached = CachedLLMAdapter(other, self.cached._cache)
+
+        self.assertEqual(self.cached.chat(self.messages, temperature=0.1)["content"], "reply")
+        self.assertEqual(other_cached.chat(self.messages, temperature=0.1)["content"], "other")
+        self.assertEqual(len(self.sent), 2)
+
+    def test_higher_temperatures_are_not_cached(self):
+        """Test: Requests above the temperature cap always reach the provider."""
+        self.cached.chat(self.messages, temperature=0.5)
+        self.cached.chat(self.messages, temperature=0.5)
+        self.assertEqual(len(self.sent), 2)
+
+
+class TestRequestKind(unittest.TestCase):
+    """Test the prefill/decode request classifier used by batch processing."""
+
+    def test_catalog_queries_are_prefill_heavy(self):
+        """Test: Browsing and comparison queries go to the prefill lane."""
+        self.assertEqual(_request_kind("Show me your backpacks"), "prefill_heavy")
+        self.assertEqual(_request_kind("What would you recommend for winter hiking?"), "prefill_heavy")
+        self.assertEqual(_request_kind("word " * 41), "prefill_heavy")
+
+    def test_short_follow_ups_are_decode_heavy(self):
+        """Test: Order numbers, SKUs, emails and pronoun follow-ups go to the decode lane."""
+        for query in ["#W001", "SOBP001", "john.doe@example.com", "Is that good for beginners?"]:
+            self.assertEqual(_request_kind(query), "decode_heavy", query)
+
+    def test_batch_preserves_input_order(self):
+        """Test: Responses come back in input order across both lanes."""
+        def process_query(pipeline, query, max_output_tokens=None):
+            if _request_kind(query) == "prefill_heavy":
+                time.sleep(0.01)  # Finish after the decode lane
+            return f"{pipeline.session_id}: {query}"
+
+        queries = ["Show me your backpacks", "#W001", "Compare your skis", "SOBP001", "Is it waterproof?"]
+        session_ids = ["a", "b", "c", "d", "c"]
+        with patch.object(AdventureOutfittersPipeline, "process_query", process_query):
+            responses = AdventureOutfittersPipeline.process_queries_batch(queries, session_ids)
+
+        self.assertEqual(responses, [f"{session_id}: {query}" for session_id, query in zip(session_ids, queries)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Test suite for product catalog search.
+These tests don't depend on LLM responses.
+"""
+
+import gc
+import json
+import unittest
+import sys
+import os
+import tempfile
+import weakref
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.delegates.product_recommendation import ProductRecommendationAgent
+from common.io import load_json_shared
+from src.common.message import Message
+
+
+CATALOG = [
+    {"ProductName": "Summit Pack", "SKU": "SOBP001", "Description": "A 40L hiking backpack", "Tags": ["hiking"]},
+    {"ProductName": "Trail Tent", "SKU": "SOTN002", "Description": "Two person tent", "Tags": ["camping"]},
+    {"ProductName": "Alpine Pack", "SKU": "SOBP003", "Description": "Winter backpack for hiking", "Tags": ["winter"]},
+]
+
+
+class TestProductSearch(unittest.TestCase):
+    """Test keyword search and SKU lookup over the catalog."""
+
+    def setUp(self):
+        """Set up an agent over a small in-memory catalog."""
+        self.agent = ProductRecommendationAgent(
+            name="ProductRecommendationAgent", session_id="test-session", products_data=CATALOG
+        )
+
+    def test_search_ranks_by_keyword_matches(self):
+        """Test: Products matching more query words rank first; ties keep catalog order."""
+        results = self.agent.search_products("winter hiking backpack")
+        self.assertEqual([product["SKU"] for product in results], ["SOBP003", "SOBP001"])
+
+        results = self.agent.search_products("backpack")
+        self.assertEqual([product["SKU"] for product in results], ["SOBP001", "SOBP003"])
+
+    def test_search_matches_whole_words(self):
+        """Test: Query words match whole product words, ignoring case and punctuation."""
+        self.assertEqual(self.agent.search_products("hik"), [])
+        self.assertEqual([product["SKU"] for product in self.agent.search_products("Tent?")], ["SOTN002"])
+
+    def test_search_does_not_modify_catalog(self):
+        """Test: Searching leaves the shared catalog entries untouched."""
+        self.agent.search_products("tent")
+        self.assertNotIn("relevance_score", CATALOG[1])
+
+    def test_sku_lookup_keeps_catalog_order(self):
+        """Test: SKU lookups return known products in catalog order and skip unknown SKUs."""
+        results = self.agent.get_products_by_skus(["SOBP003", "SOXX999", "SOBP001"])
+        self.assertEqual([product["SKU"] for product in results], ["SOBP001", "SOBP003"])
+
+    def test_prompt_json_matches_json_dumps(self):
+        """Test: Precomputed product JSON gives the same prompt text as serializing the list."""
+        products = self.agent.get_products_by_skus(["SOBP001", "SOBP003"])
+        expected = json.dumps(
+            [{"name": p["ProductName"], "sku": p["SKU"], "description": p["Description"], "inventory": 0,
+              "tags": p["Tags"]} for p in products],
+            indent=2,
+        )
+        self.assertEqual(self.agent._products_json(products), expected)
+
+    def test_repeated_recommendation_reuses_reply(self):
+        """Test: The same query over the same products reaches the LLM only once."""
+        prompts = []
+        reply = {"content": "🏔️ Try the Trail Tent!", "success": True}
+        self.agent.llm_adapter = SimpleNamespace(chat=lambda messages, *args: prompts.append(messages) or reply)
+        message = Message(content="Do you have a tent?", sender="Customer", recipient=self.agent.name)
+
+        replies = [self.agent.process(message).content for _ in range(2)]
+        self.assertEqual(replies, ["🏔️ Try the Trail Tent!"] * 2)
+        self.assertEqual(len(prompts), 1)
+
+    def test_reloaded_catalog_replaces_the_old_index(self):
+        """Test: Searching a reloaded catalog drops the old catalog's index so the old catalog can be freed."""
+        refs = []
+        for i in range(5):
+            catalog = _Catalog(dict(product, Description=f"{product['Description']} v{i}") for product in CATALOG)
+            refs.append(weakref.ref(catalog))
+            agent = ProductRecommendationAgent(
+                name="ProductRecommendationAgent", session_id="test-session", products_data=catalog
+            )
+            results = agent.search_products("tent")
+            self.assertEqual([product["Description"] for product in results], [f"Two person tent v{i}"])
+            del results
+            del agent, catalog
+        gc.collect()
+
+        self.assertEqual([ref() is None for ref in refs], [True] * 4 + [False])
+
+
+class _Catalog(list):
+    """A product list that can be weakly referenced, to check when it is freed."""
+
+
+class TestCatalogLoading(unittest.TestCase):
+    """Test loading of shared data files."""
+
+    def test_data_file_parsed_once(self):
+        """Test: Repeated loads of an unchanged data file return the same parsed object; edits are picked up."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.json")
+            with open(path, "w") as file:
+                json.dump(CATALOG, file)
+
+            first = load_json_shared(path)
+            self.assertEqual(first, CATALOG)
+            self.assertIs(load_json_shared(path), first)
+
+            with open(path, "w") as file:
+                json.dump(CATALOG[:1], file)
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+            self.assertEqual(load_json_shared(path), CATALOG[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
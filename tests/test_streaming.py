@@ -0,0 +1,61 @@
+"""
+Test suite for streaming helpers.
+These tests don't depend on LLM responses.
+"""
+
+import unittest
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from common.streaming import batch_stream, stream_prefix
+
+
+class TestStreamPrefix(unittest.TestCase):
+    """Test cutting a stream off after a number of characters."""
+
+    def test_truncates_at_limit(self):
+        """Test: Output stops exactly at the limit, mid-chunk if needed."""
+        self.assertEqual("".join(stream_prefix(["Onward ", "into ", "the unknown"], 10)), "Onward int")
+
+    def test_short_stream_passes_through(self):
+        """Test: A stream shorter than the limit is yielded unchanged."""
+        self.assertEqual(list(stream_prefix(["🏔️ ", "Hi"], 200)), ["🏔️ ", "Hi"])
+
+    def test_closes_source(self):
+        """Test: The source generator is closed once the limit is reached."""
+        closed = []
+
+        def source():
+            try:
+                while True:
+                    yield "chunk "
+            finally:
+                closed.append(True)
+
+        self.assertEqual(len("".join(stream_prefix(source(), 15))), 15)
+        self.assertEqual(closed, [True])
+
+
+class TestBatchStream(unittest.TestCase):
+    """Test coalescing of small streamed chunks."""
+
+    def test_coalesces_by_size(self):
+        """Test: Chunks are joined until the size threshold, with the remainder flushed at the end."""
+        batches = list(batch_stream(["ab", "cd", "ef", "g"], max_chars=4, max_ms=60_000))
+        self.assertEqual(batches, ["abcd", "efg"])
+
+    def test_preserves_text(self):
+        """Test: Coalescing never drops or reorders text."""
+        chunks = [f"token{i} " for i in range(50)]
+        self.assertEqual("".join(batch_stream(chunks)), "".join(chunks))
+
+    def test_flushes_on_time(self):
+        """Test: A zero time window flushes every chunk immediately."""
+        self.assertEqual(list(batch_stream(["a", "b"], max_chars=100, max_ms=0)), ["a", "b"])
+
+
+if __name__ == '__main__':
+    unittest.main()